@@ -0,0 +1 @@
+"""Benchmarks for the spacedreppy package."""
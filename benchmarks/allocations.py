@@ -0,0 +1,142 @@
+"""Allocations per review of the timestamp and epoch-day scheduler APIs.
+
+Reviews many schedulers with ``compute_next_due_interval`` (datetime in,
+datetime and timedelta out) and with ``compute_next_due_day`` (ints in and
+out), keeping every scheduler and returned value alive, and reports the
+memory blocks and bytes each review leaves allocated, along with the time per
+review. The day API builds no datetime or timedelta objects: what it retains
+are the new ints and floats of the scheduler state and the returned tuple.
+Temporaries freed within a review are not counted.
+
+Run with ``python -m benchmarks.allocations``.
+"""
+
+from __future__ import annotations
+
+import gc
+import tracemalloc
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from functools import partial
+
+from benchmarks.validation import ns_per_call, review_loop
+from spacedreppy.epoch import to_epoch_day
+from spacedreppy.schedulers.fsrs import GOOD, FSRSScheduler
+from spacedreppy.schedulers.leitner import LeitnerScheduler
+from spacedreppy.schedulers.sm2 import SM2Scheduler
+from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
+
+NUM_REVIEWS = 100_000
+NUMBER = 20_000
+ATTEMPTED_AT = datetime(2025, 1, 1, tzinfo=UTC)
+ATTEMPTED_DAY = to_epoch_day(ATTEMPTED_AT)
+
+
+def _day_review_loop(
+    scheduler: SpacedRepetitionScheduler, result: int, **reset: object
+) -> Callable[[], object]:
+    """Return a callable reviewing ``scheduler`` by day from the same state on every call.
+
+    The counterpart of :func:`benchmarks.validation.review_loop`.
+    """
+    attempted_day = ATTEMPTED_DAY + 3
+
+    def review() -> object:
+        for name, value in reset.items():
+            setattr(scheduler, name, value)
+        scheduler.due_day = None
+        return scheduler.compute_next_due_day(attempted_day, result)
+
+    return review
+
+
+def _by_timestamp(scheduler: SpacedRepetitionScheduler, offset: int, result: int) -> object:
+    return scheduler.compute_next_due_interval(ATTEMPTED_AT + timedelta(days=offset), result)
+
+
+def _by_day(scheduler: SpacedRepetitionScheduler, offset: int, result: int) -> object:
+    return scheduler.compute_next_due_day(ATTEMPTED_DAY + offset, result)
+
+
+def retained_per_review(
+    factory: Callable[[], SpacedRepetitionScheduler],
+    review: Callable[[SpacedRepetitionScheduler, int], object],
+    n: int = NUM_REVIEWS,
+) -> tuple[float, float]:
+    """Return the blocks and bytes left allocated by one review.
+
+    Each of ``n`` schedulers is reviewed once before tracing starts and once
+    while traced. The schedulers, their state before the traced review and the
+    values it returns are kept alive until the measurement is taken, so every
+    object created by the review and referenced afterwards is counted, whether
+    it replaced an older one or not.
+
+    Args:
+        factory: Builds one scheduler per call.
+        review: Reviews a scheduler on the given day offset.
+        n: The number of reviews.
+
+    Returns:
+        The average number of memory blocks and bytes retained per review.
+    """
+    schedulers = [factory() for _ in range(n)]
+    for scheduler in schedulers:
+        review(scheduler, 0)
+    previous = [scheduler.__getstate__() for scheduler in schedulers]
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        returned = [review(scheduler, 3) for scheduler in schedulers]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    del returned, previous, schedulers
+    # The list holding the returned values is one block of n pointers.
+    return (blocks - 1) / n, (size - 8 * n) / n
+
+
+def run(n: int = NUM_REVIEWS, number: int = NUMBER) -> dict[str, dict[str, float]]:
+    """Measure both review APIs of every scheduler class.
+
+    Args:
+        n: The number of reviews per allocation measurement.
+        number: The number of calls per timing run.
+
+    Returns:
+        A mapping of case name to blocks, bytes and nanoseconds per review.
+    """
+    cases: list[tuple[str, Callable[[], SpacedRepetitionScheduler], int, dict[str, object]]] = [
+        ("FSRSScheduler", lambda: FSRSScheduler(5.0, 5.0), GOOD, {"stability": 5.0}),
+        ("SM2Scheduler", lambda: SM2Scheduler(interval=6, repetitions=2), 4, {"interval": 6}),
+        ("LeitnerScheduler", lambda: LeitnerScheduler(current_box=2), 1, {"current_box": 2}),
+    ]
+    results = {}
+    for name, factory, result, reset in cases:
+        # Each timed scheduler starts from a review three days earlier.
+        timestamp_scheduler, day_scheduler = factory(), factory()
+        timestamp_reset: dict[str, object] = dict(reset)
+        day_reset: dict[str, object] = dict(reset)
+        if isinstance(timestamp_scheduler, FSRSScheduler):
+            timestamp_reset["last_review_at"] = ATTEMPTED_AT
+            day_reset["last_review_day"] = ATTEMPTED_DAY
+        timings = ns_per_call(
+            review_loop(timestamp_scheduler, result, **timestamp_reset),
+            _day_review_loop(day_scheduler, result, **day_reset),
+            number=number,
+        )
+        for mode, review, ns in zip(
+            ("datetime", "day"), (_by_timestamp, _by_day), timings, strict=True
+        ):
+            blocks, size = retained_per_review(factory, partial(review, result=result), n)
+            results[f"{name}/{mode}"] = {"blocks": blocks, "bytes": size, "ns": ns}
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'case':<26} {'blocks':>8} {'bytes':>8} {'ns':>8}")
+    for case, row in run().items():
+        print(f"{case:<26} {row['blocks']:>8.2f} {row['bytes']:>8.1f} {row['ns']:>8.0f}")
@@ -0,0 +1,99 @@
+"""Stress test of :class:`spacedreppy.concurrency.ConcurrentDeck` under thread pools.
+
+Threads apply random review batches (and single-card reviews) to one shared
+Leitner deck whose every answer is correct, so each review must move its card
+up exactly one box: after the run, the sum of the boxes must equal the number
+of reviews, which catches any lost or torn update. The same workload runs with
+1, 2, 4, ... threads, with the default striped locks and with a single global
+lock, and reports reviews per second and the speedup over one thread.
+
+On CPython with the GIL, the speedup comes from NumPy kernels releasing the
+GIL on large batches and is bounded by the number of cores.
+
+Run with ``python -m benchmarks.concurrency``.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from spacedreppy.concurrency import DEFAULT_STRIPES, ConcurrentDeck
+from spacedreppy.deck import LeitnerDeck
+
+CARDS = 1_000_000
+BATCHES = 64
+BATCH_SIZE = 50_000
+SINGLE_REVIEWS = 20_000
+DAY = 20_089
+# Enough boxes that no card reaches the last one, where correct answers stop counting.
+INTERVALS = list(range(1, BATCHES + SINGLE_REVIEWS + 2))
+
+
+def _work(deck: ConcurrentDeck, seed: int, batches: int, singles: int) -> int:
+    rng = np.random.default_rng(seed)
+    for _ in range(batches):
+        deck.review(rng.choice(CARDS, BATCH_SIZE, replace=False), DAY, 1)
+    for card in rng.integers(0, CARDS, singles).tolist():
+        deck.review_one(card, DAY, 1)
+    return batches * BATCH_SIZE + singles
+
+
+def _stress(threads: int, stripes: int) -> tuple[float, int]:
+    """Run the workload split over ``threads`` workers and check the deck afterwards."""
+    leitner = LeitnerDeck(CARDS, intervals=INTERVALS)
+    deck = ConcurrentDeck(leitner, stripes=stripes)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        futures = [
+            pool.submit(_work, deck, seed, BATCHES // threads, SINGLE_REVIEWS // threads)
+            for seed in range(threads)
+        ]
+        reviews = sum(future.result() for future in futures)
+    seconds = time.perf_counter() - start
+    boxes = int(leitner.box.sum())
+    if boxes != reviews:
+        raise AssertionError(f"{reviews - boxes} of {reviews} reviews were lost")
+    return seconds, reviews
+
+
+def run(max_threads: int | None = None) -> dict[str, dict[int, dict[str, float]]]:
+    """Time the workload with increasing numbers of threads and both lock layouts.
+
+    Args:
+        max_threads: The largest pool to time. Defaults to the CPU count (at least 4).
+
+    Returns:
+        For ``"striped"`` and ``"global"`` locks, a mapping of thread count to
+        reviews per second and speedup over one thread.
+
+    Raises:
+        AssertionError: If a review was lost.
+    """
+    limit = max_threads or max(os.cpu_count() or 1, 4)
+    counts = [1]
+    while counts[-1] * 2 <= limit:
+        counts.append(counts[-1] * 2)
+    results: dict[str, dict[int, dict[str, float]]] = {}
+    for name, stripes in (("striped", DEFAULT_STRIPES), ("global", 1)):
+        rows: dict[int, dict[str, float]] = {}
+        for threads in counts:
+            seconds, reviews = _stress(threads, stripes)
+            rows[threads] = {
+                "reviews_per_second": reviews / seconds,
+                "speedup": reviews / seconds / rows[1]["reviews_per_second"] if rows else 1.0,
+            }
+        results[name] = rows
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'locks':>8} {'threads':>7} {'reviews/s':>12} {'speedup':>8}")
+    for name, rows in run().items():
+        for threads, row in rows.items():
+            print(
+                f"{name:>8} {threads:>7} {row['reviews_per_second']:>12.0f} {row['speedup']:>8.2f}"
+            )
@@ -0,0 +1,110 @@
+"""Per-instance memory of the scheduler classes.
+
+Compares each slotted scheduler with a plain object holding the same
+attributes in an instance ``__dict__``, which is how the schedulers were
+stored before they declared ``__slots__``.
+
+Run with ``python -m benchmarks.memory``.
+"""
+
+from __future__ import annotations
+
+import gc
+import tracemalloc
+from collections.abc import Callable
+from datetime import UTC, datetime
+from functools import partial
+
+from spacedreppy.schedulers.fsrs import FSRSScheduler
+from spacedreppy.schedulers.leitner import LeitnerScheduler
+from spacedreppy.schedulers.sm2 import SM2Scheduler
+from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
+
+NUM_INSTANCES = 100_000
+ATTEMPTED_AT = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+class _DictScheduler:
+    """Plain object storing a scheduler's attributes in an instance dict."""
+
+    def __init__(self, scheduler: SpacedRepetitionScheduler) -> None:
+        # Attributes are set one by one, like the original __init__ did, so
+        # instances share dict keys the same way the unslotted classes did.
+        for name, value in scheduler.__getstate__().items():
+            setattr(self, name, value)
+        self.on_due_change = None
+
+
+def bytes_per_instance(factory: Callable[[], object], n: int = NUM_INSTANCES) -> float:
+    """Return the average traced allocation per object created by ``factory``.
+
+    Args:
+        factory: Builds one object per call.
+        n: The number of objects to allocate.
+
+    Returns:
+        The average number of bytes allocated per object.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        objects = [factory() for _ in range(n)]
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del objects
+    return current / n
+
+
+def _reviewed(
+    factory: Callable[[], SpacedRepetitionScheduler], result: int
+) -> SpacedRepetitionScheduler:
+    scheduler = factory()
+    scheduler.compute_next_due_interval(attempted_at=ATTEMPTED_AT, result=result)
+    return scheduler
+
+
+def _dict_based(
+    plain: type[_DictScheduler], factory: Callable[[], SpacedRepetitionScheduler], result: int
+) -> _DictScheduler:
+    return plain(_reviewed(factory, result))
+
+
+def run(n: int = NUM_INSTANCES) -> dict[str, dict[str, float]]:
+    """Measure reviewed slotted schedulers against their dict-based equivalents.
+
+    Shared values (weights tuples, timestamps) are allocated by the factories
+    for both variants, so the difference is the per-object storage overhead.
+
+    Args:
+        n: The number of instances allocated per measurement.
+
+    Returns:
+        A mapping of scheduler name to slotted bytes, dict-based bytes and savings.
+    """
+    cases: list[tuple[str, Callable[[], SpacedRepetitionScheduler], int]] = [
+        ("FSRSScheduler", FSRSScheduler, 3),
+        ("SM2Scheduler", SM2Scheduler, 4),
+        ("LeitnerScheduler", LeitnerScheduler, 1),
+    ]
+    results = {}
+    for name, factory, result in cases:
+        # One plain class per scheduler type, so each gets its own shared-key layout.
+        plain = type(f"Dict{name}", (_DictScheduler,), {})
+        slotted = bytes_per_instance(partial(_reviewed, factory, result), n)
+        dict_based = bytes_per_instance(partial(_dict_based, plain, factory, result), n)
+        results[name] = {
+            "slotted_bytes": slotted,
+            "dict_bytes": dict_based,
+            "saved_bytes": dict_based - slotted,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'scheduler':<18} {'slotted':>10} {'__dict__':>10} {'saved':>10}")
+    for name, row in run().items():
+        print(
+            f"{name:<18} {row['slotted_bytes']:>10.1f} {row['dict_bytes']:>10.1f} "
+            f"{row['saved_bytes']:>10.1f}"
+        )
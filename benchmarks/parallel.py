@@ -0,0 +1,69 @@
+"""Scaling of :func:`spacedreppy.parallel.run_shards` with the number of processes.
+
+Reschedules the same set of user decks with 1, 2, 4, ... worker processes (up
+to the CPU count) and reports the wall time and the speedup over one process.
+Each user fits FSRS weights on a synthetic log and then reviews every card.
+
+Run with ``python -m benchmarks.parallel``.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+
+import numpy as np
+
+from spacedreppy.deck import FSRSDeck
+from spacedreppy.parallel import Shard, run_shards
+
+USERS = 16
+CARDS = 20_000
+REVIEWS_PER_CARD = 6
+DAY = 86400
+
+
+def _shards(seed: int = 0) -> list[Shard]:
+    rng = np.random.default_rng(seed)
+    shards = []
+    for _ in range(USERS):
+        card_ids = np.repeat(np.arange(CARDS), REVIEWS_PER_CARD)
+        gaps = rng.integers(0, 20, (CARDS, REVIEWS_PER_CARD)).cumsum(axis=1).ravel()
+        ratings = rng.integers(1, 5, CARDS * REVIEWS_PER_CARD)
+        reviews = [(np.arange(CARDS), day, rng.integers(1, 5, CARDS)) for day in (0, 4, 15)]
+        shards.append(Shard(FSRSDeck(CARDS), reviews, fit_log=(card_ids, gaps * DAY, ratings)))
+    return shards
+
+
+def run(max_processes: int | None = None) -> dict[int, dict[str, float]]:
+    """Time the same workload with increasing numbers of processes.
+
+    Args:
+        max_processes: The largest pool to time. Defaults to the CPU count.
+
+    Returns:
+        A mapping of process count to wall seconds and speedup over one process.
+    """
+    limit = max_processes or os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= limit:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != limit:
+        counts.append(limit)
+    results: dict[int, dict[str, float]] = {}
+    for processes in counts:
+        shards = _shards()
+        start = time.perf_counter()
+        run_shards(shards, processes=processes, fit_options={"epochs": 1})
+        seconds = time.perf_counter() - start
+        results[processes] = {
+            "seconds": seconds,
+            "speedup": results[1]["seconds"] / seconds if results else 1.0,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'processes':>9} {'seconds':>9} {'speedup':>8}")
+    for processes, row in run().items():
+        print(f"{processes:>9} {row['seconds']:>9.2f} {row['speedup']:>8.2f}")
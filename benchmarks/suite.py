@@ -0,0 +1,243 @@
+"""Benchmark suite of the scheduler hot paths, with machine-readable results.
+
+Measures:
+
+* ``scalar/<name>``: one call of the scalar ``fsrs``, ``sm2`` and ``leitner``
+  algorithms, validated and ``*_unchecked``, in nanoseconds.
+* ``scheduler/<class>``: one ``compute_next_due_interval`` call, in nanoseconds.
+* ``memory/<class>``: the memory of one reviewed scheduler instance, in bytes.
+* ``deck/<class>/<size>``: one batch review of every card of a deck with
+  1K, 100K and 10M cards, in cards per second.
+
+The results are written as JSON with one entry per case and sorted keys, so two
+result files diff line by line. Given a baseline file, the cases that got
+worse by more than a tolerance are listed and the run exits with status 1,
+which lets a release job gate on throughput::
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --baseline baseline.json --output current.json
+
+Timings are the best of several interleaved runs; compare results from the
+same machine only. A full run takes a few minutes, mostly on the 10M-card decks.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from collections.abc import Callable, Sequence
+from datetime import UTC, datetime
+from functools import partial
+from typing import Any, TypedDict
+
+import numpy as np
+
+from benchmarks.memory import bytes_per_instance
+from benchmarks.validation import ns_per_call, review_loop
+from spacedreppy.deck import Deck, FSRSDeck, LeitnerDeck, SM2Deck
+from spacedreppy.schedulers.fsrs import GOOD, FSRSScheduler, fsrs, fsrs_parameters, fsrs_unchecked
+from spacedreppy.schedulers.leitner import LeitnerScheduler, leitner, leitner_unchecked
+from spacedreppy.schedulers.sm2 import SM2Scheduler, sm2, sm2_unchecked
+from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
+
+FORMAT_VERSION = 1
+DECK_SIZES = (1_000, 100_000, 10_000_000)
+QUICK_DECK_SIZES = (1_000, 100_000)
+DEFAULT_TOLERANCE = 0.1
+NUMBER = 20_000
+MEMORY_INSTANCES = 100_000
+ATTEMPTED_AT = datetime(2025, 1, 1, tzinfo=UTC)
+DAY = 20_089
+
+
+class Measurement(TypedDict):
+    """One benchmark result."""
+
+    value: float
+    unit: str
+    higher_is_better: bool
+
+
+def _ns(value: float) -> Measurement:
+    return {"value": value, "unit": "ns/call", "higher_is_better": False}
+
+
+def scalar_cases(number: int = NUMBER) -> dict[str, Measurement]:
+    """Time the scalar algorithms, validated and unchecked."""
+    parameters = fsrs_parameters()
+    funcs: dict[str, Callable[[], object]] = {
+        "fsrs": lambda: fsrs(GOOD, 5.0, 5.0, 3, parameters=parameters),
+        "fsrs_unchecked": lambda: fsrs_unchecked(GOOD, 5.0, 5.0, 3, parameters),
+        "sm2": lambda: sm2(4, 6, 2, 2.5),
+        "sm2_unchecked": lambda: sm2_unchecked(4, 6, 2, 2.5),
+        "leitner": lambda: leitner(True, 2, 5),
+        "leitner_unchecked": lambda: leitner_unchecked(True, 2, 5),
+    }
+    timings = ns_per_call(*funcs.values(), number=number)
+    return {f"scalar/{name}": _ns(ns) for name, ns in zip(funcs, timings, strict=True)}
+
+
+def scheduler_cases(number: int = NUMBER) -> dict[str, Measurement]:
+    """Time ``compute_next_due_interval`` on every scheduler class."""
+    reviews: dict[str, Callable[[], object]] = {
+        "FSRSScheduler": review_loop(FSRSScheduler(5.0, 5.0), GOOD, last_review_at=ATTEMPTED_AT),
+        "SM2Scheduler": review_loop(SM2Scheduler(interval=6, repetitions=2), 4, interval=6),
+        "LeitnerScheduler": review_loop(LeitnerScheduler(current_box=2), 1, current_box=2),
+    }
+    timings = ns_per_call(*reviews.values(), number=number)
+    return {f"scheduler/{name}": _ns(ns) for name, ns in zip(reviews, timings, strict=True)}
+
+
+def _reviewed(
+    factory: Callable[[], SpacedRepetitionScheduler], result: int
+) -> SpacedRepetitionScheduler:
+    scheduler = factory()
+    scheduler.compute_next_due_interval(attempted_at=ATTEMPTED_AT, result=result)
+    return scheduler
+
+
+def memory_cases(n: int = MEMORY_INSTANCES) -> dict[str, Measurement]:
+    """Measure the memory of one reviewed instance of every scheduler class."""
+    cases: list[tuple[str, Callable[[], SpacedRepetitionScheduler], int]] = [
+        ("FSRSScheduler", FSRSScheduler, GOOD),
+        ("SM2Scheduler", SM2Scheduler, 4),
+        ("LeitnerScheduler", LeitnerScheduler, 1),
+    ]
+    return {
+        f"memory/{name}": {
+            "value": bytes_per_instance(partial(_reviewed, factory, result), n),
+            "unit": "bytes",
+            "higher_is_better": False,
+        }
+        for name, factory, result in cases
+    }
+
+
+def _deck_throughput(deck: Deck, seed: int = 0) -> float:
+    """Return the best cards per second of reviewing every card of a deck."""
+    rng = np.random.default_rng(seed)
+    low, high = deck.result_range
+    cards = np.arange(len(deck))
+    deck.review(cards, DAY, high)
+    # Enough repeats for about a second of work, at least three.
+    repeats = max(3, min(100, 10_000_000 // len(deck)))
+    best = float("inf")
+    for i in range(repeats):
+        results = rng.integers(low, high + 1, len(deck))
+        start = time.perf_counter()
+        deck.review(cards, DAY + 30 * (i + 1), results)
+        best = min(best, time.perf_counter() - start)
+    return len(deck) / best
+
+
+def deck_cases(sizes: Sequence[int] = DECK_SIZES) -> dict[str, Measurement]:
+    """Time batch reviews of every card of each deck type at each size."""
+    factories: list[Callable[[int], Deck]] = [FSRSDeck, SM2Deck, LeitnerDeck]
+    results: dict[str, Measurement] = {}
+    for factory in factories:
+        for size in sizes:
+            deck = factory(size)
+            results[f"deck/{type(deck).__name__}/{size}"] = {
+                "value": _deck_throughput(deck),
+                "unit": "cards/s",
+                "higher_is_better": True,
+            }
+            del deck
+    return results
+
+
+def run(quick: bool = False) -> dict[str, Any]:
+    """Run every benchmark.
+
+    Args:
+        quick: Use fewer calls and skip the 10M-card decks.
+
+    Returns:
+        The results document: the format version, the environment and one
+        :class:`Measurement` per case.
+    """
+    number = NUMBER // 10 if quick else NUMBER
+    results = {
+        **scalar_cases(number),
+        **scheduler_cases(number),
+        **memory_cases(MEMORY_INSTANCES // 10 if quick else MEMORY_INSTANCES),
+        **deck_cases(QUICK_DECK_SIZES if quick else DECK_SIZES),
+    }
+    return {
+        "version": FORMAT_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        # Four significant digits: finer differences are noise.
+        "results": {
+            name: {**m, "value": float(f"{m['value']:.4g}")} for name, m in results.items()
+        },
+    }
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], tolerance: float = DEFAULT_TOLERANCE
+) -> dict[str, float]:
+    """Return the cases that got worse than the baseline by more than ``tolerance``.
+
+    Args:
+        baseline: A results document from :func:`run`.
+        current: Another results document from :func:`run`.
+        tolerance: The allowed relative slowdown (or growth, for lower-is-better
+            cases), e.g. 0.1 for 10%.
+
+    Returns:
+        A mapping of each regressed case to its relative change, positive when
+        the case got worse. Cases missing from either document are ignored.
+    """
+    regressions = {}
+    for name, old in baseline["results"].items():
+        new = current["results"].get(name)
+        if new is None or not old["value"]:
+            continue
+        change = (new["value"] - old["value"]) / old["value"]
+        worse = -change if old["higher_is_better"] else change
+        if worse > tolerance:
+            regressions[name] = worse
+    return regressions
+
+
+def _dump(document: dict[str, Any]) -> str:
+    return json.dumps(document, indent=2, sort_keys=True) + "\n"
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the suite from the command line and return the exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else None)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--quick", action="store_true", help="fewer calls, no 10M decks")
+    args = parser.parse_args(argv)
+
+    document = run(quick=args.quick)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(_dump(document))
+    for name, result in document["results"].items():
+        print(f"{name:<32} {result['value']:>16.1f} {result['unit']}", file=sys.stderr)
+    if not args.output:
+        print(_dump(document), end="")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), document, args.tolerance)
+        for name, worse in regressions.items():
+            print(f"regression: {name} is {worse:.1%} worse than the baseline", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Per-call cost of input validation in the scalar algorithms.
+
+Times each validated function against its ``*_unchecked`` counterpart on
+the same inputs, and the schedulers with ``validate=True`` against
+``validate=False``.
+
+Run with ``python -m benchmarks.validation``.
+"""
+
+from __future__ import annotations
+
+import timeit
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+
+from spacedreppy.schedulers.fsrs import GOOD, FSRSScheduler, fsrs, fsrs_parameters, fsrs_unchecked
+from spacedreppy.schedulers.leitner import LeitnerScheduler, leitner, leitner_unchecked
+from spacedreppy.schedulers.sm2 import SM2Scheduler, sm2, sm2_unchecked
+from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
+
+NUMBER = 20_000
+REPEAT = 25
+ATTEMPTED_AT = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def ns_per_call(
+    *funcs: Callable[[], object], number: int = NUMBER, repeat: int = REPEAT
+) -> list[float]:
+    """Return the best-of-``repeat`` time per call of each function in nanoseconds.
+
+    The functions are timed in interleaved rounds so that machine noise
+    affects all of them alike.
+    """
+    best = [float("inf")] * len(funcs)
+    for _ in range(repeat):
+        for i, func in enumerate(funcs):
+            best[i] = min(best[i], timeit.timeit(func, number=number))
+    return [t / number * 1e9 for t in best]
+
+
+def review_loop(
+    scheduler: SpacedRepetitionScheduler, result: int, **reset: object
+) -> Callable[[], object]:
+    """Return a callable reviewing ``scheduler`` from the same state on every call.
+
+    The ``reset`` attributes (and the due timestamp) are restored before each
+    review, so repeated calls neither overflow nor drift into other branches.
+    Both variants of a case pay the same reset cost.
+    """
+    attempted_at = ATTEMPTED_AT + timedelta(days=3)
+
+    def review() -> object:
+        for name, value in reset.items():
+            setattr(scheduler, name, value)
+        scheduler.due_timestamp = None
+        return scheduler.compute_next_due_interval(attempted_at, result)
+
+    return review
+
+
+def run(number: int = NUMBER) -> dict[str, dict[str, float]]:
+    """Time validated and unchecked variants of every algorithm and scheduler.
+
+    Args:
+        number: The number of calls per timing run.
+
+    Returns:
+        A mapping of case name to checked/unchecked nanoseconds per call and the saving.
+    """
+    parameters = fsrs_parameters()
+    cases: dict[str, tuple[Callable[[], object], Callable[[], object]]] = {
+        "fsrs": (
+            lambda: fsrs(GOOD, 5.0, 5.0, 3, parameters=parameters),
+            lambda: fsrs_unchecked(GOOD, 5.0, 5.0, 3, parameters),
+        ),
+        "sm2": (lambda: sm2(4, 6, 2, 2.5), lambda: sm2_unchecked(4, 6, 2, 2.5)),
+        "leitner": (lambda: leitner(True, 2, 5), lambda: leitner_unchecked(True, 2, 5)),
+        "FSRSScheduler": (
+            review_loop(FSRSScheduler(5.0, 5.0), GOOD, last_review_at=ATTEMPTED_AT),
+            review_loop(FSRSScheduler(5.0, 5.0, validate=False), GOOD, last_review_at=ATTEMPTED_AT),
+        ),
+        "SM2Scheduler": (
+            review_loop(SM2Scheduler(interval=6, repetitions=2), 4, interval=6),
+            review_loop(SM2Scheduler(interval=6, repetitions=2, validate=False), 4, interval=6),
+        ),
+        "LeitnerScheduler": (
+            review_loop(LeitnerScheduler(current_box=2), 1, current_box=2),
+            review_loop(LeitnerScheduler(current_box=2, validate=False), 1, current_box=2),
+        ),
+    }
+    results = {}
+    for name, (checked, unchecked) in cases.items():
+        checked_ns, unchecked_ns = ns_per_call(checked, unchecked, number=number)
+        results[name] = {
+            "checked_ns": checked_ns,
+            "unchecked_ns": unchecked_ns,
+            "saved_ns": checked_ns - unchecked_ns,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'case':<18} {'checked':>10} {'unchecked':>10} {'saved':>10}  (ns/call)")
+    for name, row in run().items():
+        print(
+            f"{name:<18} {row['checked_ns']:>10.0f} {row['unchecked_ns']:>10.0f} "
+            f"{row['saved_ns']:>10.0f}"
+        )
@@ -2,6 +2,8 @@
 
 from importlib.metadata import version
 
+from spacedreppy.deck import FSRSDeck, LeitnerDeck, SM2Deck
+from spacedreppy.due_index import DueIndex
 from spacedreppy.schedulers.fsrs import FSRSScheduler
 from spacedreppy.schedulers.leitner import LeitnerScheduler
 from spacedreppy.schedulers.sm2 import SM2Scheduler
@@ -9,8 +11,12 @@ from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionS
 
 __version__ = version("spacedreppy")
 __all__ = [
+    "DueIndex",
+    "FSRSDeck",
     "FSRSScheduler",
+    "LeitnerDeck",
     "LeitnerScheduler",
+    "SM2Deck",
     "SM2Scheduler",
     "SpacedRepetitionScheduler",
     "__version__",
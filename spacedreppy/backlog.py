@@ -0,0 +1,117 @@
+"""Catch-up plans for decks with a backlog of overdue cards.
+
+After a break, reviewing every overdue card at once is not possible and
+reviewing them in arbitrary order leaves the cards closest to being forgotten
+waiting behind those that are still well known. :func:`rank_overdue` orders
+the overdue cards of a deck by urgency in one vectorized pass:
+
+* FSRS cards by their current retrievability, lowest first.
+* SM-2 and Leitner cards by their overdue ratio, the days overdue divided by
+  the interval, highest first.
+
+:func:`plan_catch_up` spreads the backlog over a number of days and yields one
+:class:`DailyQueue` per day. Queues are computed when they are requested, and
+the cards not yet handed out are ranked again on each day, since cards with
+different stabilities are forgotten at different rates. Each queue is meant to
+be reviewed in one batch with :meth:`~spacedreppy.deck.Deck.review`.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import numpy.typing as npt
+
+from spacedreppy.deck import UNSCHEDULED, Deck, FSRSDeck
+from spacedreppy.epoch import as_epoch_day
+from spacedreppy.schedulers.fsrs import forgetting_curve
+
+DEFAULT_CATCH_UP_DAYS = 7
+
+
+@dataclass(frozen=True, slots=True)
+class DailyQueue:
+    """The backlog cards to review on one day, most urgent first.
+
+    Attributes:
+        day: The epoch day.
+        cards: The card indices.
+    """
+
+    day: int
+    cards: npt.NDArray[np.intp]
+
+
+def _urgency(deck: Deck, cards: npt.NDArray[np.intp], day: int) -> npt.NDArray[np.float64]:
+    """Return how urgent reviewing each of ``cards`` on ``day`` is; higher is more urgent."""
+    if isinstance(deck, FSRSDeck):
+        elapsed = np.maximum(day - deck.last_review[cards], 0)
+        return -forgetting_curve(elapsed, deck.stability[cards], deck.parameters)
+    overdue = (day - deck.due[cards]).astype(np.float64)
+    return overdue / np.maximum(deck.interval[cards], 1)
+
+
+def _by_urgency(deck: Deck, cards: npt.NDArray[np.intp], day: int) -> npt.NDArray[np.intp]:
+    # Stable, so equally urgent cards stay in card order.
+    return cards[np.argsort(-_urgency(deck, cards, day), kind="stable")]
+
+
+def _overdue(deck: Deck, day: int) -> npt.NDArray[np.intp]:
+    return np.flatnonzero((deck.due != UNSCHEDULED) & (deck.due < day))
+
+
+def rank_overdue(deck: Deck, at: datetime | int | None = None) -> npt.NDArray[np.intp]:
+    """Return the overdue cards of a deck, most urgent first.
+
+    Args:
+        deck: The deck.
+        at: The timestamp or epoch day of the ranking. Defaults to today (UTC).
+            Cards due before that day are overdue.
+
+    Returns:
+        The indices of the overdue cards.
+    """
+    day = as_epoch_day(at)
+    return _by_urgency(deck, _overdue(deck, day), day)
+
+
+def plan_catch_up(
+    deck: Deck, days: int = DEFAULT_CATCH_UP_DAYS, at: datetime | int | None = None
+) -> Iterator[DailyQueue]:
+    """Spread the overdue cards of a deck over the next days.
+
+    The backlog is fixed when the plan starts: every card overdue on the first
+    day appears in exactly one queue. Each day gets an equal share of the
+    cards left, the most urgent of them on that day.
+
+    Args:
+        deck: The deck.
+        days: The number of days to clear the backlog in.
+        at: The timestamp or epoch day of the first day. Defaults to today (UTC).
+
+    Yields:
+        One queue per day, until the backlog is handed out; fewer than
+        ``days`` queues if there are fewer overdue cards than days.
+
+    Raises:
+        ValueError: If ``days`` is not positive.
+    """
+    if days <= 0:
+        raise ValueError(f"days must be positive, got {days}")
+    return _queues(deck, days, as_epoch_day(at))
+
+
+def _queues(deck: Deck, days: int, start: int) -> Iterator[DailyQueue]:
+    remaining = _overdue(deck, start)
+    for i in range(days):
+        if not remaining.size:
+            return
+        day = start + i
+        ranked = _by_urgency(deck, remaining, day)
+        quota = math.ceil(ranked.size / (days - i))
+        yield DailyQueue(day, ranked[:quota])
+        remaining = np.sort(ranked[quota:])
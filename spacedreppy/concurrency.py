@@ -0,0 +1,258 @@
+"""Thread-safe card stores with striped locks.
+
+A review updates several fields of a card (interval, due date and the
+algorithm state) in separate steps, so two threads reviewing the same card
+at once can leave its state torn. The stores here guard every card with one
+of a fixed set of locks, chosen by hashing the card: reviews of the same card
+are serialized, while reviews of cards on different stripes run concurrently
+and no global lock is ever taken. Reads through the stores see a card either
+before or after a review, never in between.
+
+* :class:`ConcurrentDeck` guards a :class:`~spacedreppy.deck.Deck`. Batch
+  reviews lock only the stripes of their cards, a few at a time, so NumPy
+  kernels of different threads can overlap.
+* :class:`SchedulerStore` guards individual scheduler objects.
+
+Hooks such as ``on_due_change`` run while the card's lock is held; observers
+shared between cards, like a :class:`~spacedreppy.due_index.DueIndex`, need
+their own lock.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta
+from itertools import pairwise
+from typing import Any, Generic, TypeVar
+
+import numpy as np
+import numpy.typing as npt
+
+from spacedreppy.deck import Deck
+from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
+
+DEFAULT_STRIPES = 64
+# Batch reviews are split by runs of consecutive stripes into parts of at least
+# this many cards each, so that a large batch is not split into many tiny
+# kernel calls.
+MIN_LOCKED_BATCH = 8192
+
+CardId = TypeVar("CardId", int, str)
+
+
+class _StripedLocks:
+    """A fixed set of locks, each guarding the keys that hash to it."""
+
+    def __init__(self, stripes: int) -> None:
+        if stripes <= 0:
+            raise ValueError(f"stripes must be positive, got {stripes}")
+        self.locks = [threading.Lock() for _ in range(stripes)]
+
+    def stripe(self, key: Any) -> int:
+        return hash(key) % len(self.locks)
+
+    @contextmanager
+    def hold(self, stripes: Iterable[int]) -> Iterator[None]:
+        """Hold the locks of the given stripes, which must be distinct and ascending.
+
+        Operations that need several locks take them in stripe order and
+        release them before taking others, so they cannot deadlock.
+        """
+        with ExitStack() as stack:
+            for stripe in stripes:
+                stack.enter_context(self.locks[stripe])
+            yield
+
+
+class ConcurrentDeck:
+    """Thread-safe access to a deck, with one lock per stripe of cards.
+
+    Card ``i`` is guarded by stripe ``i % stripes``. All access to the deck
+    must go through this wrapper while other threads use it.
+
+    Args:
+        deck: The deck to guard.
+        stripes: The number of locks.
+    """
+
+    def __init__(self, deck: Deck, stripes: int = DEFAULT_STRIPES) -> None:
+        self.deck = deck
+        self._locks = _StripedLocks(stripes)
+
+    def __len__(self) -> int:
+        """Return the number of cards in the deck."""
+        return len(self.deck)
+
+    def lock(self, card: int) -> threading.Lock:
+        """Return the lock guarding a card, for multi-step reads or updates.
+
+        Raises:
+            IndexError: If the card index is out of range.
+        """
+        return self._locks.locks[self.deck[card].card % len(self._locks.locks)]
+
+    def review(
+        self,
+        cards: npt.ArrayLike,
+        attempted_at: npt.ArrayLike,
+        results: npt.ArrayLike,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """Apply one review to each of the given cards, as :meth:`Deck.review`.
+
+        The cards are split into runs of consecutive stripes and each part is
+        reviewed under the locks of the stripes its cards are on, so every card
+        is updated atomically but the batch as a whole is not: other threads
+        may see some parts already reviewed. Small batches are a single part;
+        stripes without cards of the batch are never locked.
+
+        Args:
+            cards: Indices of the reviewed cards. Each card may appear at most once.
+            attempted_at: Epoch days of the review attempts.
+            results: The review results, as accepted by the deck's scheduler.
+
+        Returns:
+            A tuple of the new due epoch days and intervals (in days) of the cards.
+
+        Raises:
+            ValueError: If a card index is out of range or repeated, or a result
+                is invalid. No card is modified then.
+        """
+        idx = np.asarray(cards, dtype=np.intp)
+        if idx.ndim != 1:
+            raise ValueError("cards must be one-dimensional")
+        days = np.broadcast_to(np.asarray(attempted_at, dtype=np.int64), idx.shape)
+        res = np.broadcast_to(np.asarray(results, dtype=np.int64), idx.shape)
+        if idx.size:
+            low, high = self.deck.result_range
+            if idx.min() < 0 or idx.max() >= len(self.deck):
+                raise ValueError(f"cards must be in [0, {len(self.deck)})")
+            if np.unique(idx).size != idx.size:
+                raise ValueError("cards must not contain duplicates")
+            if res.min() < low or res.max() > high:
+                raise ValueError(f"results must be in [{low}, {high}]")
+        due = np.empty(idx.size, dtype=np.int64)
+        intervals = np.empty(idx.size, dtype=np.int64)
+        n_stripes = len(self._locks.locks)
+        runs = max(min(n_stripes, idx.size // MIN_LOCKED_BATCH), 1)
+        stripes = idx % n_stripes
+        run = stripes * runs // n_stripes
+        order = np.argsort(run, kind="stable")
+        bounds = np.searchsorted(run[order], np.arange(runs + 1))
+        for lo, hi in pairwise(bounds):
+            if lo == hi:
+                continue
+            part = order[lo:hi]
+            with self._locks.hold(np.unique(stripes[part]).tolist()):
+                due[part], intervals[part] = self.deck.review_unchecked(
+                    idx[part], days[part], res[part]
+                )
+        return due, intervals
+
+    def review_one(self, card: int, attempted_at: int, result: int) -> tuple[int, int]:
+        """Apply one review to a single card, as :meth:`Deck.review_one`.
+
+        Args:
+            card: The card index.
+            attempted_at: The epoch day of the review attempt.
+            result: The review result, as accepted by the deck's scheduler.
+
+        Returns:
+            A tuple of the new due epoch day and interval (in days).
+        """
+        with self.lock(card):
+            return self.deck.review_one(card, attempted_at, result)
+
+    def compute_next_due_interval(
+        self, card: int, attempted_at: datetime, result: int
+    ) -> tuple[datetime, timedelta]:
+        """Review a card with the scheduler API, as ``deck[card].compute_next_due_interval``.
+
+        Args:
+            card: The card index.
+            attempted_at: The timestamp of the review attempt.
+            result: The review result, as accepted by the deck's scheduler.
+
+        Returns:
+            A tuple of the next due timestamp and the interval timedelta.
+        """
+        with self.lock(card):
+            return self.deck[card].compute_next_due_interval(attempted_at, result)
+
+    def snapshot(self, card: int) -> dict[str, Any]:
+        """Return a consistent copy of a card's column values."""
+        with self.lock(card):
+            return {name: getattr(self.deck, name)[card].item() for name in self.deck.columns}
+
+    def resize(self, size: int) -> None:
+        """Grow or shrink the deck while no review is running, as :meth:`Deck.resize`."""
+        with self._locks.hold(range(len(self._locks.locks))):
+            self.deck.resize(size)
+
+
+class SchedulerStore(Generic[CardId]):
+    """Thread-safe store of scheduler objects, one per card id.
+
+    Args:
+        stripes: The number of locks.
+    """
+
+    def __init__(self, stripes: int = DEFAULT_STRIPES) -> None:
+        self._locks = _StripedLocks(stripes)
+        self._schedulers: dict[CardId, SpacedRepetitionScheduler] = {}
+
+    def __len__(self) -> int:
+        """Return the number of stored cards."""
+        return len(self._schedulers)
+
+    def __contains__(self, card_id: object) -> bool:
+        """Return whether a card is stored."""
+        return card_id in self._schedulers
+
+    def lock(self, card_id: CardId) -> threading.Lock:
+        """Return the lock guarding a card, for multi-step reads or updates."""
+        return self._locks.locks[self._locks.stripe(card_id)]
+
+    def add(self, card_id: CardId, scheduler: SpacedRepetitionScheduler) -> None:
+        """Store the scheduler of a new card.
+
+        Args:
+            card_id: The card id.
+            scheduler: The card's scheduler. Use it only through the store from now on.
+
+        Raises:
+            ValueError: If the card id is already stored.
+        """
+        with self.lock(card_id):
+            if card_id in self._schedulers:
+                raise ValueError(f"card {card_id!r} is already stored")
+            self._schedulers[card_id] = scheduler
+
+    def review(
+        self, card_id: CardId, attempted_at: datetime, result: int
+    ) -> tuple[datetime, timedelta]:
+        """Review a card atomically with ``compute_next_due_interval``.
+
+        Args:
+            card_id: The card id.
+            attempted_at: The timestamp of the review attempt.
+            result: The review result, as accepted by the card's scheduler.
+
+        Returns:
+            A tuple of the next due timestamp and the interval timedelta.
+
+        Raises:
+            KeyError: If the card is not stored.
+        """
+        with self.lock(card_id):
+            return self._schedulers[card_id].compute_next_due_interval(attempted_at, result)
+
+    def snapshot(self, card_id: CardId) -> dict[str, Any]:
+        """Return a consistent copy of a card's scheduler state.
+
+        Raises:
+            KeyError: If the card is not stored.
+        """
+        with self.lock(card_id):
+            return self._schedulers[card_id].__getstate__()
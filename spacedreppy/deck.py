@@ -0,0 +1,662 @@
+"""Columnar (struct-of-arrays) card stores backing the schedulers.
+
+A deck keeps the state of many cards of one scheduler type in contiguous,
+typed NumPy arrays instead of one Python object per card. Due dates are
+stored as int64 epoch days (see :mod:`spacedreppy.epoch`), so decks work at
+day resolution. Bulk updates run the vectorized kernels directly on the
+columns, and ``deck[i]`` returns a lightweight view that keeps the
+``compute_next_due_interval`` API of the scheduler classes.
+"""
+
+from __future__ import annotations
+
+import copy
+import functools
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import Any, ClassVar, Self
+
+import numpy as np
+import numpy.typing as npt
+
+from spacedreppy.epoch import from_epoch_day, to_epoch_day
+from spacedreppy.schedulers.fsrs import (
+    DEFAULT_MAXIMUM_INTERVAL,
+    DEFAULT_REQUEST_RETENTION,
+    DEFAULT_WEIGHTS,
+    MAX_RATING,
+    MIN_RATING,
+    FSRSParameters,
+    FSRSScheduler,
+    fsrs,
+    fsrs_batch,
+    fsrs_parameters,
+)
+from spacedreppy.schedulers.leitner import (
+    DEFAULT_INTERVALS,
+    MAX_RESULT,
+    MIN_RESULT,
+    LeitnerScheduler,
+    leitner_transitions,
+)
+from spacedreppy.schedulers.sm2 import MAX_QUALITY, MIN_QUALITY, SM2Scheduler, sm2, sm2_batch
+from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
+
+# Sentinel stored in epoch-day columns for cards that have never been reviewed.
+UNSCHEDULED = int(np.iinfo(np.int64).min)
+
+DEFAULT_EASINESS = 2.5
+
+# Guards ``Deck.version`` against concurrent updates of disjoint cards.
+_VERSION_LOCK = threading.Lock()
+
+
+class CardView:
+    """Lightweight view of a single card stored in a :class:`Deck`.
+
+    Column values are read from the deck on attribute access, so a view never
+    goes stale and costs only a reference and an index.
+
+    Args:
+        deck: The deck holding the card.
+        card: The card index within the deck.
+    """
+
+    __slots__ = ("_card", "_deck")
+
+    def __init__(self, deck: Deck, card: int) -> None:
+        self._deck = deck
+        self._card = card
+
+    def __getattr__(self, name: str) -> Any:
+        """Read the value of a deck column for this card."""
+        if name in self._deck.columns:
+            return getattr(self._deck, name)[self._card].item()
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def __repr__(self) -> str:
+        """Return a representation listing the card's column values."""
+        state = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._deck.columns)
+        return f"{type(self).__name__}({self._card}, {state})"
+
+    @property
+    def card(self) -> int:
+        """The card index within the deck."""
+        return self._card
+
+    @property
+    def due_timestamp(self) -> datetime | None:
+        """The next due timestamp (midnight UTC), or None if never reviewed."""
+        due = int(self._deck.due[self._card])
+        return None if due == UNSCHEDULED else from_epoch_day(due)
+
+    @property
+    def interval_td(self) -> timedelta | None:
+        """The current interval as a timedelta, or None if never reviewed."""
+        if self._deck.due[self._card] == UNSCHEDULED:
+            return None
+        return timedelta(days=int(self._deck.interval[self._card]))
+
+    def compute_next_due_interval(
+        self, attempted_at: datetime, result: int
+    ) -> tuple[datetime, timedelta]:
+        """Calculate the next due timestamp and interval.
+
+        Args:
+            attempted_at: The timestamp of the review attempt.
+            result: The review result, as accepted by the deck's scheduler.
+
+        Returns:
+            A tuple of the next due timestamp and the interval timedelta.
+        """
+        due, interval = self._deck.review_one(self._card, to_epoch_day(attempted_at), result)
+        return from_epoch_day(due), timedelta(days=interval)
+
+    @property
+    def due_day(self) -> int | None:
+        """The epoch day of the next due date, or None if never reviewed."""
+        due = int(self._deck.due[self._card])
+        return None if due == UNSCHEDULED else due
+
+    def compute_next_due_day(self, attempted_day: int, result: int) -> tuple[int, int]:
+        """Calculate the next due epoch day and interval in days.
+
+        Args:
+            attempted_day: The epoch day of the review attempt.
+            result: The review result, as accepted by the deck's scheduler.
+
+        Returns:
+            A tuple of the next due epoch day and the interval in days.
+        """
+        return self._deck.review_one(self._card, attempted_day, result)
+
+
+class Deck(ABC):
+    """Struct-of-arrays store of scheduler state for many cards.
+
+    Every deck has an ``interval`` column (int32 days) and a ``due`` column
+    (int64 epoch days, :data:`UNSCHEDULED` for new cards). Subclasses add the
+    columns of their algorithm and list all of them in ``columns``.
+
+    ``version`` is incremented by every update made through the deck's
+    methods, so derived data can be cached until the deck changes. Code that
+    writes to the columns directly should call :meth:`bump_version` too.
+
+    Args:
+        size: The number of cards.
+    """
+
+    columns: ClassVar[tuple[str, ...]] = ("interval", "due")
+    # The inclusive range of review results accepted by the deck's algorithm.
+    result_range: ClassVar[tuple[int, int]]
+
+    interval: npt.NDArray[np.int32]
+    due: npt.NDArray[np.int64]
+
+    def __init__(self, size: int = 0) -> None:
+        if size < 0:
+            raise ValueError(f"size must be non-negative, got {size}")
+        for name, column in self.allocate(size).items():
+            setattr(self, name, column)
+        self.version = 0
+
+    def bump_version(self) -> None:
+        """Increment ``version`` after the deck's columns have changed.
+
+        The increment is atomic, so threads updating disjoint cards of the
+        same deck never lose a change of version.
+        """
+        with _VERSION_LOCK:
+            self.version += 1
+
+    def __len__(self) -> int:
+        """Return the number of cards in the deck."""
+        return len(self.due)
+
+    def __getitem__(self, card: int) -> CardView:
+        """Return a view of the card at the given index."""
+        if not -len(self) <= card < len(self):
+            raise IndexError(f"card index {card} out of range for deck of size {len(self)}")
+        return CardView(self, card % len(self))
+
+    def resize(self, size: int) -> None:
+        """Grow or shrink the deck; new cards start in their initial state.
+
+        Args:
+            size: The new number of cards.
+        """
+        if size < 0:
+            raise ValueError(f"size must be non-negative, got {size}")
+        keep = min(len(self), size)
+        for name, column in self.allocate(size).items():
+            column[:keep] = getattr(self, name)[:keep]
+            setattr(self, name, column)
+        self.bump_version()
+
+    def with_columns(self, columns: Mapping[str, npt.NDArray[Any]]) -> Self:
+        """Return a deck with this deck's settings over the given column arrays.
+
+        The arrays are used as they are, not copied, so the new deck can keep
+        its state in memory owned elsewhere, such as a shared memory block.
+
+        Args:
+            columns: One 1-D array per name in ``columns``, all of the same
+                length and of the dtypes this deck allocates.
+
+        Returns:
+            A shallow copy of this deck whose columns are ``columns``.
+
+        Raises:
+            ValueError: If a column is missing or has the wrong dtype or shape.
+        """
+        sizes = set()
+        for name, initial in self.allocate(0).items():
+            if name not in columns:
+                raise ValueError(f"missing column {name!r}")
+            column = columns[name]
+            if column.dtype != initial.dtype or column.ndim != 1:
+                raise ValueError(f"column {name!r} must be a 1-D {initial.dtype} array")
+            sizes.add(len(column))
+        if len(sizes) > 1:
+            raise ValueError("columns must all have the same length")
+        deck = copy.copy(self)
+        for name in self.columns:
+            setattr(deck, name, columns[name])
+        return deck
+
+    def review(
+        self,
+        cards: npt.ArrayLike,
+        attempted_at: npt.ArrayLike,
+        results: npt.ArrayLike,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """Apply one review to each of the given cards.
+
+        Inputs are validated once for the whole batch; if validation fails no
+        card is modified.
+
+        Args:
+            cards: Indices of the reviewed cards. Each card may appear at most once.
+            attempted_at: Epoch days of the review attempts.
+            results: The review results, as accepted by the deck's scheduler.
+
+        Returns:
+            A tuple of the new due epoch days and intervals (in days) of the cards.
+
+        Raises:
+            ValueError: If a card index is out of range or repeated, or a result is invalid.
+        """
+        idx = np.asarray(cards, dtype=np.intp)
+        if idx.ndim != 1:
+            raise ValueError("cards must be one-dimensional")
+        if idx.size:
+            if idx.min() < 0 or idx.max() >= len(self):
+                raise ValueError(f"cards must be in [0, {len(self)})")
+            if np.unique(idx).size != idx.size:
+                raise ValueError("cards must not contain duplicates")
+        days = np.broadcast_to(np.asarray(attempted_at, dtype=np.int64), idx.shape)
+        res = np.broadcast_to(np.asarray(results, dtype=np.int64), idx.shape)
+        return self.review_unchecked(idx, days, res)
+
+    def review_unchecked(
+        self,
+        cards: npt.NDArray[np.intp],
+        attempted_at: npt.NDArray[np.int64],
+        results: npt.NDArray[np.int64],
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """Apply one review to each of the given cards, without checking the cards.
+
+        Same as :meth:`review`, for callers that have already checked that the
+        cards are distinct and in range. The results are still validated by
+        the algorithm's kernel.
+
+        Args:
+            cards: Distinct, in-range indices of the reviewed cards.
+            attempted_at: Epoch days of the review attempts, one per card.
+            results: The review results, one per card.
+
+        Returns:
+            A tuple of the new due epoch days and intervals (in days) of the cards.
+        """
+        intervals = self._review(cards, attempted_at, results)
+        prev_due = self.due[cards]
+        due = np.where(prev_due == UNSCHEDULED, attempted_at, prev_due) + intervals
+        self.interval[cards] = intervals
+        self.due[cards] = due
+        self.bump_version()
+        return due, intervals
+
+    def review_one(self, card: int, attempted_at: int, result: int) -> tuple[int, int]:
+        """Apply one review to a single card with the scalar algorithm.
+
+        Args:
+            card: The card index.
+            attempted_at: The epoch day of the review attempt.
+            result: The review result, as accepted by the deck's scheduler.
+
+        Returns:
+            A tuple of the new due epoch day and interval (in days).
+        """
+        interval = self._review_one(card, attempted_at, result)
+        prev_due = int(self.due[card])
+        due = (attempted_at if prev_due == UNSCHEDULED else prev_due) + interval
+        self.interval[card] = interval
+        self.due[card] = due
+        self.bump_version()
+        return due, interval
+
+    def scheduler(self, card: int) -> SpacedRepetitionScheduler:
+        """Materialize a scheduler object for one card, on demand.
+
+        The scheduler starts from the card's stored state, and every review
+        made with it is written back to the deck through its ``on_due_change``
+        hook, so a deck can hold millions of cards while scheduler objects are
+        only built for the cards actually reviewed. The deck stores day
+        resolution: timestamps written back are truncated to epoch days.
+
+        Args:
+            card: The card index.
+
+        Returns:
+            A scheduler of the deck's algorithm and settings.
+        """
+        card = self[card].card
+        scheduler = self._scheduler(card)
+        scheduler.interval = int(self.interval[card])
+        due = int(self.due[card])
+        if due != UNSCHEDULED:
+            scheduler.due_day = due
+        scheduler.on_due_change = functools.partial(self._write_back, card)
+        return scheduler
+
+    def _write_back(self, card: int, scheduler: SpacedRepetitionScheduler) -> None:
+        """Store the state of a scheduler returned by :meth:`scheduler` in the card's row."""
+        due = scheduler.due_day
+        assert due is not None
+        self.interval[card] = scheduler.interval
+        self.due[card] = due
+        self._store(card, scheduler)
+        self.bump_version()
+
+    def allocate(self, size: int) -> dict[str, npt.NDArray[Any]]:
+        """Allocate every column for ``size`` cards in their initial state.
+
+        Args:
+            size: The number of cards.
+
+        Returns:
+            One new array per name in ``columns``, of the dtype the deck uses.
+        """
+        return {
+            "interval": np.zeros(size, dtype=np.int32),
+            "due": np.full(size, UNSCHEDULED, dtype=np.int64),
+        }
+
+    def settings(self) -> dict[str, Any]:
+        """Return the JSON-serializable constructor arguments other than ``size``.
+
+        ``type(deck)(size, **deck.settings())`` builds an empty deck with the
+        same algorithm settings.
+        """
+        return {}
+
+    @abstractmethod
+    def _review(
+        self,
+        cards: npt.NDArray[np.intp],
+        attempted_at: npt.NDArray[np.int64],
+        results: npt.NDArray[np.int64],
+    ) -> npt.NDArray[np.int64]:
+        """Update the algorithm columns of ``cards`` and return their new intervals."""
+
+    @abstractmethod
+    def _review_one(self, card: int, attempted_at: int, result: int) -> int:
+        """Update the algorithm columns of one card and return its new interval."""
+
+    @abstractmethod
+    def _scheduler(self, card: int) -> SpacedRepetitionScheduler:
+        """Return a scheduler with the deck's settings and the card's algorithm state."""
+
+    @abstractmethod
+    def _store(self, card: int, scheduler: Any) -> None:
+        """Write the algorithm state of a scheduler to the card's algorithm columns."""
+
+
+class FSRSDeck(Deck):
+    """Columnar store of FSRS-6 scheduler state.
+
+    Args:
+        size: The number of cards.
+        weights: Tuple of 21 FSRS-6 model weights shared by all cards.
+        request_retention: Target retention probability. Defaults to 0.9.
+        maximum_interval: Maximum allowed interval in days. Defaults to 36500.
+        float_dtype: Floating-point type of the stability and difficulty columns.
+        parameters: Precomputed weights and retention. When given, ``weights``
+            and ``request_retention`` are ignored.
+    """
+
+    columns: ClassVar[tuple[str, ...]] = (
+        "interval",
+        "due",
+        "stability",
+        "difficulty",
+        "last_review",
+    )
+    result_range: ClassVar[tuple[int, int]] = (MIN_RATING, MAX_RATING)
+
+    stability: npt.NDArray[np.floating[Any]]
+    difficulty: npt.NDArray[np.floating[Any]]
+    last_review: npt.NDArray[np.int64]
+
+    def __init__(
+        self,
+        size: int = 0,
+        weights: tuple[float, ...] = DEFAULT_WEIGHTS,
+        request_retention: float = DEFAULT_REQUEST_RETENTION,
+        maximum_interval: int = DEFAULT_MAXIMUM_INTERVAL,
+        float_dtype: npt.DTypeLike = np.float64,
+        parameters: FSRSParameters | None = None,
+    ) -> None:
+        self.parameters = (
+            parameters if parameters is not None else fsrs_parameters(weights, request_retention)
+        )
+        self.maximum_interval = maximum_interval
+        self.float_dtype: np.dtype[Any] = np.dtype(float_dtype)
+        super().__init__(size)
+
+    def allocate(self, size: int) -> dict[str, npt.NDArray[Any]]:
+        """Allocate the base columns and the FSRS memory state columns."""
+        return {
+            **super().allocate(size),
+            "stability": np.zeros(size, dtype=self.float_dtype),
+            "difficulty": np.zeros(size, dtype=self.float_dtype),
+            "last_review": np.full(size, UNSCHEDULED, dtype=np.int64),
+        }
+
+    def settings(self) -> dict[str, Any]:
+        """Return the weights, retention, maximum interval and float dtype."""
+        return {
+            "weights": list(self.weights),
+            "request_retention": self.request_retention,
+            "maximum_interval": self.maximum_interval,
+            "float_dtype": self.float_dtype.str,
+        }
+
+    @property
+    def weights(self) -> tuple[float, ...]:
+        """Tuple of 21 FSRS-6 model weights shared by all cards."""
+        return self.parameters.weights
+
+    @property
+    def request_retention(self) -> float:
+        """Target retention probability."""
+        return self.parameters.request_retention
+
+    def _review(
+        self,
+        cards: npt.NDArray[np.intp],
+        attempted_at: npt.NDArray[np.int64],
+        results: npt.NDArray[np.int64],
+    ) -> npt.NDArray[np.int64]:
+        last_review = self.last_review[cards]
+        elapsed_days = np.where(
+            last_review == UNSCHEDULED, 0, np.maximum(attempted_at - last_review, 0)
+        )
+        stability, difficulty, intervals = fsrs_batch(
+            ratings=results,
+            stabilities=self.stability[cards],
+            difficulties=self.difficulty[cards],
+            elapsed_days=elapsed_days,
+            maximum_interval=self.maximum_interval,
+            parameters=self.parameters,
+        )
+        self.stability[cards] = stability
+        self.difficulty[cards] = difficulty
+        self.last_review[cards] = attempted_at
+        return intervals
+
+    def _review_one(self, card: int, attempted_at: int, result: int) -> int:
+        last_review = int(self.last_review[card])
+        elapsed_days = 0 if last_review == UNSCHEDULED else max(attempted_at - last_review, 0)
+        stability, difficulty, interval = fsrs(
+            rating=result,
+            stability=float(self.stability[card]),
+            difficulty=float(self.difficulty[card]),
+            elapsed_days=elapsed_days,
+            maximum_interval=self.maximum_interval,
+            parameters=self.parameters,
+        )
+        self.stability[card] = stability
+        self.difficulty[card] = difficulty
+        self.last_review[card] = attempted_at
+        return interval
+
+    def _scheduler(self, card: int) -> FSRSScheduler:
+        scheduler = FSRSScheduler(
+            stability=float(self.stability[card]),
+            difficulty=float(self.difficulty[card]),
+            maximum_interval=self.maximum_interval,
+            parameters=self.parameters,
+        )
+        last_review = int(self.last_review[card])
+        if last_review != UNSCHEDULED:
+            scheduler.last_review_day = last_review
+        return scheduler
+
+    def _store(self, card: int, scheduler: FSRSScheduler) -> None:
+        last_review = scheduler.last_review_day
+        assert last_review is not None
+        self.stability[card] = scheduler.stability
+        self.difficulty[card] = scheduler.difficulty
+        self.last_review[card] = last_review
+
+
+class SM2Deck(Deck):
+    """Columnar store of SM-2 scheduler state.
+
+    Args:
+        size: The number of cards.
+        float_dtype: Floating-point type of the easiness column.
+    """
+
+    columns: ClassVar[tuple[str, ...]] = ("interval", "due", "easiness", "repetitions")
+    result_range: ClassVar[tuple[int, int]] = (MIN_QUALITY, MAX_QUALITY)
+
+    easiness: npt.NDArray[np.floating[Any]]
+    repetitions: npt.NDArray[np.int32]
+
+    def __init__(self, size: int = 0, float_dtype: npt.DTypeLike = np.float64) -> None:
+        self.float_dtype: np.dtype[Any] = np.dtype(float_dtype)
+        super().__init__(size)
+
+    def allocate(self, size: int) -> dict[str, npt.NDArray[Any]]:
+        """Allocate the base columns and the SM-2 easiness and repetitions columns."""
+        return {
+            **super().allocate(size),
+            "easiness": np.full(size, DEFAULT_EASINESS, dtype=self.float_dtype),
+            "repetitions": np.zeros(size, dtype=np.int32),
+        }
+
+    def settings(self) -> dict[str, Any]:
+        """Return the float dtype."""
+        return {"float_dtype": self.float_dtype.str}
+
+    def _review(
+        self,
+        cards: npt.NDArray[np.intp],
+        attempted_at: npt.NDArray[np.int64],
+        results: npt.NDArray[np.int64],
+    ) -> npt.NDArray[np.int64]:
+        intervals, repetitions, easiness = sm2_batch(
+            quality=results,
+            interval=self.interval[cards],
+            repetitions=self.repetitions[cards],
+            easiness=self.easiness[cards],
+        )
+        self.repetitions[cards] = repetitions
+        self.easiness[cards] = easiness
+        return intervals
+
+    def _review_one(self, card: int, attempted_at: int, result: int) -> int:
+        interval, repetitions, easiness = sm2(
+            result,
+            int(self.interval[card]),
+            int(self.repetitions[card]),
+            float(self.easiness[card]),
+        )
+        self.repetitions[card] = repetitions
+        self.easiness[card] = easiness
+        return interval
+
+    def _scheduler(self, card: int) -> SM2Scheduler:
+        return SM2Scheduler(
+            easiness=float(self.easiness[card]), repetitions=int(self.repetitions[card])
+        )
+
+    def _store(self, card: int, scheduler: SM2Scheduler) -> None:
+        self.easiness[card] = scheduler.easiness
+        self.repetitions[card] = scheduler.repetitions
+
+
+class LeitnerDeck(Deck):
+    """Columnar store of Leitner system scheduler state.
+
+    Args:
+        size: The number of cards.
+        intervals: Review intervals (in days) for each box. Defaults to [1, 3, 7, 14, 30].
+    """
+
+    columns: ClassVar[tuple[str, ...]] = ("interval", "due", "box")
+    result_range: ClassVar[tuple[int, int]] = (MIN_RESULT, MAX_RESULT)
+
+    box: npt.NDArray[np.int32]
+
+    def __init__(self, size: int = 0, intervals: list[int] | None = None) -> None:
+        self.intervals = intervals if intervals is not None else list(DEFAULT_INTERVALS)
+        if not self.intervals:
+            raise ValueError("intervals must not be empty")
+        if any(i <= 0 for i in self.intervals):
+            raise ValueError("all intervals must be positive")
+        self.num_boxes = len(self.intervals)
+        super().__init__(size)
+
+    def allocate(self, size: int) -> dict[str, npt.NDArray[Any]]:
+        """Allocate the base columns and the box column."""
+        return {**super().allocate(size), "box": np.zeros(size, dtype=np.int32)}
+
+    def settings(self) -> dict[str, Any]:
+        """Return the box intervals."""
+        return {"intervals": list(self.intervals)}
+
+    def _review(
+        self,
+        cards: npt.NDArray[np.intp],
+        attempted_at: npt.NDArray[np.int64],
+        results: npt.NDArray[np.int64],
+    ) -> npt.NDArray[np.int64]:
+        if results.size and (results.min() < MIN_RESULT or results.max() > MAX_RESULT):
+            raise ValueError(f"results must be {MIN_RESULT} or {MAX_RESULT}")
+        # The box column only ever holds valid boxes, so the update is a pure gather.
+        boxes = leitner_transitions(self.num_boxes)[self.box[cards], results]
+        self.box[cards] = boxes
+        return np.asarray(self.intervals, dtype=np.int64)[boxes]
+
+    def _review_one(self, card: int, attempted_at: int, result: int) -> int:
+        if result not in (MIN_RESULT, MAX_RESULT):
+            raise ValueError(f"result must be {MIN_RESULT} or {MAX_RESULT}, got {result}")
+        box = int(leitner_transitions(self.num_boxes)[self.box[card], result])
+        self.box[card] = box
+        return self.intervals[box]
+
+    def _scheduler(self, card: int) -> LeitnerScheduler:
+        return LeitnerScheduler(intervals=list(self.intervals), current_box=int(self.box[card]))
+
+    def _store(self, card: int, scheduler: LeitnerScheduler) -> None:
+        self.box[card] = scheduler.current_box
+
+
+def deck_for(scheduler: SpacedRepetitionScheduler, size: int = 0) -> Deck:
+    """Return an empty deck for the algorithm and settings of a scheduler.
+
+    Args:
+        scheduler: A scheduler whose settings (weights, retention, intervals)
+            the deck takes over. Its own card state is ignored.
+        size: The number of cards.
+
+    Returns:
+        An :class:`FSRSDeck`, :class:`SM2Deck` or :class:`LeitnerDeck`.
+
+    Raises:
+        TypeError: If the scheduler type has no columnar deck.
+    """
+    if isinstance(scheduler, FSRSScheduler):
+        return FSRSDeck(
+            size, maximum_interval=scheduler.maximum_interval, parameters=scheduler.parameters
+        )
+    if isinstance(scheduler, SM2Scheduler):
+        return SM2Deck(size)
+    if isinstance(scheduler, LeitnerScheduler):
+        return LeitnerDeck(size, intervals=list(scheduler.intervals))
+    raise TypeError(f"no deck type for {type(scheduler).__name__}")
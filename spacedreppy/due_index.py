@@ -0,0 +1,192 @@
+"""Due-date index answering "which cards are due next" without scanning every card.
+
+Cards are kept in buckets keyed by due timestamp. The distinct timestamps are
+held in a sorted list and each bucket keeps its card ids sorted, so queries
+locate their starting point by binary search and then walk forward only over
+the entries they return. Tracked schedulers report every change of their due
+timestamp through :attr:`SpacedRepetitionScheduler.on_due_change`, which keeps
+the index up to date incrementally.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable, Iterator
+from datetime import datetime
+from functools import partial
+from typing import Generic, TypeVar
+
+from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
+
+CardId = TypeVar("CardId", int, str)
+
+
+class DueIndex(Generic[CardId]):
+    """Index of cards ordered by ``(due_timestamp, card_id)``.
+
+    Cards whose due timestamp is None (never reviewed) are tracked but not
+    queued. All due timestamps in one index must be mutually comparable, i.e.
+    either all naive or all timezone-aware.
+    """
+
+    def __init__(self) -> None:
+        self._keys: list[datetime] = []
+        self._buckets: dict[datetime, list[CardId]] = {}
+        self._due: dict[CardId, datetime | None] = {}
+        self._schedulers: dict[CardId, SpacedRepetitionScheduler] = {}
+        # The hook each tracked scheduler had before, called ahead of the index update.
+        self._chained: dict[CardId, Callable[[SpacedRepetitionScheduler], None] | None] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of queued (scheduled) cards."""
+        return self._size
+
+    def __contains__(self, card_id: object) -> bool:
+        """Return whether the card is known to the index."""
+        return card_id in self._due
+
+    def track(self, card_id: CardId, scheduler: SpacedRepetitionScheduler) -> None:
+        """Index a scheduler and follow every later change of its due timestamp.
+
+        Args:
+            card_id: The id under which the card is reported by queries.
+            scheduler: The card's scheduler. Its ``on_due_change`` hook is
+                replaced by one that calls the previous hook, if any, and then
+                updates the index.
+
+        Raises:
+            ValueError: If the card id is already tracked.
+        """
+        if card_id in self._schedulers:
+            raise ValueError(f"card {card_id!r} is already tracked")
+        self._schedulers[card_id] = scheduler
+        self._chained[card_id] = scheduler.on_due_change
+        scheduler.on_due_change = partial(self._on_due_change, card_id)
+        self.update(card_id, scheduler.due_timestamp)
+
+    def untrack(self, card_id: CardId) -> None:
+        """Remove a card from the index and detach it from its scheduler, if any.
+
+        The scheduler gets back the ``on_due_change`` hook it had when tracked.
+
+        Args:
+            card_id: The card to remove.
+
+        Raises:
+            KeyError: If the card is not in the index.
+        """
+        self._unqueue(card_id, self._due.pop(card_id))
+        scheduler = self._schedulers.pop(card_id, None)
+        if scheduler is not None:
+            scheduler.on_due_change = self._chained.pop(card_id)
+
+    def update(self, card_id: CardId, due_timestamp: datetime | None) -> None:
+        """Insert a card or move it to a new due timestamp.
+
+        Use this directly for cards whose state lives outside a tracked scheduler.
+
+        Args:
+            card_id: The card to insert or move.
+            due_timestamp: The new due timestamp, or None to dequeue the card.
+        """
+        if card_id in self._due:
+            old = self._due[card_id]
+            if old == due_timestamp:
+                return
+            self._unqueue(card_id, old)
+        self._due[card_id] = due_timestamp
+        if due_timestamp is None:
+            return
+        self._size += 1
+        bucket = self._buckets.get(due_timestamp)
+        if bucket is None:
+            insort(self._keys, due_timestamp)
+            self._buckets[due_timestamp] = [card_id]
+        else:
+            insort(bucket, card_id)
+
+    def due_timestamp(self, card_id: CardId) -> datetime | None:
+        """Return the indexed due timestamp of a card.
+
+        Raises:
+            KeyError: If the card is not in the index.
+        """
+        return self._due[card_id]
+
+    def next_due(
+        self, k: int, after: tuple[CardId, datetime] | None = None
+    ) -> list[tuple[CardId, datetime]]:
+        """Return the next ``k`` due cards in ``(due_timestamp, card_id)`` order.
+
+        Args:
+            k: The maximum number of cards to return.
+            after: A ``(card_id, due_timestamp)`` entry from a previous page; only
+                cards ordered strictly after it are returned.
+
+        Returns:
+            A list of ``(card_id, due_timestamp)`` pairs.
+        """
+        entries: list[tuple[CardId, datetime]] = []
+        for entry in self._iter(after):
+            if len(entries) >= k:
+                break
+            entries.append(entry)
+        return entries
+
+    def due_before(
+        self,
+        timestamp: datetime,
+        limit: int | None = None,
+        after: tuple[CardId, datetime] | None = None,
+    ) -> list[tuple[CardId, datetime]]:
+        """Return the cards due strictly before ``timestamp``, earliest first.
+
+        Args:
+            timestamp: The exclusive upper bound on due timestamps.
+            limit: The maximum number of cards to return. Defaults to no limit.
+            after: A ``(card_id, due_timestamp)`` entry from a previous page; only
+                cards ordered strictly after it are returned.
+
+        Returns:
+            A list of ``(card_id, due_timestamp)`` pairs.
+        """
+        entries: list[tuple[CardId, datetime]] = []
+        for card_id, due in self._iter(after):
+            if due >= timestamp or (limit is not None and len(entries) >= limit):
+                break
+            entries.append((card_id, due))
+        return entries
+
+    def _iter(self, after: tuple[CardId, datetime] | None) -> Iterator[tuple[CardId, datetime]]:
+        """Yield queued entries in order, starting strictly after ``after``."""
+        if after is None:
+            start, offset = 0, 0
+        else:
+            after_id, after_due = after
+            start = bisect_left(self._keys, after_due)
+            if start < len(self._keys) and self._keys[start] == after_due:
+                offset = bisect_right(self._buckets[after_due], after_id)
+            else:
+                offset = 0
+        for i in range(start, len(self._keys)):
+            due = self._keys[i]
+            bucket = self._buckets[due]
+            for j in range(offset if i == start else 0, len(bucket)):
+                yield bucket[j], due
+
+    def _unqueue(self, card_id: CardId, due_timestamp: datetime | None) -> None:
+        if due_timestamp is None:
+            return
+        self._size -= 1
+        bucket = self._buckets[due_timestamp]
+        del bucket[bisect_left(bucket, card_id)]
+        if not bucket:
+            del self._buckets[due_timestamp]
+            del self._keys[bisect_left(self._keys, due_timestamp)]
+
+    def _on_due_change(self, card_id: CardId, scheduler: SpacedRepetitionScheduler) -> None:
+        chained = self._chained[card_id]
+        if chained is not None:
+            chained(scheduler)
+        self.update(card_id, scheduler.due_timestamp)
@@ -0,0 +1,74 @@
+"""Conversions between timestamps and integer epoch days.
+
+Columnar stores keep due dates as whole days since the Unix epoch
+(1970-01-01 UTC). Naive datetimes are interpreted as UTC.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import numpy.typing as npt
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+SECONDS_PER_DAY = 86400
+
+
+def to_epoch_day(timestamp: datetime) -> int:
+    """Convert a timestamp to the number of whole days since the epoch.
+
+    Args:
+        timestamp: The timestamp to convert. Naive datetimes are treated as UTC.
+
+    Returns:
+        The epoch day containing the timestamp.
+    """
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=UTC)
+    return (timestamp - EPOCH).days
+
+
+def from_epoch_day(day: int) -> datetime:
+    """Convert an epoch day to a timezone-aware timestamp at midnight UTC.
+
+    Args:
+        day: The number of days since the epoch.
+
+    Returns:
+        The UTC timestamp at the start of the day.
+    """
+    return EPOCH + timedelta(days=day)
+
+
+def as_epoch_day(at: datetime | int | None = None) -> int:
+    """Resolve a timestamp, an epoch day or nothing to an epoch day.
+
+    Args:
+        at: A timestamp, converted with :func:`to_epoch_day`; an epoch day,
+            returned as is; or None for today (UTC).
+
+    Returns:
+        The epoch day.
+    """
+    if at is None:
+        return to_epoch_day(datetime.now(UTC))
+    if isinstance(at, datetime):
+        return to_epoch_day(at)
+    return at
+
+
+def to_epoch_days(timestamps: npt.ArrayLike) -> npt.NDArray[np.int64]:
+    """Convert an array of timestamps to epoch days.
+
+    Args:
+        timestamps: ``datetime64`` values, numbers of seconds since the epoch,
+            or ``datetime`` objects (converted one by one, so slower).
+
+    Returns:
+        The epoch day containing each timestamp.
+    """
+    ts = np.asarray(timestamps)
+    if ts.dtype.kind == "M":
+        return ts.astype("datetime64[D]").astype(np.int64)
+    if ts.dtype.kind == "O":
+        return np.array([to_epoch_day(t) for t in ts.ravel()], dtype=np.int64).reshape(ts.shape)
+    return np.floor_divide(ts.astype(np.float64), SECONDS_PER_DAY).astype(np.int64)
@@ -0,0 +1,284 @@
+"""Opt-in instrumentation of the scheduler hot path.
+
+:func:`enable` swaps instrumented wrappers into the scheduler classes and
+modules, and :func:`disable` puts the originals back, so instrumentation costs
+nothing while it is off: no flag is checked on any call. While it is on, every
+review reports to a :class:`Sink`:
+
+* ``<Scheduler>.review``: the duration of ``compute_next_due_interval`` or
+  ``compute_next_due_day``, and the counters ``<Scheduler>.reviews`` and
+  ``<Scheduler>.errors``.
+* ``<algorithm>.update``: the duration of the state update, validation
+  included; ``<algorithm>.algorithm``: the unchecked algorithm alone. The
+  algorithms are ``fsrs``, ``sm2`` and ``leitner``.
+* ``fsrs.new``, ``fsrs.same_day`` and ``fsrs.regular``: counts of the branches
+  taken by the FSRS algorithm.
+
+So validation takes ``update - algorithm`` and the timestamp and timedelta
+arithmetic about ``review - update``. Durations are in nanoseconds. The module
+functions are instrumented where the schedulers look them up, so calls through
+names imported before :func:`enable` (``from ... import fsrs``) are not counted.
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from spacedreppy.schedulers import fsrs as fsrs_module
+from spacedreppy.schedulers import leitner as leitner_module
+from spacedreppy.schedulers import sm2 as sm2_module
+from spacedreppy.schedulers.fsrs import FSRSParameters
+from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
+
+
+class Sink(Protocol):
+    """Receives the counters and durations reported while instrumentation is on."""
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add ``value`` to the counter ``name``."""
+
+    def observe(self, name: str, nanoseconds: int) -> None:
+        """Record one duration of the timer ``name``."""
+
+
+@dataclass(slots=True)
+class Histogram:
+    """Durations bucketed by powers of two nanoseconds.
+
+    Bucket ``b`` counts the durations in ``[2**(b-1), 2**b)`` nanoseconds.
+    """
+
+    count: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+    buckets: dict[int, int] = field(default_factory=dict)
+
+    def add(self, nanoseconds: int) -> None:
+        """Record one duration."""
+        self.count += 1
+        self.total_ns += nanoseconds
+        self.max_ns = max(self.max_ns, nanoseconds)
+        bucket = nanoseconds.bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    @property
+    def mean_ns(self) -> float:
+        """The mean duration, 0 without durations."""
+        return self.total_ns / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> int:
+        """Return an upper bound of the ``q``-th percentile (0-100), exact to a factor of 2."""
+        rank = q / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(1 << bucket, self.max_ns)
+        return self.max_ns
+
+
+class MetricsRecorder:
+    """A thread-safe in-memory :class:`Sink` of counters and histograms."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counters: dict[str, int] = {}
+        self.histograms: dict[str, Histogram] = {}
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add ``value`` to the counter ``name``."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, nanoseconds: int) -> None:
+        """Record one duration of the timer ``name``."""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(nanoseconds)
+
+    def reset(self) -> None:
+        """Drop every counter and histogram."""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the counters and a summary of each histogram, as plain values."""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "timers": {
+                    name: {
+                        "count": h.count,
+                        "mean_ns": h.mean_ns,
+                        "p50_ns": h.percentile(50),
+                        "p99_ns": h.percentile(99),
+                        "max_ns": h.max_ns,
+                    }
+                    for name, h in self.histograms.items()
+                },
+            }
+
+
+# Nesting depth of update spans on the current thread.
+_local = threading.local()
+# (owner, attribute, original) of every patched attribute, while enabled.
+_patched: list[tuple[Any, str, Any]] = []
+_enable_lock = threading.Lock()
+
+
+def _review(sink: Sink, original: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(original)
+    def review(self: SpacedRepetitionScheduler, *args: Any, **kwargs: Any) -> Any:
+        name = type(self).__name__
+        start = time.perf_counter_ns()
+        try:
+            due = original(self, *args, **kwargs)
+        except Exception:
+            sink.count(f"{name}.errors")
+            raise
+        sink.observe(f"{name}.review", time.perf_counter_ns() - start)
+        sink.count(f"{name}.reviews")
+        return due
+
+    return review
+
+
+def _update(sink: Sink, name: str, original: Callable[..., Any]) -> Callable[..., Any]:
+    """Time a validating update step, which calls the algorithm."""
+
+    @functools.wraps(original)
+    def update(*args: Any, **kwargs: Any) -> Any:
+        depth = getattr(_local, "depth", 0)
+        _local.depth = depth + 1
+        start = time.perf_counter_ns()
+        try:
+            result = original(*args, **kwargs)
+        finally:
+            _local.depth = depth
+        sink.observe(f"{name}.update", time.perf_counter_ns() - start)
+        return result
+
+    return update
+
+
+def _algorithm(sink: Sink, name: str, original: Callable[..., Any]) -> Callable[..., Any]:
+    """Time an unchecked algorithm; called directly, it is the whole update step."""
+
+    @functools.wraps(original)
+    def algorithm(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter_ns()
+        result = original(*args, **kwargs)
+        elapsed = time.perf_counter_ns() - start
+        sink.observe(f"{name}.algorithm", elapsed)
+        if not getattr(_local, "depth", 0):
+            sink.observe(f"{name}.update", elapsed)
+        return result
+
+    return algorithm
+
+
+def _fsrs_branches(sink: Sink, original: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(original)
+    def fsrs_unchecked(
+        rating: int,
+        stability: float,
+        difficulty: float,
+        elapsed_days: float,
+        parameters: FSRSParameters,
+        maximum_interval: int = fsrs_module.DEFAULT_MAXIMUM_INTERVAL,
+    ) -> tuple[float, float, int]:
+        if stability == 0:
+            sink.count("fsrs.new")
+        elif elapsed_days == 0:
+            sink.count("fsrs.same_day")
+        else:
+            sink.count("fsrs.regular")
+        return original(  # type: ignore[no-any-return]
+            rating, stability, difficulty, elapsed_days, parameters, maximum_interval
+        )
+
+    return fsrs_unchecked
+
+
+def enabled() -> bool:
+    """Return whether instrumentation is on."""
+    return bool(_patched)
+
+
+def enable(sink: Sink | None = None) -> Sink:
+    """Turn instrumentation on, reporting to ``sink``.
+
+    Args:
+        sink: Where to report. Defaults to a new :class:`MetricsRecorder`.
+
+    Returns:
+        The sink.
+
+    Raises:
+        RuntimeError: If instrumentation is already on.
+    """
+    sink = sink if sink is not None else MetricsRecorder()
+    with _enable_lock:
+        if _patched:
+            raise RuntimeError("instrumentation is already enabled")
+        fsrs_unchecked = _fsrs_branches(sink, fsrs_module.fsrs_unchecked)
+        patches: list[tuple[Any, str, Callable[..., Any]]] = [
+            (
+                SpacedRepetitionScheduler,
+                "compute_next_due_interval",
+                _review(sink, SpacedRepetitionScheduler.compute_next_due_interval),
+            ),
+            (
+                SpacedRepetitionScheduler,
+                "compute_next_due_day",
+                _review(sink, SpacedRepetitionScheduler.compute_next_due_day),
+            ),
+            (fsrs_module, "fsrs", _update(sink, "fsrs", fsrs_module.fsrs)),
+            (fsrs_module, "fsrs_unchecked", _algorithm(sink, "fsrs", fsrs_unchecked)),
+            (sm2_module, "sm2", _update(sink, "sm2", sm2_module.sm2)),
+            (sm2_module, "sm2_unchecked", _algorithm(sink, "sm2", sm2_module.sm2_unchecked)),
+            (leitner_module, "leitner", _update(sink, "leitner", leitner_module.leitner)),
+            (
+                leitner_module,
+                "leitner_unchecked",
+                _algorithm(sink, "leitner", leitner_module.leitner_unchecked),
+            ),
+        ]
+        for owner, attribute, wrapper in patches:
+            _patched.append((owner, attribute, owner.__dict__[attribute]))
+            setattr(owner, attribute, wrapper)
+    return sink
+
+
+def disable() -> None:
+    """Turn instrumentation off, restoring the uninstrumented code. Does nothing if off."""
+    with _enable_lock:
+        while _patched:
+            owner, attribute, original = _patched.pop()
+            setattr(owner, attribute, original)
+
+
+@contextmanager
+def instrument(sink: Sink | None = None) -> Iterator[Sink]:
+    """Turn instrumentation on for the duration of a ``with`` block.
+
+    Args:
+        sink: Where to report. Defaults to a new :class:`MetricsRecorder`.
+
+    Yields:
+        The sink.
+    """
+    active = enable(sink)
+    try:
+        yield active
+    finally:
+        disable()
@@ -0,0 +1,200 @@
+"""Due dates spread across days by projected load.
+
+A scheduler picks each card's due date on its own, so cards learned together
+keep coming back together and the daily review count swings from day to day.
+:class:`LoadBalancer` reviews the cards of a deck and moves each new due date,
+within a fuzz window around it (see :func:`fuzz_window`), to the day with the
+fewest cards already due. The moved date becomes the card's interval, as if the
+scheduler had picked it.
+
+The balancer keeps a histogram of the cards due on each day and updates it
+with every review, so a review costs O(window) rather than a scan of the deck.
+The histogram is rebuilt when the deck is changed by anything else, which is
+detected with the deck's ``version``.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import numpy.typing as npt
+
+from spacedreppy.deck import UNSCHEDULED, Deck, FSRSDeck
+
+# (start, end, factor): each day of the interval within [start, end) widens
+# the window by ``factor`` days on each side, after a base of one day.
+FUZZ_RANGES = ((2.5, 7.0, 0.15), (7.0, 20.0, 0.1), (20.0, math.inf, 0.05))
+MIN_FUZZED_INTERVAL = 2
+
+
+def fuzz_window(interval: int, maximum_interval: int | None = None) -> tuple[int, int]:
+    """Return the shortest and longest interval a card due in ``interval`` days may get.
+
+    Intervals under 2.5 days are not fuzzed. Longer ones may move by about 15%
+    up to a week, then 10% up to 20 days and 5% beyond, as in FSRS's fuzz.
+
+    Args:
+        interval: The interval picked by the scheduler, in days.
+        maximum_interval: The longest interval allowed, if any.
+
+    Returns:
+        The inclusive range of intervals, which contains ``interval``.
+    """
+    if interval < FUZZ_RANGES[0][0]:
+        return interval, interval
+    delta = 1.0 + sum(
+        factor * max(min(interval, end) - start, 0.0) for start, end, factor in FUZZ_RANGES
+    )
+    low = min(max(MIN_FUZZED_INTERVAL, round(interval - delta)), interval)
+    high = round(interval + delta)
+    if maximum_interval is not None:
+        high = max(min(high, maximum_interval), interval)
+    return low, high
+
+
+class LoadBalancer:
+    """Reviews of a deck with due dates balanced across days.
+
+    Among the days of a card's fuzz window, the one with the fewest cards due
+    is picked, the closest to the scheduled due date on ties.
+
+    Args:
+        deck: The deck to review. Its existing due dates seed the histogram.
+    """
+
+    def __init__(self, deck: Deck) -> None:
+        self.deck = deck
+        self._maximum_interval = deck.maximum_interval if isinstance(deck, FSRSDeck) else None
+        # _counts[i] is the number of cards due on day _origin + i.
+        self._origin = 0
+        self._counts: npt.NDArray[np.int64] = np.zeros(0, dtype=np.int64)
+        self._version = -1
+        self._sync()
+
+    def load(self, day: int) -> int:
+        """Return the number of cards due on an epoch day."""
+        self._sync()
+        i = day - self._origin
+        return int(self._counts[i]) if 0 <= i < len(self._counts) else 0
+
+    def loads(self, start: int, days: int) -> npt.NDArray[np.int64]:
+        """Return the number of cards due on each of ``days`` days from epoch day ``start``."""
+        self._sync()
+        self._reserve(start, start + days)
+        i = start - self._origin
+        return self._counts[i : i + days].copy()
+
+    def review_one(self, card: int, attempted_at: int, result: int) -> tuple[int, int]:
+        """Review one card, as :meth:`Deck.review_one`, and balance its due date.
+
+        Args:
+            card: The card index.
+            attempted_at: The epoch day of the review attempt.
+            result: The review result, as accepted by the deck's scheduler.
+
+        Returns:
+            A tuple of the balanced due epoch day and the resulting interval.
+
+        Raises:
+            ValueError: If the card index is out of range or the result is
+                invalid. Nothing is changed then.
+        """
+        self._sync()
+        if not 0 <= card < len(self.deck):
+            raise ValueError(f"card must be in [0, {len(self.deck)}), got {card}")
+        previous = int(self.deck.due[card])
+        due, interval = self.deck.review_one(card, attempted_at, result)
+        if previous != UNSCHEDULED:
+            self._counts[previous - self._origin] -= 1
+        balanced = self._place(card, due, interval)
+        self._version = self.deck.version
+        return balanced, interval + balanced - due
+
+    def review(
+        self, cards: npt.ArrayLike, attempted_at: npt.ArrayLike, results: npt.ArrayLike
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """Review cards, as :meth:`Deck.review`, and balance their due dates.
+
+        The batch is reviewed with the batch kernels, then the cards are placed
+        one by one in the given order, each seeing the load of those before it.
+
+        Args:
+            cards: Indices of the reviewed cards. Each card may appear at most once.
+            attempted_at: Epoch days of the review attempts.
+            results: The review results, as accepted by the deck's scheduler.
+
+        Returns:
+            A tuple of the balanced due epoch days and resulting intervals.
+
+        Raises:
+            ValueError: If a card index is out of range or repeated, or a result
+                is invalid. Nothing is changed then.
+        """
+        self._sync()
+        idx = np.asarray(cards, dtype=np.intp)
+        if idx.size and (idx.min() < 0 or idx.max() >= len(self.deck)):
+            raise ValueError(f"cards must be in [0, {len(self.deck)})")
+        previous = self.deck.due[idx]
+        due, intervals = self.deck.review(idx, attempted_at, results)
+        scheduled = previous[previous != UNSCHEDULED]
+        np.subtract.at(self._counts, scheduled - self._origin, 1)
+        balanced = np.array(
+            [
+                self._place(card, day, interval)
+                for card, day, interval in zip(
+                    idx.tolist(), due.tolist(), intervals.tolist(), strict=True
+                )
+            ],
+            dtype=np.int64,
+        )
+        self._version = self.deck.version
+        return balanced, intervals + (balanced - due)
+
+    def _place(self, card: int, due: int, interval: int) -> int:
+        """Move a reviewed card to the least loaded day of its window and count it there."""
+        low, high = fuzz_window(interval, self._maximum_interval)
+        start, end = due - (interval - low), due + (high - interval) + 1
+        self._reserve(start, end)
+        i = start - self._origin
+        window = self._counts[i : i + end - start]
+        if len(window) > 1:
+            # Least load first, then the smallest move from the scheduled day.
+            distance = np.abs(np.arange(start - due, end - due))
+            day = start + int(np.argmin(window * len(window) + distance))
+        else:
+            day = due
+        self._counts[day - self._origin] += 1
+        if day != due:
+            self.deck.due[card] = day
+            self.deck.interval[card] = interval + day - due
+            self.deck.bump_version()
+        return day
+
+    def _reserve(self, start: int, end: int) -> None:
+        """Grow the histogram to cover the days in ``[start, end)``."""
+        low, high = self._origin, self._origin + len(self._counts)
+        if low <= start and end <= high:
+            return
+        if not len(self._counts):
+            low, high = start, end
+        # Grow by half the size on the side that grows, so a stream of new days is amortized.
+        pad = len(self._counts) // 2
+        first = min(low, start - pad) if start < low else low
+        last = max(high, end + pad) if end > high else high
+        counts = np.zeros(last - first, dtype=np.int64)
+        offset = self._origin - first
+        counts[offset : offset + len(self._counts)] = self._counts
+        self._origin, self._counts = first, counts
+
+    def _sync(self) -> None:
+        """Rebuild the histogram if the deck changed since the last update."""
+        if self._version == self.deck.version:
+            return
+        due = self.deck.due[self.deck.due != UNSCHEDULED]
+        if due.size:
+            self._origin = int(due.min())
+            self._counts = np.bincount(due - self._origin).astype(np.int64)
+        else:
+            self._origin, self._counts = 0, np.zeros(0, dtype=np.int64)
+        self._version = self.deck.version
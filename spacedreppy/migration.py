@@ -0,0 +1,253 @@
+"""Conversion of SM-2 and Leitner card state to FSRS-6.
+
+:func:`migrate_to_fsrs` turns an :class:`~spacedreppy.deck.SM2Deck` or
+:class:`~spacedreppy.deck.LeitnerDeck` into an
+:class:`~spacedreppy.deck.FSRSDeck` in a few vectorized passes, without a
+review history. Each scheduled card keeps its due date and interval and gets
+an estimated memory state:
+
+* Stability: the old scheduler is assumed to have spaced the card so that it
+  would be recalled with probability ``source_retention`` at the end of its
+  interval, and the stability is the one for which the FSRS-6 forgetting curve
+  agrees.
+* Difficulty: the one for which a Good review, at that retention, multiplies
+  the stability by the card's ease, as SM-2 multiplies the interval by its
+  easiness. A Leitner card's ease is the growth of the interval from its box
+  to the next.
+
+Cards never reviewed become new FSRS cards.
+
+A partial review log refines the estimate. For every card whose log reaches
+its last review, the interval between its first two logged reviews is taken as
+the interval the old scheduler gave at the first one, and the later logged
+reviews are replayed through FSRS from there; so the card's stability follows
+its actual recent ratings and delays, and it is rescheduled by FSRS.
+:func:`migrate_scheduler` converts a single scheduler object.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import timedelta
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from spacedreppy.deck import UNSCHEDULED, FSRSDeck, LeitnerDeck, SM2Deck
+from spacedreppy.replay import as_review_log, replay_reviews
+from spacedreppy.schedulers.fsrs import (
+    AGAIN,
+    DEFAULT_MAXIMUM_INTERVAL,
+    EASY,
+    GOOD,
+    HARD,
+    MAX_DIFFICULTY,
+    MIN_DIFFICULTY,
+    MIN_STABILITY,
+    FSRSParameters,
+    FSRSScheduler,
+    fsrs_parameters,
+)
+from spacedreppy.schedulers.leitner import LeitnerScheduler
+from spacedreppy.schedulers.sm2 import SM2Scheduler
+
+DEFAULT_SOURCE_RETENTION = 0.9
+
+# The FSRS rating of each SM-2 quality and Leitner result, from the lowest.
+_SM2_RATINGS = np.array([AGAIN, AGAIN, AGAIN, HARD, GOOD, EASY])
+_LEITNER_RATINGS = np.array([AGAIN, GOOD])
+
+
+def _stability(
+    interval: npt.NDArray[Any], source_retention: float, p: FSRSParameters
+) -> npt.NDArray[np.float64]:
+    """Return the stability at which recall after ``interval`` days is ``source_retention``."""
+    scale = p.factor / (source_retention ** (1 / p.decay) - 1)
+    stability: npt.NDArray[np.float64] = np.maximum(
+        np.asarray(interval, dtype=np.float64) * scale, MIN_STABILITY
+    )
+    return stability
+
+
+def _difficulty(
+    ease: npt.NDArray[Any],
+    stability: npt.NDArray[np.float64],
+    source_retention: float,
+    p: FSRSParameters,
+) -> npt.NDArray[np.float64]:
+    """Return the difficulty at which a Good review multiplies ``stability`` by ``ease``.
+
+    Inverts S' / S = 1 + e^w8 * (11 - D) * S^-w9 * (e^(w10 * (1 - R)) - 1).
+    """
+    w = p.weights
+    growth = p.exp_w8 * stability ** -w[9] * math.expm1(w[10] * (1 - source_retention))
+    return np.clip(
+        11 - (np.asarray(ease, dtype=np.float64) - 1) / growth, MIN_DIFFICULTY, MAX_DIFFICULTY
+    )
+
+
+def _ease(deck: SM2Deck | LeitnerDeck) -> npt.NDArray[np.float64]:
+    """Return the factor by which each card's interval grows after a successful review."""
+    if isinstance(deck, SM2Deck):
+        return deck.easiness.astype(np.float64)
+    intervals = np.asarray(deck.intervals, dtype=np.float64)
+    if len(intervals) == 1:
+        return np.ones(len(deck))
+    growth = intervals[1:] / intervals[:-1]
+    # The last box does not grow; it is given the growth into it.
+    return np.append(growth, growth[-1])[deck.box]
+
+
+def migrate_to_fsrs(
+    deck: SM2Deck | LeitnerDeck,
+    cards: npt.ArrayLike | None = None,
+    attempted_at: npt.ArrayLike | None = None,
+    results: npt.ArrayLike | None = None,
+    parameters: FSRSParameters | None = None,
+    maximum_interval: int = DEFAULT_MAXIMUM_INTERVAL,
+    source_retention: float = DEFAULT_SOURCE_RETENTION,
+    float_dtype: npt.DTypeLike = np.float64,
+) -> FSRSDeck:
+    """Convert an SM-2 or Leitner deck to an FSRS deck.
+
+    Args:
+        deck: The deck to convert. It is not modified.
+        cards: The card of each review of an optional partial review log.
+        attempted_at: Epoch days of the logged reviews.
+        results: The logged review results, as accepted by ``deck``'s
+            scheduler. SM-2 qualities 0-2 become Again, 3 Hard, 4 Good and 5
+            Easy; Leitner results 0 and 1 become Again and Good.
+        parameters: The FSRS weights and retention of the new deck. Defaults to
+            the default weights and retention.
+        maximum_interval: Maximum allowed interval in days.
+        source_retention: The probability of recall the old scheduler is
+            assumed to have aimed for at the end of each interval.
+        float_dtype: Floating-point type of the stability and difficulty columns.
+
+    Returns:
+        A new FSRS deck with one card per card of ``deck``.
+
+    Raises:
+        TypeError: If the deck is not an SM-2 or Leitner deck.
+        ValueError: If ``source_retention`` is not between 0 and 1, a logged
+            card or result is invalid, or ``cards`` is given without
+            ``attempted_at`` and ``results``.
+    """
+    if not isinstance(deck, SM2Deck | LeitnerDeck):
+        raise TypeError(f"cannot migrate a {type(deck).__name__} to FSRS")
+    if not 0 < source_retention < 1:
+        raise ValueError(
+            f"source_retention must be between 0 and 1 exclusive, got {source_retention}"
+        )
+    p = parameters if parameters is not None else fsrs_parameters()
+    migrated = FSRSDeck(
+        len(deck), maximum_interval=maximum_interval, float_dtype=float_dtype, parameters=p
+    )
+    ease = _ease(deck)
+    scheduled = deck.due != UNSCHEDULED
+    stability = _stability(deck.interval, source_retention, p)
+    migrated.interval[:] = deck.interval
+    migrated.due[:] = deck.due
+    migrated.stability[scheduled] = stability[scheduled]
+    difficulty = _difficulty(ease, stability, source_retention, p)
+    migrated.difficulty[scheduled] = difficulty[scheduled]
+    migrated.last_review[scheduled] = deck.due[scheduled] - deck.interval[scheduled]
+    if cards is not None:
+        _refine(migrated, deck, ease, cards, attempted_at, results, source_retention)
+    return migrated
+
+
+def _refine(
+    migrated: FSRSDeck,
+    deck: SM2Deck | LeitnerDeck,
+    ease: npt.NDArray[np.float64],
+    cards: npt.ArrayLike,
+    attempted_at: npt.ArrayLike | None,
+    results: npt.ArrayLike | None,
+    source_retention: float,
+) -> None:
+    """Restart each card covered by a partial log at its first logged review and replay the rest."""
+    if attempted_at is None or results is None:
+        raise ValueError("attempted_at and results are required with cards")
+    idx, days, res = as_review_log(cards, attempted_at, results)
+    low, high = deck.result_range
+    if idx.size:
+        if idx.min() < 0 or idx.max() >= len(deck):
+            raise ValueError(f"cards must be in [0, {len(deck)})")
+        if res.min() < low or res.max() > high:
+            raise ValueError(f"results must be in [{low}, {high}]")
+    order = np.lexsort((days, idx))
+    table = _SM2_RATINGS if isinstance(deck, SM2Deck) else _LEITNER_RATINGS
+    idx, days, ratings = idx[order], days[order], table[res[order] - low]
+
+    first = np.ones(len(idx), dtype=bool)
+    first[1:] = idx[1:] != idx[:-1]
+    starts = np.flatnonzero(first)
+    ends = np.append(starts[1:], len(idx)) - 1
+    card = idx[starts]
+    # A card is refined when it has two logged reviews and the log reaches its last review.
+    covered = (ends > starts) & (deck.due[card] != UNSCHEDULED)
+    covered &= days[ends] >= deck.due[card] - deck.interval[card]
+    starts, card = starts[covered], card[covered]
+
+    p = migrated.parameters
+    gap = np.maximum(days[starts + 1] - days[starts], 1)
+    stability = _stability(gap, source_retention, p)
+    migrated.stability[card] = stability
+    migrated.difficulty[card] = _difficulty(ease[card], stability, source_retention, p)
+    migrated.last_review[card] = days[starts]
+    migrated.interval[card] = gap
+    migrated.due[card] = days[starts] + gap
+
+    replayed = ~first & np.isin(idx, card)
+    replay_reviews(migrated, idx[replayed], days[replayed], ratings[replayed])
+
+
+def migrate_scheduler(
+    scheduler: SM2Scheduler | LeitnerScheduler,
+    parameters: FSRSParameters | None = None,
+    maximum_interval: int = DEFAULT_MAXIMUM_INTERVAL,
+    source_retention: float = DEFAULT_SOURCE_RETENTION,
+) -> FSRSScheduler:
+    """Convert one SM-2 or Leitner scheduler, as :func:`migrate_to_fsrs` converts a card.
+
+    Args:
+        scheduler: The scheduler to convert. It is not modified.
+        parameters: The FSRS weights and retention of the new scheduler.
+        maximum_interval: Maximum allowed interval in days.
+        source_retention: The probability of recall the old scheduler is
+            assumed to have aimed for at the end of each interval.
+
+    Returns:
+        An FSRS scheduler with the same due date and interval. Its due and
+        last review timestamps keep the time of day and time zone of the
+        source's due timestamp.
+    """
+    deck: SM2Deck | LeitnerDeck
+    if isinstance(scheduler, SM2Scheduler):
+        deck = SM2Deck(1)
+        deck.easiness[0] = scheduler.easiness
+        deck.repetitions[0] = scheduler.repetitions
+    else:
+        deck = LeitnerDeck(1, intervals=list(scheduler.intervals))
+        deck.box[0] = scheduler.current_box
+    deck.interval[0] = scheduler.interval
+    due = scheduler.due_day
+    if due is not None:
+        deck.due[0] = due
+    migrated = migrate_to_fsrs(
+        deck,
+        parameters=parameters,
+        maximum_interval=maximum_interval,
+        source_retention=source_retention,
+    ).scheduler(0)
+    assert isinstance(migrated, FSRSScheduler)
+    migrated.on_due_change = None
+    migrated.validate = scheduler.validate
+    # The deck holds epoch days only; take the timestamps from the source.
+    due_timestamp = scheduler.due_timestamp
+    if due_timestamp is not None:
+        migrated.due_timestamp = due_timestamp
+        migrated.last_review_at = due_timestamp - timedelta(days=scheduler.interval)
+    return migrated
@@ -0,0 +1,345 @@
+"""Fit FSRS-6 weights to a review log.
+
+The log is a table of ``(card_id, timestamp, rating)`` rows. Each review after
+a card's first one on a later day is a prediction target: the forgetting curve
+gives the probability of recall from the stability before the review, and the
+rating says whether the card was recalled (anything but Again). The weights are
+fitted by minimizing the log-loss of those predictions.
+
+No Python code runs per review. Cards are sorted by their number of reviews and
+cut into mini-batches, and the reviews of a batch are stored rank by rank: the
+k-th reviews of all its cards, then the (k+1)-th, and so on. The cards that
+still have a k-th review are then a prefix of the batch, so the FSRS state of
+the whole batch advances one rank per vectorized step. Gradients are central
+finite differences, computed in the same pass by stacking every perturbed weight
+vector along a leading parameter axis. Updates use Adam, and the weights are
+clipped to the ranges used by the reference FSRS optimizer.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from itertools import pairwise
+
+import numpy as np
+import numpy.typing as npt
+
+from spacedreppy.epoch import to_epoch_days
+from spacedreppy.schedulers.fsrs import (
+    AGAIN,
+    DEFAULT_WEIGHTS,
+    EASY,
+    GOOD,
+    HARD,
+    MAX_DIFFICULTY,
+    MAX_RATING,
+    MIN_DIFFICULTY,
+    MIN_RATING,
+    MIN_STABILITY,
+    NUM_WEIGHTS,
+)
+
+# Per-weight bounds applied after every update.
+WEIGHT_LOWER_BOUNDS: tuple[float, ...] = (
+    0.001,
+    0.001,
+    0.001,
+    0.001,
+    1.0,
+    0.001,
+    0.001,
+    0.001,
+    0.0,
+    0.0,
+    0.001,
+    0.001,
+    0.001,
+    0.001,
+    0.0,
+    0.0,
+    1.0,
+    0.0,
+    0.0,
+    0.0,
+    0.1,
+)
+WEIGHT_UPPER_BOUNDS: tuple[float, ...] = (
+    100.0,
+    100.0,
+    100.0,
+    100.0,
+    10.0,
+    4.0,
+    4.0,
+    0.75,
+    4.5,
+    0.8,
+    3.5,
+    5.0,
+    0.25,
+    0.9,
+    4.0,
+    1.0,
+    6.0,
+    2.0,
+    2.0,
+    0.8,
+    0.8,
+)
+
+DEFAULT_BATCH_SIZE = 1024
+DEFAULT_EPOCHS = 5
+DEFAULT_LEARNING_RATE = 4e-2
+
+# Finite-difference step for the gradient.
+_STEP = 1e-5
+# Predicted recall probabilities are clipped to [_EPS, 1 - _EPS] in the loss.
+_EPS = 1e-7
+_ADAM_BETA1 = 0.9
+_ADAM_BETA2 = 0.999
+_ADAM_EPS = 1e-8
+
+
+@dataclass(frozen=True, slots=True)
+class _Batch:
+    """The reviews of a group of cards stored rank by rank.
+
+    ``ratings[offsets[k]:offsets[k + 1]]`` are the k-th reviews of the first
+    ``offsets[k + 1] - offsets[k]`` cards of the batch.
+    """
+
+    ratings: npt.NDArray[np.int64]
+    elapsed_days: npt.NDArray[np.float64]
+    offsets: npt.NDArray[np.intp]
+    num_predictions: int
+
+
+def _prepare_batches(
+    card_ids: npt.ArrayLike,
+    timestamps: npt.ArrayLike,
+    ratings: npt.ArrayLike,
+    batch_size: int,
+) -> list[_Batch]:
+    """Sort a review log into rank-major batches of ``batch_size`` cards."""
+    if batch_size <= 0:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    cards = np.asarray(card_ids)
+    days = to_epoch_days(timestamps)
+    grades = np.asarray(ratings, dtype=np.int64)
+    if not cards.ndim == days.ndim == grades.ndim == 1:
+        raise ValueError("card_ids, timestamps and ratings must be 1-D")
+    if not len(cards) == len(days) == len(grades):
+        raise ValueError("card_ids, timestamps and ratings must have the same length")
+    if grades.size and (grades.min() < MIN_RATING or grades.max() > MAX_RATING):
+        raise ValueError(f"ratings must be between {MIN_RATING} and {MAX_RATING}")
+
+    # Group the reviews by card, in time order within each card.
+    order = np.lexsort((days, cards))
+    cards, days, grades = cards[order], days[order], grades[order]
+    n = len(cards)
+    first = np.ones(n, dtype=bool)
+    first[1:] = cards[1:] != cards[:-1]
+    starts = np.flatnonzero(first)
+    group = np.cumsum(first) - 1
+    rank = np.arange(n) - starts[group]
+    elapsed = np.zeros(n, dtype=np.float64)
+    elapsed[1:] = np.diff(days)
+    elapsed[first] = 0
+
+    # Cards reviewed once have nothing to predict.
+    lengths = np.diff(np.append(starts, n))
+    keep = lengths[group] > 1
+    group, rank, elapsed, grades = group[keep], rank[keep], elapsed[keep], grades[keep]
+
+    # Place the longest histories first so the active cards of a rank are a prefix.
+    position = np.empty(len(lengths), dtype=np.int64)
+    position[np.argsort(-lengths, kind="stable")] = np.arange(len(lengths))
+    card_position = position[group]
+    batch = card_position // batch_size
+    order = np.lexsort((card_position, rank, batch))
+    batch, rank, elapsed, grades = batch[order], rank[order], elapsed[order], grades[order]
+
+    batches = []
+    bounds = np.searchsorted(batch, np.arange(batch[-1] + 2)) if len(batch) else [0]
+    for lo, hi in pairwise(bounds):
+        batch_rank = rank[lo:hi]
+        offsets = np.searchsorted(batch_rank, np.arange(batch_rank[-1] + 2))
+        batch_elapsed = elapsed[lo:hi]
+        batches.append(
+            _Batch(
+                ratings=grades[lo:hi],
+                elapsed_days=batch_elapsed,
+                offsets=offsets,
+                num_predictions=int(np.count_nonzero(batch_elapsed > 0)),
+            )
+        )
+    return batches
+
+
+def _batch_loss(w: npt.NDArray[np.float64], batch: _Batch) -> npt.NDArray[np.float64]:
+    """Return the summed negative log-likelihood of a batch for each weight row of ``w``.
+
+    Args:
+        w: Weight vectors of shape ``(P, 21)``.
+        batch: The reviews to score.
+
+    Returns:
+        An array of shape ``(P,)``.
+    """
+
+    def col(i: int) -> npt.NDArray[np.float64]:
+        return w[:, i, None]
+
+    decay = -col(20)
+    factor = 0.9 ** (1 / decay) - 1
+    d0_easy = np.clip(col(4) - np.exp(col(5) * (EASY - 1)) + 1, MIN_DIFFICULTY, MAX_DIFFICULTY)
+    forget_divisor = np.exp(col(17) * col(18))
+    exp_w8 = np.exp(col(8))
+
+    offsets = batch.offsets
+    g = batch.ratings[offsets[0] : offsets[1]]
+    s = np.maximum(w[:, g - MIN_RATING], MIN_STABILITY)
+    d = np.clip(col(4) - np.exp(col(5) * (g - 1)) + 1, MIN_DIFFICULTY, MAX_DIFFICULTY)
+    loss = np.zeros(len(w), dtype=np.float64)
+    for k in range(1, len(offsets) - 1):
+        lo, hi = offsets[k], offsets[k + 1]
+        g = batch.ratings[lo:hi]
+        t = batch.elapsed_days[lo:hi]
+        s = s[:, : hi - lo]
+        d = d[:, : hi - lo]
+        review = t > 0
+        recalled = g > AGAIN
+
+        r = (1 + factor * t / s) ** decay
+        p = np.clip(r, _EPS, 1 - _EPS)
+        log_likelihood = np.where(recalled, np.log(p), np.log1p(-p))
+        loss -= np.where(review, log_likelihood, 0).sum(axis=1)
+
+        next_d = d + -col(6) * (g - 3) * (MAX_DIFFICULTY - d) / 9
+        new_d = np.clip(col(7) * d0_easy + (1 - col(7)) * next_d, MIN_DIFFICULTY, MAX_DIFFICULTY)
+
+        hard_penalty = np.where(g == HARD, col(15), 1.0)
+        easy_bonus = np.where(g == EASY, col(16), 1.0)
+        recall_s = s * (
+            1
+            + exp_w8
+            * (11 - d)
+            * s ** (-col(9))
+            * (np.exp((1 - r) * col(10)) - 1)
+            * hard_penalty
+            * easy_bonus
+        )
+        forget_s = np.minimum(
+            col(11) * d ** (-col(12)) * ((s + 1) ** col(13) - 1) * np.exp((1 - r) * col(14)),
+            s / forget_divisor,
+        )
+        s_inc = np.exp(col(17) * (g - 3 + col(18))) * s ** (-col(19))
+        s_inc = np.where(g >= GOOD, np.maximum(s_inc, 1.0), s_inc)
+        s = np.where(review, np.where(recalled, recall_s, forget_s), s * s_inc)
+        d = new_d
+    return loss
+
+
+def _check_weights(weights: Sequence[float]) -> npt.NDArray[np.float64]:
+    w = np.asarray(weights, dtype=np.float64)
+    if w.shape != (NUM_WEIGHTS,):
+        raise ValueError(f"weights must have {NUM_WEIGHTS} elements, got {len(w)}")
+    return w
+
+
+def fsrs_log_loss(
+    card_ids: npt.ArrayLike,
+    timestamps: npt.ArrayLike,
+    ratings: npt.ArrayLike,
+    weights: Sequence[float] = DEFAULT_WEIGHTS,
+) -> float:
+    """Return the mean log-loss of FSRS-6 recall predictions on a review log.
+
+    Args:
+        card_ids: The card of each review.
+        timestamps: When each review happened, as ``datetime64`` values or
+            seconds since the epoch.
+        ratings: Grades from 1 (Again) to 4 (Easy).
+        weights: The 21 FSRS-6 model weights to evaluate.
+
+    Returns:
+        The mean negative log-likelihood per predicted review.
+
+    Raises:
+        ValueError: If the inputs are malformed or the log has nothing to predict.
+    """
+    w = _check_weights(weights)[None]
+    batches = _prepare_batches(card_ids, timestamps, ratings, DEFAULT_BATCH_SIZE)
+    num_predictions = sum(batch.num_predictions for batch in batches)
+    if num_predictions == 0:
+        raise ValueError("the review log has no reviews on a later day than a card's first")
+    with np.errstate(all="ignore"):
+        total = sum(float(_batch_loss(w, batch)[0]) for batch in batches)
+    return total / num_predictions
+
+
+def fit_fsrs_weights(
+    card_ids: npt.ArrayLike,
+    timestamps: npt.ArrayLike,
+    ratings: npt.ArrayLike,
+    initial_weights: Sequence[float] = DEFAULT_WEIGHTS,
+    epochs: int = DEFAULT_EPOCHS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    learning_rate: float = DEFAULT_LEARNING_RATE,
+    seed: int | None = 0,
+) -> tuple[float, ...]:
+    """Fit FSRS-6 weights to a review log by minimizing log-loss.
+
+    Args:
+        card_ids: The card of each review.
+        timestamps: When each review happened, as ``datetime64`` values or
+            seconds since the epoch. Reviews are ordered per card by
+            timestamp; the log itself need not be sorted.
+        ratings: Grades from 1 (Again) to 4 (Easy).
+        initial_weights: The 21 weights to start from.
+        epochs: The number of passes over the log.
+        batch_size: The number of cards per mini-batch.
+        learning_rate: The Adam step size.
+        seed: Seed for the order of the mini-batches in each epoch.
+
+    Returns:
+        The fitted weights, usable as ``weights=`` of :class:`FSRSScheduler`.
+
+    Raises:
+        ValueError: If the inputs are malformed or the log has nothing to predict.
+    """
+    if epochs < 0:
+        raise ValueError(f"epochs must be non-negative, got {epochs}")
+    lower = np.array(WEIGHT_LOWER_BOUNDS)
+    upper = np.array(WEIGHT_UPPER_BOUNDS)
+    w = np.clip(_check_weights(initial_weights), lower, upper)
+    batches = [
+        batch
+        for batch in _prepare_batches(card_ids, timestamps, ratings, batch_size)
+        if batch.num_predictions
+    ]
+    if not batches:
+        raise ValueError("the review log has no reviews on a later day than a card's first")
+
+    rng = np.random.default_rng(seed)
+    # Rows 1..21 step each weight up and rows 22..42 step it down.
+    steps = np.concatenate([np.eye(NUM_WEIGHTS), -np.eye(NUM_WEIGHTS)]) * _STEP
+    m = np.zeros(NUM_WEIGHTS)
+    v = np.zeros(NUM_WEIGHTS)
+    t = 0
+    for _ in range(epochs):
+        for i in rng.permutation(len(batches)):
+            batch = batches[i]
+            with np.errstate(all="ignore"):
+                loss = _batch_loss(w + steps, batch)
+            grad = (loss[:NUM_WEIGHTS] - loss[NUM_WEIGHTS:]) / (2 * _STEP * batch.num_predictions)
+            if not np.isfinite(grad).all():
+                continue
+            t += 1
+            m = _ADAM_BETA1 * m + (1 - _ADAM_BETA1) * grad
+            v = _ADAM_BETA2 * v + (1 - _ADAM_BETA2) * grad**2
+            m_hat = m / (1 - _ADAM_BETA1**t)
+            v_hat = v / (1 - _ADAM_BETA2**t)
+            w = np.clip(w - learning_rate * m_hat / (np.sqrt(v_hat) + _ADAM_EPS), lower, upper)
+    return tuple(float(x) for x in w)
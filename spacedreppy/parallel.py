@@ -0,0 +1,198 @@
+"""Process-parallel scheduling of many decks.
+
+Nightly jobs that reschedule many users are embarrassingly parallel: every user
+has their own deck and their own reviews. :func:`run_shards` spreads such
+shards over a process pool. Each deck's columns are copied once into a
+:class:`~multiprocessing.shared_memory.SharedMemory` block, laid out like a
+deck file (see :func:`~spacedreppy.storage.column_layout`); a worker attaches
+to the block, runs the batch reviews (and optionally fits FSRS weights) directly
+on it, and the parent copies the updated columns back. Only the review arrays
+and the deck settings travel to the workers, and only fitted weights travel
+back, so no per-card Python objects are ever pickled.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from multiprocessing.context import BaseContext
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from spacedreppy.deck import Deck, FSRSDeck
+from spacedreppy.optimizer import fit_fsrs_weights
+from spacedreppy.schedulers.fsrs import fsrs_parameters
+from spacedreppy.storage import column_layout
+
+# A ``(cards, attempted_at, results)`` batch as accepted by :meth:`Deck.review`.
+ReviewBatch = tuple[npt.ArrayLike, npt.ArrayLike, npt.ArrayLike]
+# A ``(card_ids, timestamps, ratings)`` log as accepted by :func:`fit_fsrs_weights`.
+ReviewLog = tuple[npt.ArrayLike, npt.ArrayLike, npt.ArrayLike]
+
+
+@dataclass(frozen=True, slots=True)
+class Shard:
+    """A deck and the work to run on it.
+
+    Args:
+        deck: The deck to update. Its columns are updated in place.
+        reviews: Review batches applied in order with :meth:`Deck.review`.
+        fit_log: A review log to fit FSRS weights on before the reviews run.
+            Only valid for an :class:`FSRSDeck`, whose parameters are replaced
+            by the fitted weights.
+    """
+
+    deck: Deck
+    reviews: Sequence[ReviewBatch] = ()
+    fit_log: ReviewLog | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class _Task:
+    index: int
+    shm_name: str
+    size: int
+    layout: dict[str, int]
+    template: Deck
+    reviews: Sequence[ReviewBatch]
+    fit_log: ReviewLog | None
+    fit_options: Mapping[str, Any] = field(default_factory=dict)
+
+
+def _views(
+    template: Deck, size: int, shm: SharedMemory, layout: dict[str, int]
+) -> dict[str, npt.NDArray[Any]]:
+    """Return arrays over the columns of a shared block, typed like ``template``."""
+    assert shm.buf is not None
+    return {
+        name: np.ndarray(size, dtype=getattr(template, name).dtype, buffer=shm.buf, offset=offset)
+        for name, offset in layout.items()
+    }
+
+
+def _copy_columns(deck: Deck, shm: SharedMemory, layout: dict[str, int], to_block: bool) -> None:
+    """Copy a deck's columns into a shared block, or back out of it."""
+    for name, view in _views(deck, len(deck), shm, layout).items():
+        if to_block:
+            view[:] = getattr(deck, name)
+        else:
+            getattr(deck, name)[:] = view
+    if not to_block:
+        deck.bump_version()
+
+
+def _run_task(task: _Task) -> tuple[int, tuple[float, ...] | None]:
+    # Pool workers share the parent's resource tracker, so attaching here does
+    # not make the block outlive, or vanish before, the parent's unlink.
+    shm = SharedMemory(task.shm_name)
+    try:
+        weights = _run_on_block(task, shm)
+    finally:
+        # After a failure, views may still be referenced by the traceback; the
+        # mapping is then released together with them.
+        with contextlib.suppress(BufferError):
+            shm.close()
+    return task.index, weights
+
+
+def _run_on_block(task: _Task, shm: SharedMemory) -> tuple[float, ...] | None:
+    deck = task.template.with_columns(_views(task.template, task.size, shm, task.layout))
+    weights = None
+    if task.fit_log is not None:
+        assert isinstance(deck, FSRSDeck)
+        weights = fit_fsrs_weights(*task.fit_log, **task.fit_options)
+        deck.parameters = fsrs_parameters(weights, deck.request_retention)
+    for cards, attempted_at, results in task.reviews:
+        deck.review(cards, attempted_at, results)
+    return weights
+
+
+def run_shards(
+    shards: Sequence[Shard],
+    processes: int | None = None,
+    fit_options: Mapping[str, Any] | None = None,
+    mp_context: BaseContext | None = None,
+) -> list[tuple[float, ...] | None]:
+    """Run the reviews (and weight fits) of many independent shards in parallel.
+
+    Shards are handed to the workers largest first, one at a time, so the
+    cores stay busy until the end. If any shard fails, the exception is raised
+    once all workers have stopped; decks of shards that completed are still
+    updated.
+
+    Args:
+        shards: The shards to run. Each deck must appear in only one shard.
+        processes: The number of worker processes. Defaults to the CPU count.
+        fit_options: Keyword arguments passed to :func:`fit_fsrs_weights`.
+        mp_context: The multiprocessing context. Defaults to the platform's.
+
+    Returns:
+        The fitted weights of each shard, or None for shards without a ``fit_log``.
+
+    Raises:
+        ValueError: If a deck is repeated or a ``fit_log`` is given for a
+            deck other than an :class:`FSRSDeck`.
+    """
+    if len({id(shard.deck) for shard in shards}) != len(shards):
+        raise ValueError("each deck must appear in only one shard")
+    for shard in shards:
+        if shard.fit_log is not None and not isinstance(shard.deck, FSRSDeck):
+            raise ValueError("fit_log is only supported for FSRSDeck shards")
+
+    ctx = mp_context if mp_context is not None else get_context()
+    blocks: list[SharedMemory] = []
+    try:
+        tasks = []
+        for index, shard in enumerate(shards):
+            layout, nbytes = column_layout(shard.deck)
+            shm = SharedMemory(create=True, size=max(nbytes, 1))
+            blocks.append(shm)
+            _copy_columns(shard.deck, shm, layout, to_block=True)
+            template = shard.deck.with_columns(
+                {name: getattr(shard.deck, name)[:0] for name in shard.deck.columns}
+            )
+            tasks.append(
+                _Task(
+                    index=index,
+                    shm_name=shm.name,
+                    size=len(shard.deck),
+                    layout=layout,
+                    template=template,
+                    reviews=shard.reviews,
+                    fit_log=shard.fit_log,
+                    fit_options=dict(fit_options or {}),
+                )
+            )
+        tasks.sort(key=lambda task: -sum(np.size(batch[0]) for batch in task.reviews))
+
+        results: list[tuple[float, ...] | None] = [None] * len(shards)
+        error: Exception | None = None
+        workers = min(processes or os.cpu_count() or 1, len(tasks))
+        if tasks:
+            with ctx.Pool(workers) as pool:
+                pending = [pool.apply_async(_run_task, (task,)) for task in tasks]
+                for task, result in zip(tasks, pending, strict=True):
+                    try:
+                        index, weights = result.get()
+                    except Exception as exc:
+                        error = error or exc
+                        continue
+                    deck = shards[index].deck
+                    _copy_columns(deck, blocks[index], task.layout, to_block=False)
+                    if weights is not None:
+                        assert isinstance(deck, FSRSDeck)
+                        deck.parameters = fsrs_parameters(weights, deck.request_retention)
+                    results[index] = weights
+        if error is not None:
+            raise error
+        return results
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,366 @@
+"""Streaming ingestion of review logs into decks.
+
+The pipeline is a chain of generators, each consuming the previous stage
+lazily, so memory stays bounded by the chunk size and the deck itself:
+
+1. **parse** — :func:`read_csv` and :func:`read_jsonl` yield
+   ``(card_id, timestamp, result)`` rows; any iterable of such rows works.
+2. **chunk** — :func:`batched` packs rows into :class:`LogChunk` arrays, with
+   timestamps converted to epoch days. Results that are not integers are
+   marked :data:`INVALID_RESULT` rather than raising.
+3. **validate** — :func:`validate` checks each chunk against the result range
+   of the deck, raising or dropping the invalid rows.
+4. **apply** — :func:`apply` maps card ids to deck rows with a
+   :class:`CardIndex`, grows the deck as new cards appear, and replays the
+   chunk with :func:`~spacedreppy.replay.replay_reviews`.
+5. **emit** — :func:`apply` yields a :class:`StateChunk` with the new state of
+   every card the chunk touched.
+
+:class:`ReviewPipeline` wires the stages together for any scheduler type
+supported by :func:`~spacedreppy.deck.deck_for`.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import warnings
+from collections.abc import Hashable, Iterable, Iterator
+from datetime import datetime
+from itertools import islice
+from typing import Any, Literal, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+from spacedreppy.deck import UNSCHEDULED, Deck, deck_for
+from spacedreppy.epoch import to_epoch_days
+from spacedreppy.replay import replay_reviews
+from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
+
+DEFAULT_CHUNK_SIZE = 65_536
+# Marks a result that could not be parsed as an integer; never in a deck's result range.
+INVALID_RESULT = np.iinfo(np.int64).min
+
+# A ``(card_id, timestamp, result)`` log row. Timestamps may be datetimes,
+# seconds since the epoch, or ISO 8601 strings.
+Row = tuple[Hashable, Any, Any]
+Source = str | os.PathLike[str] | Iterable[str]
+
+
+class LogChunk(NamedTuple):
+    """A chunk of review log rows as parallel arrays."""
+
+    card_ids: npt.NDArray[Any]
+    attempted_at: npt.NDArray[np.int64]
+    results: npt.NDArray[np.int64]
+
+
+class StateChunk(NamedTuple):
+    """The state of the cards touched by one chunk, after the chunk was applied."""
+
+    card_ids: npt.NDArray[Any]
+    cards: npt.NDArray[np.intp]
+    columns: dict[str, npt.NDArray[Any]]
+
+
+def _lines(source: Source) -> Iterator[str]:
+    if isinstance(source, str | os.PathLike):
+        with open(source, newline="") as f:
+            yield from f
+    else:
+        yield from source
+
+
+def read_csv(
+    source: Source,
+    card_column: str = "card_id",
+    timestamp_column: str = "timestamp",
+    result_column: str = "rating",
+    delimiter: str = ",",
+) -> Iterator[Row]:
+    """Yield the rows of a CSV review log with a header line.
+
+    Args:
+        source: A path, or an open text file or other iterable of lines.
+        card_column: The header of the card id column.
+        timestamp_column: The header of the timestamp column.
+        result_column: The header of the result column.
+        delimiter: The field delimiter.
+
+    Yields:
+        ``(card_id, timestamp, result)`` tuples of strings.
+
+    Raises:
+        ValueError: If a column is missing from the header.
+    """
+    reader = csv.reader(_lines(source), delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+    try:
+        columns = [header.index(name) for name in (card_column, timestamp_column, result_column)]
+    except ValueError as e:
+        raise ValueError(f"CSV header {header} lacks a required column") from e
+    card, timestamp, result = columns
+    for record in reader:
+        if record:
+            yield record[card], record[timestamp], record[result]
+
+
+def read_jsonl(
+    source: Source,
+    card_key: str = "card_id",
+    timestamp_key: str = "timestamp",
+    result_key: str = "rating",
+) -> Iterator[Row]:
+    """Yield the rows of a JSON Lines review log, one object per line.
+
+    Args:
+        source: A path, or an open text file or other iterable of lines.
+        card_key: The key of the card id.
+        timestamp_key: The key of the timestamp.
+        result_key: The key of the result.
+
+    Yields:
+        ``(card_id, timestamp, result)`` tuples.
+
+    Raises:
+        KeyError: If an object lacks one of the keys.
+    """
+    for line in _lines(source):
+        if line.strip():
+            record = json.loads(line)
+            yield record[card_key], record[timestamp_key], record[result_key]
+
+
+def _epoch_days(timestamps: list[Any]) -> npt.NDArray[np.int64]:
+    """Convert parsed timestamps of any supported kind to epoch days."""
+    values = np.asarray(timestamps)
+    if values.dtype.kind not in "US":
+        return to_epoch_days(values)
+    try:
+        return to_epoch_days(values.astype(np.float64))
+    except ValueError:
+        pass
+    try:
+        with warnings.catch_warnings():
+            # NumPy only warns about, and then drops, a UTC offset.
+            warnings.simplefilter("error")
+            return to_epoch_days(values.astype("datetime64[s]"))
+    except (ValueError, DeprecationWarning, UserWarning):
+        parsed = [datetime.fromisoformat(value) for value in timestamps]
+        return to_epoch_days(np.array(parsed, dtype=object))
+
+
+def _card_ids(card_ids: tuple[Hashable, ...]) -> npt.NDArray[Any]:
+    """Convert card ids to an array, refusing to turn numbers into strings."""
+    ids = np.asarray(card_ids)
+    if ids.dtype.kind in "US" and not all(isinstance(card_id, str) for card_id in card_ids):
+        raise ValueError("card ids must be all strings or all numbers, not a mix")
+    return ids
+
+
+def _results(results: tuple[Any, ...]) -> npt.NDArray[np.int64]:
+    """Convert parsed results to integers, marking the others :data:`INVALID_RESULT`."""
+    values = np.asarray(results)
+    if values.dtype.kind in "iu":
+        return values.astype(np.int64)
+    if values.dtype.kind in "US":
+        try:
+            return values.astype(np.int64)
+        except (ValueError, OverflowError):
+            pass
+    parsed = np.full(len(results), INVALID_RESULT, dtype=np.int64)
+    for i, result in enumerate(results):
+        try:
+            number = float(result)
+        except (TypeError, ValueError):
+            continue
+        if number.is_integer():
+            parsed[i] = int(number)
+    return parsed
+
+
+def batched(rows: Iterable[Row], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[LogChunk]:
+    """Pack log rows into chunks of parallel arrays.
+
+    Results that are not integers, such as ``"good"`` or ``2.5``, become
+    :data:`INVALID_RESULT`, so that :func:`validate` raises on them or skips
+    them like any other invalid row.
+
+    Args:
+        rows: ``(card_id, timestamp, result)`` rows.
+        chunk_size: The maximum number of rows per chunk.
+
+    Yields:
+        One :class:`LogChunk` per ``chunk_size`` rows.
+
+    Raises:
+        ValueError: If ``chunk_size`` is not positive, or a chunk mixes string
+            and numeric card ids.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    it = iter(rows)
+    while chunk := list(islice(it, chunk_size)):
+        card_ids, timestamps, results = zip(*chunk, strict=True)
+        yield LogChunk(
+            card_ids=_card_ids(card_ids),
+            attempted_at=_epoch_days(list(timestamps)),
+            results=_results(results),
+        )
+
+
+def validate(
+    chunks: Iterable[LogChunk],
+    result_range: tuple[int, int],
+    errors: Literal["raise", "skip"] = "raise",
+) -> Iterator[LogChunk]:
+    """Check every chunk's results and timestamps.
+
+    Args:
+        chunks: The chunks to check.
+        result_range: The inclusive range of valid results, e.g. ``Deck.result_range``.
+        errors: Whether to raise on the first invalid row or to drop invalid rows.
+
+    Yields:
+        The chunks, without their invalid rows when ``errors="skip"``.
+
+    Raises:
+        ValueError: If a row is invalid and ``errors="raise"``.
+    """
+    low, high = result_range
+    for chunk in chunks:
+        valid = (
+            (chunk.results >= low) & (chunk.results <= high) & (chunk.attempted_at != UNSCHEDULED)
+        )
+        if valid.all():
+            yield chunk
+        elif errors == "raise":
+            row = int(np.flatnonzero(~valid)[0])
+            if chunk.results[row] == INVALID_RESULT:
+                raise ValueError(
+                    f"invalid review of card {chunk.card_ids.tolist()[row]!r}: "
+                    "result is not an integer"
+                )
+            raise ValueError(
+                f"invalid review of card {chunk.card_ids.tolist()[row]!r}: result "
+                f"{chunk.results[row]} must be in [{low}, {high}] with a valid timestamp"
+            )
+        elif valid.any():
+            yield LogChunk(*(column[valid] for column in chunk))
+
+
+class CardIndex:
+    """Assigns consecutive deck rows to card ids in order of first appearance."""
+
+    def __init__(self) -> None:
+        self._rows: dict[Hashable, int] = {}
+        self._ids: list[Hashable] = []
+
+    def __len__(self) -> int:
+        """Return the number of known cards."""
+        return len(self._ids)
+
+    def __contains__(self, card_id: object) -> bool:
+        """Return whether the card id has a row."""
+        return card_id in self._rows
+
+    def rows(self, card_ids: npt.ArrayLike) -> npt.NDArray[np.intp]:
+        """Return the deck row of each card id, assigning rows to new ids.
+
+        Args:
+            card_ids: The card ids.
+
+        Returns:
+            The deck rows, in the order of ``card_ids``.
+        """
+        unique, inverse = np.unique(np.asarray(card_ids), return_inverse=True)
+        codes = np.empty(len(unique), dtype=np.intp)
+        for i, card_id in enumerate(unique.tolist()):
+            row = self._rows.get(card_id)
+            if row is None:
+                row = self._rows[card_id] = len(self._ids)
+                self._ids.append(card_id)
+            codes[i] = row
+        return codes[inverse.reshape(-1)]
+
+    def ids(self, rows: npt.ArrayLike) -> npt.NDArray[Any]:
+        """Return the card ids of deck rows."""
+        return np.asarray(self._ids, dtype=object)[np.asarray(rows, dtype=np.intp)]
+
+
+def apply(chunks: Iterable[LogChunk], deck: Deck, index: CardIndex) -> Iterator[StateChunk]:
+    """Apply each chunk to the deck and yield the new state of the cards it touched.
+
+    The deck grows (geometrically) as new card ids appear, so it may hold more
+    rows than ``index`` has cards; the extra rows stay unscheduled.
+
+    Args:
+        chunks: Validated chunks, in time order per card.
+        deck: The deck to update.
+        index: The mapping from card ids to deck rows.
+
+    Yields:
+        A :class:`StateChunk` per input chunk.
+    """
+    for chunk in chunks:
+        rows = index.rows(chunk.card_ids)
+        if len(index) > len(deck):
+            deck.resize(max(len(index), 2 * len(deck)))
+        replay_reviews(deck, rows, chunk.attempted_at, chunk.results, chunk_size=max(len(rows), 1))
+        touched = np.unique(rows)
+        yield StateChunk(
+            card_ids=index.ids(touched),
+            cards=touched,
+            columns={name: getattr(deck, name)[touched] for name in deck.columns},
+        )
+
+
+class ReviewPipeline:
+    """Parse → validate → group by card → apply → emit, for any scheduler type.
+
+    Args:
+        scheduler: A scheduler whose algorithm and settings the pipeline's
+            deck uses; see :func:`~spacedreppy.deck.deck_for`.
+        chunk_size: The number of log rows per chunk.
+        errors: Whether invalid rows raise or are skipped.
+    """
+
+    def __init__(
+        self,
+        scheduler: SpacedRepetitionScheduler,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        errors: Literal["raise", "skip"] = "raise",
+    ) -> None:
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        self.deck = deck_for(scheduler)
+        self.index = CardIndex()
+        self.chunk_size = chunk_size
+        self.errors: Literal["raise", "skip"] = errors
+
+    def run(self, rows: Iterable[Row]) -> Iterator[StateChunk]:
+        """Stream log rows through the pipeline.
+
+        Args:
+            rows: ``(card_id, timestamp, result)`` rows, e.g. from :func:`read_csv`.
+
+        Yields:
+            The new state of the cards touched by each chunk.
+        """
+        return self.run_chunks(batched(rows, self.chunk_size))
+
+    def run_chunks(self, chunks: Iterable[LogChunk]) -> Iterator[StateChunk]:
+        """Stream already chunked NumPy batches through the pipeline.
+
+        Args:
+            chunks: The log chunks, with timestamps as epoch days.
+
+        Yields:
+            The new state of the cards touched by each chunk.
+        """
+        valid = validate(chunks, self.deck.result_range, self.errors)
+        return apply(valid, self.deck, self.index)
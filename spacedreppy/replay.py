@@ -0,0 +1,277 @@
+"""Streaming replay of review logs into decks.
+
+:func:`replay_reviews` folds a time-ordered review log into a :class:`Deck` in
+one pass. The log is cut into chunks; inside a chunk, the k-th review of every
+card is applied in round k with one :meth:`Deck.review` call (see
+:func:`review_rounds`), so the reviews of each card stay in order while all
+cards advance together.
+
+:class:`ReplayEngine` keeps a deck in sync with a growing log and records
+incremental checkpoints: for each checkpoint interval it saves the state that
+the cards first touched in that interval had when the interval started. That
+undo log costs memory only for cards that actually changed, and rewinding to a
+checkpoint writes those saved values back. When earlier reviews change or
+arrive late, only the tail of the log after the checkpoint has to be replayed.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import pairwise
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from spacedreppy.deck import Deck
+
+DEFAULT_CHUNK_SIZE = 65_536
+DEFAULT_CHECKPOINT_INTERVAL = 1_000_000
+DEFAULT_MAX_CHECKPOINTS = 16
+
+
+def review_rounds(
+    deck: Deck,
+    cards: npt.NDArray[np.intp],
+    attempted_at: npt.NDArray[np.int64],
+    results: npt.NDArray[np.int64],
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """Apply reviews in which cards may repeat, one occurrence per card per round.
+
+    Round k applies the k-th review of every card with one :meth:`Deck.review`
+    call, so each card's reviews are applied in order.
+
+    Args:
+        deck: The deck to update in place.
+        cards: The card of each review.
+        attempted_at: Epoch days of the reviews.
+        results: The review results, as accepted by the deck's scheduler.
+
+    Returns:
+        The new due epoch day and interval (in days) after each review, in
+        the order of ``cards``.
+
+    Raises:
+        ValueError: If a card index or a result is invalid. Earlier rounds
+            stay applied.
+    """
+    order = np.argsort(cards, kind="stable")
+    sorted_cards = cards[order]
+    first = np.ones(len(cards), dtype=bool)
+    first[1:] = sorted_cards[1:] != sorted_cards[:-1]
+    starts = np.flatnonzero(first)
+    rank = np.empty(len(cards), dtype=np.intp)
+    rank[order] = np.arange(len(cards)) - starts[np.cumsum(first) - 1]
+    if not rank.any():
+        return deck.review(cards, attempted_at, results)
+    due = np.empty(len(cards), dtype=np.int64)
+    intervals = np.empty(len(cards), dtype=np.int64)
+    by_round = np.argsort(rank, kind="stable")
+    bounds = np.searchsorted(rank[by_round], np.arange(rank.max() + 2))
+    for lo, hi in pairwise(bounds):
+        idx = by_round[lo:hi]
+        due[idx], intervals[idx] = deck.review(cards[idx], attempted_at[idx], results[idx])
+    return due, intervals
+
+
+def as_review_log(
+    cards: npt.ArrayLike, attempted_at: npt.ArrayLike, results: npt.ArrayLike
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """Convert the columns of a review log to arrays of one length.
+
+    Args:
+        cards: The card of each review.
+        attempted_at: Epoch days of the reviews, or one day for all of them.
+        results: The review results, or one result for all of them.
+
+    Returns:
+        The card indices, epoch days and results.
+
+    Raises:
+        ValueError: If ``cards`` is not one-dimensional.
+    """
+    idx = np.asarray(cards, dtype=np.intp)
+    if idx.ndim != 1:
+        raise ValueError("cards must be one-dimensional")
+    days = np.broadcast_to(np.asarray(attempted_at, dtype=np.int64), idx.shape)
+    res = np.broadcast_to(np.asarray(results, dtype=np.int64), idx.shape)
+    return idx, days, res
+
+
+def replay_reviews(
+    deck: Deck,
+    cards: npt.ArrayLike,
+    attempted_at: npt.ArrayLike,
+    results: npt.ArrayLike,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    """Fold a review log into a deck in one streaming pass.
+
+    The result is the same as reviewing every row with
+    ``deck.review_one`` in log order.
+
+    Args:
+        deck: The deck to update in place.
+        cards: The card of each review.
+        attempted_at: Epoch days of the reviews, in non-decreasing order per card.
+        results: The review results, as accepted by the deck's scheduler.
+        chunk_size: The number of log rows folded per chunk.
+
+    Raises:
+        ValueError: If a card index or a result is invalid. Chunks before the
+            failing one stay applied.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    idx, days, res = as_review_log(cards, attempted_at, results)
+    for start in range(0, len(idx), chunk_size):
+        stop = start + chunk_size
+        review_rounds(deck, idx[start:stop], days[start:stop], res[start:stop])
+
+
+@dataclass(slots=True)
+class _UndoRecord:
+    """The state at ``offset`` of the cards first changed after it."""
+
+    offset: int
+    cards: list[npt.NDArray[np.intp]] = field(default_factory=list)
+    columns: list[dict[str, npt.NDArray[Any]]] = field(default_factory=list)
+
+    def restore(self, deck: Deck) -> None:
+        for cards, columns in zip(reversed(self.cards), reversed(self.columns), strict=True):
+            for name, values in columns.items():
+                getattr(deck, name)[cards] = values
+        deck.bump_version()
+
+
+class ReplayEngine:
+    """Keeps a deck folded over a growing review log, with checkpoints to rewind to.
+
+    Every ``checkpoint_interval`` log rows a checkpoint is taken. Checkpoints
+    are incremental: each saves only the cards changed since the previous one.
+    After a failed :meth:`feed` the engine rewinds to its latest checkpoint, so
+    the deck always reflects exactly the first :attr:`offset` rows.
+
+    The deck may grow with :meth:`Deck.resize` between feeds, but must not shrink.
+
+    Args:
+        deck: The deck to keep up to date. Its current state is offset 0.
+        checkpoint_interval: The number of log rows between checkpoints.
+        max_checkpoints: How many past checkpoints to keep. Older ones are
+            dropped and can no longer be rewound to. None keeps all of them.
+        chunk_size: The number of log rows folded per chunk.
+    """
+
+    def __init__(
+        self,
+        deck: Deck,
+        checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+        max_checkpoints: int | None = DEFAULT_MAX_CHECKPOINTS,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        if checkpoint_interval <= 0:
+            raise ValueError(f"checkpoint_interval must be positive, got {checkpoint_interval}")
+        if max_checkpoints is not None and max_checkpoints < 0:
+            raise ValueError(f"max_checkpoints must be non-negative, got {max_checkpoints}")
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        self.deck = deck
+        self.checkpoint_interval = checkpoint_interval
+        self.max_checkpoints = max_checkpoints
+        self.chunk_size = chunk_size
+        self._offset = 0
+        self._closed: list[_UndoRecord] = []
+        self._open = _UndoRecord(0)
+        self._touched = np.zeros(len(deck), dtype=bool)
+
+    @property
+    def offset(self) -> int:
+        """The number of log rows folded into the deck."""
+        return self._offset
+
+    @property
+    def checkpoints(self) -> list[int]:
+        """The log offsets that :meth:`rewind` can restore, oldest first."""
+        return [record.offset for record in self._closed] + [self._open.offset]
+
+    def feed(
+        self, cards: npt.ArrayLike, attempted_at: npt.ArrayLike, results: npt.ArrayLike
+    ) -> None:
+        """Fold the next rows of the log into the deck.
+
+        Args:
+            cards: The card of each review.
+            attempted_at: Epoch days of the reviews, in non-decreasing order per
+                card, and not before the card's previously fed reviews.
+            results: The review results, as accepted by the deck's scheduler.
+
+        Raises:
+            ValueError: If a card index or a result is invalid. The engine is
+                then rewound to its latest checkpoint.
+        """
+        idx, days, res = as_review_log(cards, attempted_at, results)
+        if idx.size and (idx.min() < 0 or idx.max() >= len(self.deck)):
+            raise ValueError(f"cards must be in [0, {len(self.deck)})")
+        start = 0
+        try:
+            while start < len(idx):
+                boundary = self._open.offset + self.checkpoint_interval
+                stop = start + min(self.chunk_size, boundary - self._offset, len(idx) - start)
+                self._save(idx[start:stop])
+                review_rounds(self.deck, idx[start:stop], days[start:stop], res[start:stop])
+                self._offset += stop - start
+                start = stop
+                if self._offset == boundary:
+                    self._checkpoint()
+        except Exception:
+            self.rewind(self._open.offset)
+            raise
+
+    def rewind(self, offset: int) -> int:
+        """Restore the deck to the latest checkpoint at or before ``offset``.
+
+        Checkpoints after it are discarded. Feed the log from the returned
+        offset to bring the deck up to date again. The deck's ``version`` is
+        incremented, as by any other update.
+
+        Args:
+            offset: The log offset that must not have been folded in.
+
+        Returns:
+            The offset of the restored checkpoint.
+
+        Raises:
+            ValueError: If every checkpoint at or before ``offset`` was dropped.
+        """
+        if offset < 0 or offset < self.checkpoints[0]:
+            raise ValueError(f"no checkpoint at or before offset {offset}")
+        self._open.restore(self.deck)
+        while self._open.offset > offset:
+            self._open = self._closed.pop()
+            self._open.restore(self.deck)
+        self._offset = self._open.offset
+        self._open = _UndoRecord(self._offset)
+        self._touched[:] = False
+        return self._offset
+
+    def _save(self, cards: npt.NDArray[np.intp]) -> None:
+        """Record the current state of the cards not yet changed since the last checkpoint."""
+        if len(self._touched) < len(self.deck):
+            grown = np.zeros(len(self.deck), dtype=bool)
+            grown[: len(self._touched)] = self._touched
+            self._touched = grown
+        new = np.unique(cards[~self._touched[cards]])
+        if not new.size:
+            return
+        self._touched[new] = True
+        self._open.cards.append(new)
+        self._open.columns.append(
+            {name: getattr(self.deck, name)[new] for name in self.deck.columns}
+        )
+
+    def _checkpoint(self) -> None:
+        self._closed.append(self._open)
+        if self.max_checkpoints is not None:
+            del self._closed[: max(len(self._closed) - self.max_checkpoints, 0)]
+        self._open = _UndoRecord(self._offset)
+        self._touched[:] = False
@@ -0,0 +1,128 @@
+"""Probability of recall of every card of a deck.
+
+:func:`retrievability` evaluates the FSRS-6 forgetting curve (see
+:func:`~spacedreppy.schedulers.fsrs.forgetting_curve`) for a whole deck in one
+vectorized pass. :class:`RetrievabilityCache` keeps the result per day, so
+repeated dashboard queries of the same day reuse it until the deck changes.
+
+An :class:`~spacedreppy.deck.FSRSDeck` stores each card's memory stability and
+last review. SM-2 and Leitner decks do not model memory, so their cards are
+given the stability at which recall is 90% on the due date: their current
+interval, reviewed ``interval`` days before the due date.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+import numpy.typing as npt
+
+from spacedreppy.deck import UNSCHEDULED, Deck, FSRSDeck
+from spacedreppy.epoch import as_epoch_day
+from spacedreppy.schedulers.fsrs import MIN_STABILITY, FSRSParameters, forgetting_curve
+
+DEFAULT_CACHED_DAYS = 7
+
+
+def memory_state(
+    deck: Deck,
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.int64]]:
+    """Return the memory stability and last review day of every card.
+
+    SM-2 and Leitner cards get the stability at which recall is 90% on their
+    due date, as described above.
+
+    Args:
+        deck: The deck.
+
+    Returns:
+        The stabilities and last review epoch days, as new arrays. Unscheduled
+        cards have zero stability and an :data:`UNSCHEDULED` last review.
+    """
+    if isinstance(deck, FSRSDeck):
+        return deck.stability.astype(np.float64), deck.last_review.copy()
+    scheduled = deck.due != UNSCHEDULED
+    stability = np.where(scheduled, np.maximum(deck.interval, MIN_STABILITY), 0.0)
+    last_review = np.where(scheduled, deck.due - deck.interval, UNSCHEDULED)
+    return stability, last_review
+
+
+def _curve(deck: Deck) -> FSRSParameters | None:
+    """Return the parameters of a deck's forgetting curve; None for the default one."""
+    return deck.parameters if isinstance(deck, FSRSDeck) else None
+
+
+def retrievability(deck: Deck, at: datetime | int | None = None) -> npt.NDArray[np.float64]:
+    """Return the probability of recall of every card on a day.
+
+    Args:
+        deck: The deck.
+        at: The timestamp or epoch day to evaluate. Defaults to today (UTC).
+
+    Returns:
+        One probability per card, NaN for cards that were never reviewed. Cards
+        reviewed after ``at`` count as just reviewed.
+    """
+    day = as_epoch_day(at)
+    stability, last_review = memory_state(deck)
+    elapsed = np.where(last_review == UNSCHEDULED, 0, day - last_review)
+    return forgetting_curve(elapsed, stability, _curve(deck))
+
+
+class RetrievabilityCache:
+    """Retrievability queries over a deck, cached per day.
+
+    The probabilities of a day are computed once and reused until the deck's
+    ``version`` changes (every review or resize through the deck changes it)
+    or the FSRS parameters of the deck are replaced. The most recent
+    ``max_days`` days are kept.
+
+    Args:
+        deck: The deck to query.
+        max_days: The number of days kept in the cache.
+    """
+
+    def __init__(self, deck: Deck, max_days: int = DEFAULT_CACHED_DAYS) -> None:
+        if max_days <= 0:
+            raise ValueError(f"max_days must be positive, got {max_days}")
+        self.deck = deck
+        self.max_days = max_days
+        self._cache: OrderedDict[int, npt.NDArray[np.float64]] = OrderedDict()
+        self._key: tuple[int, FSRSParameters | None] = (deck.version, _curve(deck))
+        self.hits = 0
+        self.misses = 0
+
+    def retrievability(self, at: datetime | int | None = None) -> npt.NDArray[np.float64]:
+        """Return the probability of recall of every card, as :func:`retrievability`.
+
+        The returned array is read-only and shared between calls.
+        """
+        key = (self.deck.version, _curve(self.deck))
+        if key != self._key:
+            self._cache.clear()
+            self._key = key
+        day = as_epoch_day(at)
+        cached = self._cache.get(day)
+        if cached is not None:
+            self._cache.move_to_end(day)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        result = retrievability(self.deck, day)
+        result.setflags(write=False)
+        self._cache[day] = result
+        if len(self._cache) > self.max_days:
+            self._cache.popitem(last=False)
+        return result
+
+    def mean(self, at: datetime | int | None = None) -> float:
+        """Return the mean probability of recall of the reviewed cards (NaN if none)."""
+        r = self.retrievability(at)
+        reviewed = r[~np.isnan(r)]
+        return float(reviewed.mean()) if reviewed.size else float("nan")
+
+    def count_below(self, threshold: float, at: datetime | int | None = None) -> int:
+        """Return how many reviewed cards have a probability of recall below ``threshold``."""
+        return int(np.count_nonzero(self.retrievability(at) < threshold))
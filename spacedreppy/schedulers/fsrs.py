@@ -10,9 +10,23 @@ Reference: https://github.com/open-spaced-repetition/fsrs4anki/wiki/The-Algorith
 from __future__ import annotations
 
 import math
+import struct
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-
-from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from spacedreppy.epoch import from_epoch_day, to_epoch_day
+from spacedreppy.schedulers.spaced_repetition_scheduler import (
+    TIMESTAMP_FORMAT,
+    SpacedRepetitionScheduler,
+    pack_moment,
+    unpack_moment,
+)
 
 # Rating constants
 AGAIN = 1
@@ -71,11 +85,131 @@ def _initial_difficulty(rating: int, w: tuple[float, ...]) -> float:
     return _constrain_difficulty(w[4] - math.exp(w[5] * (rating - 1)) + 1)
 
 
+@dataclass(frozen=True, slots=True)
+class FSRSParameters:
+    """Validated FSRS-6 weights and target retention with their derived constants.
+
+    Everything that depends only on the weights and the retention is computed
+    once here, so the per-review math only does state-dependent work.
+    Rating-indexed tables are indexed by ``rating - 1``. Use
+    :func:`fsrs_parameters` to get a cached instance shared by every caller
+    with the same weights and retention.
+
+    Args:
+        weights: Tuple of 21 FSRS-6 model weights.
+        request_retention: Target retention probability (0 < r < 1).
+
+    Raises:
+        ValueError: If the weights or the retention are invalid.
+    """
+
+    weights: tuple[float, ...]
+    request_retention: float
+    decay: float = field(init=False)
+    factor: float = field(init=False)
+    # r^(1/decay) - 1, the retention-dependent term of the interval formula.
+    retention_term: float = field(init=False)
+    exp_w8: float = field(init=False)
+    # exp(w17 * w18); a post-lapse stability is capped at S / this.
+    forget_divisor: float = field(init=False)
+    # D0(Easy), the mean-reversion target of the difficulty.
+    d0_easy: float = field(init=False)
+    initial_stability: tuple[float, ...] = field(init=False)
+    initial_difficulty: tuple[float, ...] = field(init=False)
+    # -w6 * (G - 3), the difficulty change before damping.
+    difficulty_delta: tuple[float, ...] = field(init=False)
+    # exp(w17 * (G - 3 + w18)), the same-day stability growth before S^-w19.
+    short_term_growth: tuple[float, ...] = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Validate the inputs and compute the derived constants."""
+        w = self.weights
+        if len(w) != NUM_WEIGHTS:
+            raise ValueError(f"weights must have {NUM_WEIGHTS} elements, got {len(w)}")
+        if not 0 < self.request_retention < 1:
+            raise ValueError(
+                f"request_retention must be between 0 and 1 exclusive, got {self.request_retention}"
+            )
+        grades = range(MIN_RATING, MAX_RATING + 1)
+        decay = -w[20]
+        derived = {
+            "decay": decay,
+            "factor": 0.9 ** (1 / decay) - 1,
+            "retention_term": self.request_retention ** (1 / decay) - 1,
+            "exp_w8": math.exp(w[8]),
+            "forget_divisor": math.exp(w[17] * w[18]),
+            "d0_easy": _initial_difficulty(EASY, w),
+            "initial_stability": tuple(_initial_stability(g, w) for g in grades),
+            "initial_difficulty": tuple(_initial_difficulty(g, w) for g in grades),
+            "difficulty_delta": tuple(-w[6] * (g - 3) for g in grades),
+            "short_term_growth": tuple(math.exp(w[17] * (g - 3 + w[18])) for g in grades),
+        }
+        for name, value in derived.items():
+            object.__setattr__(self, name, value)
+
+    def __reduce__(self) -> tuple[object, tuple[tuple[float, ...], float]]:
+        """Unpickle through :func:`fsrs_parameters` so loaded instances are shared too."""
+        return fsrs_parameters, (self.weights, self.request_retention)
+
+
+@lru_cache(maxsize=256)
+def _cached_parameters(weights: tuple[float, ...], request_retention: float) -> FSRSParameters:
+    return FSRSParameters(weights, request_retention)
+
+
+def fsrs_parameters(
+    weights: Sequence[float] = DEFAULT_WEIGHTS,
+    request_retention: float = DEFAULT_REQUEST_RETENTION,
+) -> FSRSParameters:
+    """Return the shared :class:`FSRSParameters` for a weight set and retention.
+
+    Args:
+        weights: The 21 FSRS-6 model weights.
+        request_retention: Target retention probability (0 < r < 1).
+
+    Returns:
+        A cached parameters object; equal inputs return the same instance.
+
+    Raises:
+        ValueError: If the weights or the retention are invalid.
+    """
+    return _cached_parameters(tuple(weights), request_retention)
+
+
 def _forgetting_curve(elapsed_days: float, stability: float, decay: float, factor: float) -> float:
     """R(t, S) = (1 + factor * t / S) ^ decay."""
     return float((1 + factor * elapsed_days / stability) ** decay)
 
 
+def forgetting_curve(
+    elapsed_days: npt.ArrayLike,
+    stability: npt.ArrayLike,
+    parameters: FSRSParameters | None = None,
+) -> npt.NDArray[np.float64]:
+    """The FSRS-6 probability of recall after ``elapsed_days`` days, element-wise.
+
+    R(t, S) = (1 + factor * t / S) ^ decay, which is 0.9 when t == S. Inputs
+    are broadcast against each other.
+
+    Args:
+        elapsed_days: Days since the last review; negative values count as 0.
+        stability: Memory stabilities in days. Cards with zero stability (never
+            reviewed) get NaN.
+        parameters: The weights defining the curve's decay. Defaults to the
+            default weights.
+
+    Returns:
+        The probabilities of recall.
+    """
+    p = parameters if parameters is not None else fsrs_parameters()
+    t = np.maximum(np.asarray(elapsed_days, dtype=np.float64), 0)
+    s = np.asarray(stability, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = (1 + p.factor * t / s) ** p.decay
+    result: npt.NDArray[np.float64] = np.where(s > 0, r, np.nan)
+    return result
+
+
 def _linear_damping(delta_d: float, old_d: float) -> float:
     return delta_d * (MAX_DIFFICULTY - old_d) / 9
 
@@ -84,26 +218,24 @@ def _mean_reversion(init: float, current: float, w7: float) -> float:
     return w7 * init + (1 - w7) * current
 
 
-def _next_difficulty(d: float, rating: int, w: tuple[float, ...]) -> float:
+def _next_difficulty(d: float, rating: int, p: FSRSParameters) -> float:
     """Compute new difficulty after review with linear damping and mean reversion."""
-    delta_d = -w[6] * (rating - 3)
+    delta_d = p.difficulty_delta[rating - 1]
     next_d = d + _linear_damping(delta_d, d)
     # Mean reversion towards D0(4) (Easy) in FSRS-5+
-    d0_easy = _initial_difficulty(EASY, w)
-    return _constrain_difficulty(_mean_reversion(d0_easy, next_d, w[7]))
+    return _constrain_difficulty(_mean_reversion(p.d0_easy, next_d, p.weights[7]))
 
 
-def _next_recall_stability(
-    d: float, s: float, r: float, rating: int, w: tuple[float, ...]
-) -> float:
+def _next_recall_stability(d: float, s: float, r: float, rating: int, p: FSRSParameters) -> float:
     """S'r — new stability after successful recall (Hard, Good, or Easy)."""
+    w = p.weights
     hard_penalty = w[15] if rating == HARD else 1.0
     easy_bonus = w[16] if rating == EASY else 1.0
     return float(
         s
         * (
             1
-            + math.exp(w[8])
+            + p.exp_w8
             * (11 - d)
             * s ** (-w[9])
             * (math.exp((1 - r) * w[10]) - 1)
@@ -113,9 +245,10 @@ def _next_recall_stability(
     )
 
 
-def _next_forget_stability(d: float, s: float, r: float, w: tuple[float, ...]) -> float:
+def _next_forget_stability(d: float, s: float, r: float, p: FSRSParameters) -> float:
     """S'f — new stability after forgetting (Again), capped at s_min."""
-    s_min = s / math.exp(w[17] * w[18])
+    w = p.weights
+    s_min = s / p.forget_divisor
     return float(
         min(
             w[11] * d ** (-w[12]) * ((s + 1) ** w[13] - 1) * math.exp((1 - r) * w[14]),
@@ -124,27 +257,21 @@ def _next_forget_stability(d: float, s: float, r: float, w: tuple[float, ...]) -
     )
 
 
-def _next_short_term_stability(s: float, rating: int, w: tuple[float, ...]) -> float:
+def _next_short_term_stability(s: float, rating: int, p: FSRSParameters) -> float:
     """S'(S, G) for same-day reviews.
 
     S' = S * e^(w17 * (G - 3 + w18)) * S^(-w19),
     with SInc >= 1 when G >= 3.
     """
-    s_inc = math.exp(w[17] * (rating - 3 + w[18])) * s ** (-w[19])
+    s_inc = p.short_term_growth[rating - 1] * s ** (-p.weights[19])
     if rating >= GOOD:
         s_inc = max(s_inc, 1.0)
     return float(s * s_inc)
 
 
-def _next_interval(
-    stability: float,
-    request_retention: float,
-    maximum_interval: int,
-    decay: float,
-    factor: float,
-) -> int:
+def _next_interval(stability: float, maximum_interval: int, p: FSRSParameters) -> int:
     """I(r, S) = S / factor * (r^(1/decay) - 1), clamped to [1, maximum_interval]."""
-    ivl = stability / factor * (request_retention ** (1 / decay) - 1)
+    ivl = stability / p.factor * p.retention_term
     return int(min(max(round(ivl), 1), maximum_interval))
 
 
@@ -156,6 +283,7 @@ def fsrs(
     weights: tuple[float, ...] = DEFAULT_WEIGHTS,
     request_retention: float = DEFAULT_REQUEST_RETENTION,
     maximum_interval: int = DEFAULT_MAXIMUM_INTERVAL,
+    parameters: FSRSParameters | None = None,
 ) -> tuple[float, float, int]:
     """FSRS-6 algorithm.
 
@@ -173,6 +301,8 @@ def fsrs(
         weights: Tuple of 21 FSRS-6 model weights.
         request_retention: Target retention probability (0 < r < 1).
         maximum_interval: Maximum allowed interval in days.
+        parameters: Precomputed weights and retention. When given, ``weights``
+            and ``request_retention`` are ignored.
 
     Returns:
         A tuple of (new_stability, new_difficulty, interval_days).
@@ -186,43 +316,204 @@ def fsrs(
         raise ValueError(f"stability must be non-negative, got {stability}")
     if elapsed_days < 0:
         raise ValueError(f"elapsed_days must be non-negative, got {elapsed_days}")
-    if len(weights) != NUM_WEIGHTS:
-        raise ValueError(f"weights must have {NUM_WEIGHTS} elements, got {len(weights)}")
-    if not 0 < request_retention < 1:
-        raise ValueError(
-            f"request_retention must be between 0 and 1 exclusive, got {request_retention}"
-        )
     if maximum_interval <= 0:
         raise ValueError(f"maximum_interval must be positive, got {maximum_interval}")
+    p = parameters if parameters is not None else fsrs_parameters(weights, request_retention)
+    return fsrs_unchecked(rating, stability, difficulty, elapsed_days, p, maximum_interval)
+
+
+def fsrs_unchecked(
+    rating: int,
+    stability: float,
+    difficulty: float,
+    elapsed_days: float,
+    parameters: FSRSParameters,
+    maximum_interval: int = DEFAULT_MAXIMUM_INTERVAL,
+) -> tuple[float, float, int]:
+    """FSRS-6 algorithm without input validation.
 
-    w = weights
-    decay = -w[20]
-    factor = 0.9 ** (1 / decay) - 1
+    Same numerics as :func:`fsrs`, for callers that have already validated
+    their inputs. Out-of-range inputs give undefined results instead of
+    raising.
+
+    Args:
+        rating: A grade from 1 (Again) to 4 (Easy).
+        stability: Current memory stability in days (0 for new cards).
+        difficulty: Current difficulty in [1, 10] (0 for new cards).
+        elapsed_days: Days since last review (0 for new or same-day reviews).
+        parameters: Precomputed weights and retention, validated on construction.
+        maximum_interval: Maximum allowed interval in days.
 
+    Returns:
+        A tuple of (new_stability, new_difficulty, interval_days).
+    """
+    p = parameters
     if stability == 0:
         # New card
-        new_s = _initial_stability(rating, w)
-        new_d = _initial_difficulty(rating, w)
+        new_s = p.initial_stability[rating - 1]
+        new_d = p.initial_difficulty[rating - 1]
     elif elapsed_days == 0:
         # Same-day review
-        new_s = _next_short_term_stability(stability, rating, w)
-        new_d = _next_difficulty(difficulty, rating, w)
+        new_s = _next_short_term_stability(stability, rating, p)
+        new_d = _next_difficulty(difficulty, rating, p)
     else:
         # Regular review
-        r = _forgetting_curve(elapsed_days, stability, decay, factor)
-        new_d = _next_difficulty(difficulty, rating, w)
+        r = _forgetting_curve(elapsed_days, stability, p.decay, p.factor)
+        new_d = _next_difficulty(difficulty, rating, p)
         if rating == AGAIN:
-            new_s = _next_forget_stability(difficulty, stability, r, w)
+            new_s = _next_forget_stability(difficulty, stability, r, p)
         else:
-            new_s = _next_recall_stability(difficulty, stability, r, rating, w)
+            new_s = _next_recall_stability(difficulty, stability, r, rating, p)
 
-    interval = _next_interval(new_s, request_retention, maximum_interval, decay, factor)
+    interval = _next_interval(new_s, maximum_interval, p)
     return new_s, new_d, interval
 
 
+# Relative distance from a rounding tie within which a batch interval may
+# round differently from the scalar path, far above the few ulps they differ by.
+_TIE_TOLERANCE = 1e-9
+
+
+def _as_ratings(ratings: npt.ArrayLike) -> npt.NDArray[np.int64]:
+    """Convert ratings to integers, rejecting fractional values instead of truncating them."""
+    g = np.asarray(ratings)
+    if g.dtype.kind not in "iu" and not (g.dtype.kind == "f" and np.array_equal(g, np.trunc(g))):
+        raise ValueError("ratings must be integers")
+    return g.astype(np.int64)
+
+
+def fsrs_batch(
+    ratings: npt.ArrayLike,
+    stabilities: npt.ArrayLike,
+    difficulties: npt.ArrayLike,
+    elapsed_days: npt.ArrayLike,
+    weights: tuple[float, ...] = DEFAULT_WEIGHTS,
+    request_retention: float = DEFAULT_REQUEST_RETENTION,
+    maximum_interval: int = DEFAULT_MAXIMUM_INTERVAL,
+    parameters: FSRSParameters | None = None,
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.int64]]:
+    """Vectorized FSRS-6 algorithm over arrays of cards.
+
+    Element-wise equivalent of calling :func:`fsrs` once per card. Inputs are
+    broadcast against each other and validated once for the whole batch. The
+    new-card, same-day and regular-review branches are selected with boolean
+    masks, and the rating-dependent terms are gathered from the per-rating
+    tables of :class:`FSRSParameters`.
+
+    Stabilities may differ from the scalar path in the last few ulps, since
+    NumPy's ``exp`` and ``pow`` round differently from :mod:`math`. Intervals
+    are always identical: cards whose interval lies within that error of a
+    rounding tie are recomputed with :func:`fsrs_unchecked`.
+
+    Args:
+        ratings: Grades from 1 (Again) to 4 (Easy).
+        stabilities: Current memory stabilities in days (0 for new cards).
+        difficulties: Current difficulties in [1, 10] (0 for new cards).
+        elapsed_days: Days since last review (0 for new or same-day reviews).
+        weights: Tuple of 21 FSRS-6 model weights.
+        request_retention: Target retention probability (0 < r < 1).
+        maximum_interval: Maximum allowed interval in days.
+        parameters: Precomputed weights and retention. When given, ``weights``
+            and ``request_retention`` are ignored.
+
+    Returns:
+        A tuple of (new_stabilities, new_difficulties, intervals) arrays.
+
+    Raises:
+        ValueError: If any rating is not an integer or any input is out of valid range.
+    """
+    g, s, d, t = np.broadcast_arrays(
+        _as_ratings(ratings),
+        np.asarray(stabilities, dtype=np.float64),
+        np.asarray(difficulties, dtype=np.float64),
+        np.asarray(elapsed_days, dtype=np.float64),
+    )
+    if g.size:
+        if g.min() < MIN_RATING or g.max() > MAX_RATING:
+            raise ValueError(f"ratings must be between {MIN_RATING} and {MAX_RATING}")
+        if s.min() < 0:
+            raise ValueError("stabilities must be non-negative")
+        if t.min() < 0:
+            raise ValueError("elapsed_days must be non-negative")
+    if maximum_interval <= 0:
+        raise ValueError(f"maximum_interval must be positive, got {maximum_interval}")
+    p = parameters if parameters is not None else fsrs_parameters(weights, request_retention)
+
+    w = p.weights
+    new_s = np.empty(g.shape, dtype=np.float64)
+    new_d = np.empty(g.shape, dtype=np.float64)
+
+    new = s == 0
+    same_day = ~new & (t == 0)
+    review = ~new & ~same_day
+
+    if new.any():
+        idx = g[new] - MIN_RATING
+        new_s[new] = np.array(p.initial_stability)[idx]
+        new_d[new] = np.array(p.initial_difficulty)[idx]
+
+    not_new = ~new
+    if not_new.any():
+        old_d = d[not_new]
+        delta_d = np.array(p.difficulty_delta)[g[not_new] - MIN_RATING]
+        next_d = old_d + delta_d * (MAX_DIFFICULTY - old_d) / 9
+        new_d[not_new] = np.clip(
+            w[7] * p.d0_easy + (1 - w[7]) * next_d, MIN_DIFFICULTY, MAX_DIFFICULTY
+        )
+
+    if same_day.any():
+        gs = g[same_day]
+        ss = s[same_day]
+        s_inc = np.array(p.short_term_growth)[gs - MIN_RATING] * ss ** (-w[19])
+        s_inc = np.where(gs >= GOOD, np.maximum(s_inc, 1.0), s_inc)
+        new_s[same_day] = ss * s_inc
+
+    if review.any():
+        forget = review & (g == AGAIN)
+        recall = review & ~forget
+
+        if forget.any():
+            fd, fs, ft = d[forget], s[forget], t[forget]
+            r = (1 + p.factor * ft / fs) ** p.decay
+            new_s[forget] = np.minimum(
+                w[11] * fd ** (-w[12]) * ((fs + 1) ** w[13] - 1) * np.exp((1 - r) * w[14]),
+                fs / p.forget_divisor,
+            )
+
+        if recall.any():
+            gr, rd, rs, rt = g[recall], d[recall], s[recall], t[recall]
+            r = (1 + p.factor * rt / rs) ** p.decay
+            hard_penalty = np.where(gr == HARD, w[15], 1.0)
+            easy_bonus = np.where(gr == EASY, w[16], 1.0)
+            new_s[recall] = rs * (
+                1
+                + p.exp_w8
+                * (11 - rd)
+                * rs ** (-w[9])
+                * (np.exp((1 - r) * w[10]) - 1)
+                * hard_penalty
+                * easy_bonus
+            )
+
+    ivl = np.asarray(new_s / p.factor * p.retention_term)
+    # Recompute cards that may round differently from the scalar path.
+    near_tie = np.abs(ivl - np.floor(ivl) - 0.5) <= _TIE_TOLERANCE * ivl
+    for index in np.argwhere(near_tie):
+        i = tuple(index)
+        new_s[i], new_d[i], _ = fsrs_unchecked(
+            int(g[i]), float(s[i]), float(d[i]), float(t[i]), p, maximum_interval
+        )
+        ivl[i] = new_s[i] / p.factor * p.retention_term
+    intervals = np.minimum(np.maximum(np.rint(ivl), 1), maximum_interval).astype(np.int64)
+    return new_s, new_d, intervals
+
+
 class FSRSScheduler(SpacedRepetitionScheduler):
     """Spaced repetition scheduler using the FSRS-6 algorithm.
 
+    Schedulers with the same weights and retention share one cached
+    :class:`FSRSParameters`.
+
     Args:
         stability: Current memory stability in days. Defaults to 0 (new card).
         difficulty: Current difficulty. Defaults to 0 (new card).
@@ -230,8 +521,25 @@ class FSRSScheduler(SpacedRepetitionScheduler):
         request_retention: Target retention probability. Defaults to 0.9.
         maximum_interval: Maximum allowed interval in days. Defaults to 36500.
         interval: The current interval in days. Defaults to 0.
+        parameters: Precomputed weights and retention. When given, ``weights``
+            and ``request_retention`` are ignored.
+        validate: Whether to validate each review. Pass False for trusted
+            inputs to use :func:`fsrs_unchecked`.
     """
 
+    __slots__ = (
+        "_last_review_at",
+        "_last_review_day",
+        "difficulty",
+        "maximum_interval",
+        "parameters",
+        "stability",
+    )
+
+    _type_tag = 1
+    # stability, difficulty, maximum_interval, last_review_at, request_retention, weights
+    _STATE = struct.Struct(f"<ddi{TIMESTAMP_FORMAT}d{NUM_WEIGHTS}d")
+
     def __init__(
         self,
         stability: float = 0.0,
@@ -240,14 +548,70 @@ class FSRSScheduler(SpacedRepetitionScheduler):
         request_retention: float = DEFAULT_REQUEST_RETENTION,
         maximum_interval: int = DEFAULT_MAXIMUM_INTERVAL,
         interval: int = 0,
+        parameters: FSRSParameters | None = None,
+        validate: bool = True,
     ) -> None:
-        super().__init__(interval=interval)
+        super().__init__(interval=interval, validate=validate)
         self.stability = stability
         self.difficulty = difficulty
-        self.weights = weights
-        self.request_retention = request_retention
+        self.parameters = (
+            parameters if parameters is not None else fsrs_parameters(weights, request_retention)
+        )
         self.maximum_interval = maximum_interval
-        self.last_review_at: datetime | None = None
+        # Held like the due date: a timestamp, an epoch day, or both.
+        self._last_review_at: datetime | None = None
+        self._last_review_day: int | None = None
+
+    @property
+    def last_review_at(self) -> datetime | None:
+        """The timestamp of the last review, or None if never reviewed."""
+        if self._last_review_at is None and self._last_review_day is not None:
+            self._last_review_at = from_epoch_day(self._last_review_day)
+        return self._last_review_at
+
+    @last_review_at.setter
+    def last_review_at(self, last_review_at: datetime | None) -> None:
+        self._last_review_at = last_review_at
+        self._last_review_day = None
+
+    @property
+    def last_review_day(self) -> int | None:
+        """The epoch day of the last review, or None if never reviewed."""
+        if self._last_review_day is None and self._last_review_at is not None:
+            self._last_review_day = to_epoch_day(self._last_review_at)
+        return self._last_review_day
+
+    @last_review_day.setter
+    def last_review_day(self, last_review_day: int | None) -> None:
+        self._last_review_day = last_review_day
+        self._last_review_at = None
+
+    @property
+    def weights(self) -> tuple[float, ...]:
+        """Tuple of 21 FSRS-6 model weights."""
+        return self.parameters.weights
+
+    @weights.setter
+    def weights(self, weights: tuple[float, ...]) -> None:
+        self.parameters = fsrs_parameters(weights, self.parameters.request_retention)
+
+    @property
+    def request_retention(self) -> float:
+        """Target retention probability."""
+        return self.parameters.request_retention
+
+    @request_retention.setter
+    def request_retention(self, request_retention: float) -> None:
+        self.parameters = fsrs_parameters(self.parameters.weights, request_retention)
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore the scheduler state, including states pickled before ``parameters``."""
+        state = dict(state)
+        if "parameters" not in state:
+            weights = state.pop("weights", DEFAULT_WEIGHTS)
+            request_retention = state.pop("request_retention", DEFAULT_REQUEST_RETENTION)
+            state["parameters"] = fsrs_parameters(weights, request_retention)
+        super().__setstate__(state)
 
     def _compute_next_due_interval(
         self, attempted_at: datetime, result: int
@@ -261,27 +625,64 @@ class FSRSScheduler(SpacedRepetitionScheduler):
         Returns:
             A tuple of the next due timestamp and the interval timedelta.
         """
-        if self.last_review_at is not None:
-            elapsed_days = max((attempted_at - self.last_review_at).days, 0)
+        last_review_at = self.last_review_at
+        if last_review_at is not None:
+            elapsed_days = max((attempted_at - last_review_at).days, 0)
         else:
             elapsed_days = 0
-
-        new_s, new_d, interval_days = fsrs(
-            rating=result,
-            stability=self.stability,
-            difficulty=self.difficulty,
-            elapsed_days=elapsed_days,
-            weights=self.weights,
-            request_retention=self.request_retention,
-            maximum_interval=self.maximum_interval,
-        )
-
-        self.stability = new_s
-        self.difficulty = new_d
-        self.interval = interval_days
+        self._update(result, elapsed_days)
         self.last_review_at = attempted_at
 
         new_timedelta_interval = timedelta(days=self.interval)
         prev_start_timestamp = self.due_timestamp if self.due_timestamp else attempted_at
         due_timestamp = prev_start_timestamp + new_timedelta_interval
         return due_timestamp, new_timedelta_interval
+
+    def _review_day(self, attempted_day: int, result: int) -> int:
+        last_review_day = self.last_review_day
+        elapsed_days = 0 if last_review_day is None else max(attempted_day - last_review_day, 0)
+        self._update(result, elapsed_days)
+        self.last_review_day = attempted_day
+        return self.interval
+
+    def _update(self, result: int, elapsed_days: int) -> None:
+        """Update the memory state and interval for a review ``elapsed_days`` after the last."""
+        if self.validate:
+            new_s, new_d, interval_days = fsrs(
+                rating=result,
+                stability=self.stability,
+                difficulty=self.difficulty,
+                elapsed_days=elapsed_days,
+                maximum_interval=self.maximum_interval,
+                parameters=self.parameters,
+            )
+        else:
+            new_s, new_d, interval_days = fsrs_unchecked(
+                result,
+                self.stability,
+                self.difficulty,
+                elapsed_days,
+                self.parameters,
+                self.maximum_interval,
+            )
+
+        self.stability = new_s
+        self.difficulty = new_d
+        self.interval = interval_days
+
+    def _pack_state(self) -> bytes:
+        return self._STATE.pack(
+            self.stability,
+            self.difficulty,
+            self.maximum_interval,
+            *pack_moment(self._last_review_at, self._last_review_day),
+            self.request_retention,
+            *self.weights,
+        )
+
+    def _unpack_state(self, data: memoryview, offset: int) -> int:
+        fields = self._STATE.unpack_from(data, offset)
+        self.stability, self.difficulty, self.maximum_interval = fields[:3]
+        self._last_review_at, self._last_review_day = unpack_moment(*fields[3:6])
+        self.parameters = fsrs_parameters(fields[7:], fields[6])
+        return offset + self._STATE.size
@@ -1,7 +1,12 @@
 """Leitner system spaced repetition scheduler."""
 
+import functools
+import struct
 from datetime import datetime, timedelta
 
+import numpy as np
+import numpy.typing as npt
+
 from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
 
 # Leitner system constants
@@ -29,13 +34,85 @@ def leitner(correct: bool, current_box: int, num_boxes: int) -> int:
         raise ValueError(f"num_boxes must be positive, got {num_boxes}")
     if not 0 <= current_box < num_boxes:
         raise ValueError(f"current_box must be in [0, {num_boxes}), got {current_box}")
+    return leitner_unchecked(correct, current_box, num_boxes)
+
+
+def leitner_unchecked(correct: bool, current_box: int, num_boxes: int) -> int:
+    """Leitner system box promotion/demotion without input validation.
 
+    Same result as :func:`leitner`, for callers that have already validated
+    their inputs.
+
+    Args:
+        correct: Whether the answer was correct.
+        current_box: The current box index (0-based).
+        num_boxes: The total number of boxes.
+
+    Returns:
+        The new box index.
+    """
     if not correct:
         return 0
 
     return min(current_box + 1, num_boxes - 1)
 
 
+@functools.lru_cache(maxsize=64)
+def leitner_transitions(num_boxes: int) -> npt.NDArray[np.int64]:
+    """Return the Leitner system as a lookup table of box transitions.
+
+    The state of a card is fully described by its box, so ``table[box, result]``
+    is the box after a review with ``result`` (0 for incorrect, 1 for correct).
+    Tables are cached per ``num_boxes`` and read-only.
+
+    Args:
+        num_boxes: The total number of boxes.
+
+    Returns:
+        An int64 array of shape ``(num_boxes, 2)``.
+
+    Raises:
+        ValueError: If num_boxes is not positive.
+    """
+    if num_boxes <= 0:
+        raise ValueError(f"num_boxes must be positive, got {num_boxes}")
+    table = np.zeros((num_boxes, MAX_RESULT + 1), dtype=np.int64)
+    table[:, CORRECT_RESULT] = np.minimum(np.arange(1, num_boxes + 1), num_boxes - 1)
+    table.setflags(write=False)
+    return table
+
+
+def leitner_batch(
+    correct: npt.ArrayLike, current_box: npt.ArrayLike, num_boxes: int
+) -> npt.NDArray[np.int64]:
+    """Vectorized Leitner system box promotion/demotion.
+
+    Element-wise equivalent of calling :func:`leitner` once per card. Inputs are
+    broadcast against each other and validated once for the whole batch.
+
+    Args:
+        correct: Whether each answer was correct.
+        current_box: The current box indices (0-based).
+        num_boxes: The total number of boxes.
+
+    Returns:
+        The new box indices.
+
+    Raises:
+        ValueError: If num_boxes is not positive or any current_box is out of range.
+    """
+    if num_boxes <= 0:
+        raise ValueError(f"num_boxes must be positive, got {num_boxes}")
+    ok, box = np.broadcast_arrays(
+        np.asarray(correct, dtype=np.bool_), np.asarray(current_box, dtype=np.int64)
+    )
+    if box.size and (box.min() < 0 or box.max() >= num_boxes):
+        raise ValueError(f"current_box must be in [0, {num_boxes})")
+
+    new_box: npt.NDArray[np.int64] = leitner_transitions(num_boxes)[box, ok.astype(np.intp)]
+    return new_box
+
+
 class LeitnerScheduler(SpacedRepetitionScheduler):
     """Spaced repetition scheduler using the Leitner system.
 
@@ -43,15 +120,23 @@ class LeitnerScheduler(SpacedRepetitionScheduler):
         intervals: Review intervals (in days) for each box. Defaults to [1, 3, 7, 14, 30].
         current_box: The current box index (0-based). Defaults to 0.
         interval: The current interval in days. Defaults to 0.
+        validate: Whether to validate each review result. Pass False for trusted inputs.
     """
 
+    __slots__ = ("current_box", "intervals", "num_boxes")
+
+    _type_tag = 3
+    # current_box, num_boxes; followed by num_boxes int32 intervals
+    _STATE = struct.Struct("<iH")
+
     def __init__(
         self,
         intervals: list[int] | None = None,
         current_box: int = 0,
         interval: int = 0,
+        validate: bool = True,
     ) -> None:
-        super().__init__(interval=interval)
+        super().__init__(interval=interval, validate=validate)
         self.intervals = intervals if intervals is not None else list(DEFAULT_INTERVALS)
 
         if not self.intervals:
@@ -71,10 +156,11 @@ class LeitnerScheduler(SpacedRepetitionScheduler):
         Args:
             result: 1 for correct, 0 for incorrect.
         """
-        if result not in (MIN_RESULT, MAX_RESULT):
+        if self.validate and result not in (MIN_RESULT, MAX_RESULT):
             raise ValueError(f"result must be {MIN_RESULT} or {MAX_RESULT}, got {result}")
-        correct = result == CORRECT_RESULT
-        self.current_box = leitner(correct, self.current_box, self.num_boxes)
+        update = leitner if self.validate else leitner_unchecked
+        # Unchecked results other than 1 count as incorrect.
+        self.current_box = update(result == CORRECT_RESULT, self.current_box, self.num_boxes)
         self.interval = self.intervals[self.current_box]
 
     def _compute_next_due_interval(
@@ -94,3 +180,23 @@ class LeitnerScheduler(SpacedRepetitionScheduler):
         prev_start_timestamp = self.due_timestamp if self.due_timestamp else attempted_at
         due_timestamp = prev_start_timestamp + new_timedelta_interval
         return due_timestamp, new_timedelta_interval
+
+    def _review_day(self, attempted_day: int, result: int) -> int:
+        self._update_params(result)
+        return self.interval
+
+    def _pack_state(self) -> bytes:
+        return self._STATE.pack(self.current_box, self.num_boxes) + struct.pack(
+            f"<{self.num_boxes}i", *self.intervals
+        )
+
+    def _unpack_state(self, data: memoryview, offset: int) -> int:
+        self.current_box, self.num_boxes = self._STATE.unpack_from(data, offset)
+        offset += self._STATE.size
+        intervals = struct.Struct(f"<{self.num_boxes}i")
+        self.intervals = list(intervals.unpack_from(data, offset))
+        if not 0 <= self.current_box < self.num_boxes:
+            raise ValueError(
+                f"current_box must be in [0, {self.num_boxes}), got {self.current_box}"
+            )
+        return offset + intervals.size
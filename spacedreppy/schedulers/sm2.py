@@ -1,5 +1,9 @@
+import struct
 from datetime import datetime, timedelta
 
+import numpy as np
+import numpy.typing as npt
+
 from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
 
 # SM-2 algorithm constants
@@ -13,6 +17,35 @@ EASINESS_OFFSET = 0.1
 EASINESS_LINEAR_COEFF = 0.08
 EASINESS_QUADRATIC_COEFF = 0.02
 
+# Easiness change after a review, indexed by quality.
+_EASINESS_DELTA_TABLE = np.array(
+    [
+        EASINESS_OFFSET
+        - (MAX_QUALITY - quality)
+        * (EASINESS_LINEAR_COEFF + (MAX_QUALITY - quality) * EASINESS_QUADRATIC_COEFF)
+        for quality in range(MIN_QUALITY, MAX_QUALITY + 1)
+    ]
+)
+_EASINESS_DELTA_TABLE.setflags(write=False)
+
+
+def _small_state_intervals() -> npt.NDArray[np.int64]:
+    """Return the new interval indexed by ``[min(repetitions, 2), quality]``.
+
+    With fewer than two repetitions the new interval depends only on the
+    repetitions and the quality. The last row marks with -1 the correct answers
+    whose interval is ``round(interval * easiness)`` instead.
+    """
+    table = np.full((3, MAX_QUALITY - MIN_QUALITY + 1), INITIAL_INTERVAL, dtype=np.int64)
+    correct = np.arange(MIN_QUALITY, MAX_QUALITY + 1) >= CORRECT_QUALITY_THRESHOLD
+    table[1, correct] = SECOND_INTERVAL
+    table[2, correct] = -1
+    table.setflags(write=False)
+    return table
+
+
+_SMALL_STATE_INTERVALS = _small_state_intervals()
+
 
 def sm2(quality: int, interval: int, repetitions: int, easiness: float) -> tuple[int, int, float]:
     """SuperMemo-2 Algorithm (SM-2).
@@ -44,7 +77,26 @@ def sm2(quality: int, interval: int, repetitions: int, easiness: float) -> tuple
         raise ValueError(f"repetitions must be non-negative, got {repetitions}")
     if easiness < 0:
         raise ValueError(f"easiness must be non-negative, got {easiness}")
+    return sm2_unchecked(quality, interval, repetitions, easiness)
+
 
+def sm2_unchecked(
+    quality: int, interval: int, repetitions: int, easiness: float
+) -> tuple[int, int, float]:
+    """SuperMemo-2 Algorithm (SM-2) without input validation.
+
+    Same numerics as :func:`sm2`, for callers that have already validated
+    their inputs.
+
+    Args:
+        quality: A performance measure ranging 0 (complete blackout) to 5 (perfect response).
+        interval: Inter-repetition interval after the n-th repetition (in days).
+        repetitions: The number of consecutive correct answers (quality >= 3).
+        easiness: Easiness factor.
+
+    Returns:
+        The new interval, repetition number, and easiness.
+    """
     if quality < CORRECT_QUALITY_THRESHOLD:  # Incorrect response.
         interval = INITIAL_INTERVAL
         repetitions = 0
@@ -69,14 +121,77 @@ def sm2(quality: int, interval: int, repetitions: int, easiness: float) -> tuple
     return interval, repetitions, easiness
 
 
+def sm2_batch(
+    quality: npt.ArrayLike,
+    interval: npt.ArrayLike,
+    repetitions: npt.ArrayLike,
+    easiness: npt.ArrayLike,
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+    """Vectorized SuperMemo-2 Algorithm (SM-2) over arrays of items.
+
+    Element-wise equivalent of calling :func:`sm2` once per item. Inputs are
+    broadcast against each other and validated once for the whole batch.
+
+    Args:
+        quality: Performance measures ranging 0 (complete blackout) to 5 (perfect response).
+        interval: Inter-repetition intervals after the n-th repetition (in days).
+        repetitions: The numbers of consecutive correct answers (quality >= 3).
+        easiness: Easiness factors.
+
+    Returns:
+        The new intervals, repetition numbers, and easiness factors.
+
+    Raises:
+        ValueError: If any quality is not in [0, 5], or any interval, repetitions,
+            or easiness is negative.
+    """
+    q, ivl, reps, ef = np.broadcast_arrays(
+        np.asarray(quality, dtype=np.int64),
+        np.asarray(interval, dtype=np.int64),
+        np.asarray(repetitions, dtype=np.int64),
+        np.asarray(easiness, dtype=np.float64),
+    )
+    if q.size:
+        if q.min() < MIN_QUALITY or q.max() > MAX_QUALITY:
+            raise ValueError(f"quality must be between {MIN_QUALITY} and {MAX_QUALITY}")
+        if ivl.min() < 0:
+            raise ValueError("interval must be non-negative")
+        if reps.min() < 0:
+            raise ValueError("repetitions must be non-negative")
+        if ef.min() < 0:
+            raise ValueError("easiness must be non-negative")
+
+    # Gather the intervals of the small states; only correct answers after
+    # two or more repetitions need arithmetic.
+    small = _SMALL_STATE_INTERVALS[np.minimum(reps, 2), q - MIN_QUALITY]
+    new_interval = np.where(small < 0, np.rint(ivl * ef).astype(np.int64), small)
+    new_repetitions = np.where(q >= CORRECT_QUALITY_THRESHOLD, reps + 1, 0)
+    new_easiness = np.maximum(ef + _EASINESS_DELTA_TABLE[q - MIN_QUALITY], MIN_EASINESS)
+
+    return new_interval, new_repetitions, new_easiness
+
+
 class SM2Scheduler(SpacedRepetitionScheduler):
-    def __init__(self, easiness: float = 2.5, interval: int = 0, repetitions: int = 0) -> None:
-        super().__init__(interval=interval)
+    __slots__ = ("easiness", "repetitions")
+
+    _type_tag = 2
+    # easiness, repetitions
+    _STATE = struct.Struct("<di")
+
+    def __init__(
+        self,
+        easiness: float = 2.5,
+        interval: int = 0,
+        repetitions: int = 0,
+        validate: bool = True,
+    ) -> None:
+        super().__init__(interval=interval, validate=validate)
         self.easiness = easiness
         self.repetitions = repetitions
 
     def _update_params(self, quality: int) -> None:
-        interval, repetitions, easiness = sm2(
+        update = sm2 if self.validate else sm2_unchecked
+        interval, repetitions, easiness = update(
             quality, self.interval, self.repetitions, self.easiness
         )
 
@@ -92,3 +207,14 @@ class SM2Scheduler(SpacedRepetitionScheduler):
         prev_start_timestamp = self.due_timestamp if self.due_timestamp else attempted_at
         due_timestamp = prev_start_timestamp + new_timedelta_interval
         return due_timestamp, new_timedelta_interval
+
+    def _review_day(self, attempted_day: int, result: int) -> int:
+        self._update_params(quality=result)
+        return self.interval
+
+    def _pack_state(self) -> bytes:
+        return self._STATE.pack(self.easiness, self.repetitions)
+
+    def _unpack_state(self, data: memoryview, offset: int) -> int:
+        self.easiness, self.repetitions = self._STATE.unpack_from(data, offset)
+        return offset + self._STATE.size
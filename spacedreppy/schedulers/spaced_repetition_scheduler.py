@@ -1,22 +1,295 @@
+from __future__ import annotations
+
+import struct
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta, timezone
+from typing import Any, ClassVar, Self
+
+from spacedreppy.epoch import from_epoch_day, to_epoch_day
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=UTC)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Timestamp kinds stored by pack_timestamp().
+_NO_TIMESTAMP = 0
+_NAIVE = 1
+_AWARE = 2
+# An integer epoch day not yet materialized as a timestamp.
+_EPOCH_DAY = 3
+
+# A packed timestamp: kind, microseconds since the epoch, UTC offset in seconds.
+TIMESTAMP_FORMAT = "Bqi"
+
+# to_bytes() header: type tag, validate flag, due timestamp, interval.
+_HEADER = struct.Struct(f"<BB{TIMESTAMP_FORMAT}i")
+
+_SCHEDULER_TYPES: dict[int, type[SpacedRepetitionScheduler]] = {}
+
+
+def pack_timestamp(timestamp: datetime | None) -> tuple[int, int, int]:
+    """Encode an optional timestamp as ``TIMESTAMP_FORMAT`` fields.
+
+    Naive timestamps are kept naive. Aware ones keep their UTC offset, but not
+    their time zone name (e.g. a ``ZoneInfo`` comes back as a fixed offset).
+    """
+    if timestamp is None:
+        return _NO_TIMESTAMP, 0, 0
+    offset = timestamp.utcoffset()
+    if offset is None:
+        return _NAIVE, (timestamp - _EPOCH) // _MICROSECOND, 0
+    return _AWARE, (timestamp - _EPOCH_UTC) // _MICROSECOND, int(offset.total_seconds())
+
+
+def unpack_timestamp(kind: int, microseconds: int, offset: int) -> datetime | None:
+    """Decode a timestamp encoded by :func:`pack_timestamp`."""
+    if kind == _NO_TIMESTAMP:
+        return None
+    if kind == _NAIVE:
+        return _EPOCH + timedelta(microseconds=microseconds)
+    if kind == _AWARE:
+        tz = UTC if offset == 0 else timezone(timedelta(seconds=offset))
+        return (_EPOCH_UTC + timedelta(microseconds=microseconds)).astimezone(tz)
+    raise ValueError(f"invalid timestamp kind {kind}")
+
+
+def pack_moment(timestamp: datetime | None, day: int | None) -> tuple[int, int, int]:
+    """Encode a timestamp, or an epoch day if only that is set, as ``TIMESTAMP_FORMAT`` fields."""
+    if timestamp is None and day is not None:
+        return _EPOCH_DAY, day, 0
+    return pack_timestamp(timestamp)
+
+
+def unpack_moment(kind: int, value: int, offset: int) -> tuple[datetime | None, int | None]:
+    """Decode fields from :func:`pack_moment` into a ``(timestamp, epoch day)`` pair."""
+    if kind == _EPOCH_DAY:
+        return None, value
+    return unpack_timestamp(kind, value, offset), None
 
 
 class SpacedRepetitionScheduler(ABC):
-    def __init__(self, interval: int) -> None:
+    """Base class of the schedulers.
+
+    Reviews come in two flavours. :meth:`compute_next_due_interval` takes and
+    returns timestamps. :meth:`compute_next_due_day` takes and returns integer
+    epoch days (see :mod:`spacedreppy.epoch`) and keeps the scheduler's dates as
+    plain ints: ``due_timestamp`` and ``interval_td`` are only built when they
+    are read. Both flavours can be mixed on one scheduler; timestamps built from
+    epoch days are at midnight UTC, so compare them with aware timestamps only.
+    """
+
+    __slots__ = ("_due_day", "_due_timestamp", "interval", "on_due_change", "validate")
+
+    # Identifies the subclass in to_bytes() output; None if it cannot be serialized.
+    _type_tag: ClassVar[int | None] = None
+
+    def __init__(self, interval: int, validate: bool = True) -> None:
         self.interval = interval
-        self.interval_td: timedelta | None = None
-        self.due_timestamp: datetime | None = None
+        # When False, reviews skip input validation and trust the caller.
+        self.validate = validate
+        # The due date is held as a timestamp, an epoch day, or both once the
+        # other one was materialized; None in both when never reviewed.
+        self._due_timestamp: datetime | None = None
+        self._due_day: int | None = None
+        # Called with the scheduler after every change of its due timestamp.
+        self.on_due_change: Callable[[SpacedRepetitionScheduler], None] | None = None
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Register subclasses that declare their own ``_type_tag``."""
+        super().__init_subclass__(**kwargs)
+        tag = cls.__dict__.get("_type_tag")
+        if tag is not None:
+            _SCHEDULER_TYPES[tag] = cls
+
+    @property
+    def due_timestamp(self) -> datetime | None:
+        """The next due timestamp, or None if never reviewed."""
+        if self._due_timestamp is None and self._due_day is not None:
+            self._due_timestamp = from_epoch_day(self._due_day)
+        return self._due_timestamp
+
+    @due_timestamp.setter
+    def due_timestamp(self, due_timestamp: datetime | None) -> None:
+        self._due_timestamp = due_timestamp
+        self._due_day = None
+
+    @property
+    def due_day(self) -> int | None:
+        """The epoch day of the next due date, or None if never reviewed."""
+        if self._due_day is None and self._due_timestamp is not None:
+            self._due_day = to_epoch_day(self._due_timestamp)
+        return self._due_day
+
+    @due_day.setter
+    def due_day(self, due_day: int | None) -> None:
+        self._due_day = due_day
+        self._due_timestamp = None
+
+    @property
+    def interval_td(self) -> timedelta | None:
+        """The current interval as a timedelta, or None if never reviewed."""
+        if self._due_timestamp is None and self._due_day is None:
+            return None
+        return timedelta(days=self.interval)
+
+    @interval_td.setter
+    def interval_td(self, interval_td: timedelta | None) -> None:
+        # Kept for states pickled when interval_td was stored.
+        if interval_td is not None:
+            self.interval = interval_td.days
 
     def compute_next_due_interval(
         self, attempted_at: datetime, result: int
     ) -> tuple[datetime, timedelta]:
         """Calculate the next due timestamp and interval."""
-        self.due_timestamp, self.interval_td = self._compute_next_due_interval(attempted_at, result)
-        return self.due_timestamp, self.interval_td
+        due_timestamp, interval_td = self._compute_next_due_interval(attempted_at, result)
+        self._due_timestamp = due_timestamp
+        self._due_day = None
+        if self.on_due_change is not None:
+            self.on_due_change(self)
+        return due_timestamp, interval_td
+
+    def compute_next_due_day(self, attempted_day: int, result: int) -> tuple[int, int]:
+        """Calculate the next due date and interval in integer days.
+
+        Same review as :meth:`compute_next_due_interval`, at day resolution and
+        without building any datetime or timedelta.
+
+        Args:
+            attempted_day: The epoch day of the review attempt.
+            result: The review result, as accepted by the scheduler.
+
+        Returns:
+            A tuple of the next due epoch day and the interval in days.
+        """
+        interval = self._review_day(attempted_day, result)
+        previous = self.due_day
+        due_day = (attempted_day if previous is None else previous) + interval
+        self._due_day = due_day
+        self._due_timestamp = None
+        if self.on_due_change is not None:
+            self.on_due_change(self)
+        return due_day, interval
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Return the scheduler state for pickling and copying.
+
+        The ``on_due_change`` hook is left out, so copies are not attached to the
+        index or other observer of the original.
+        """
+        state = {
+            name: getattr(self, name)
+            for cls in type(self).__mro__
+            for name in getattr(cls, "__slots__", ())
+            if name != "on_due_change" and hasattr(self, name)
+        }
+        # Subclasses that do not declare __slots__ keep extra attributes in a __dict__.
+        state.update(getattr(self, "__dict__", {}))
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore the scheduler state produced by :meth:`__getstate__`.
+
+        Attributes missing from states pickled by older versions keep their
+        constructor defaults.
+        """
+        self.on_due_change = None
+        self.validate = True
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the scheduler state to a compact binary record.
+
+        The ``on_due_change`` hook is not serialized. Due dates kept as epoch
+        days are stored as such.
+
+        Returns:
+            The record, readable with :meth:`from_bytes`.
+
+        Raises:
+            TypeError: If the scheduler type does not support serialization.
+        """
+        if self._type_tag is None:
+            raise TypeError(f"{type(self).__name__} does not support to_bytes()")
+        header = _HEADER.pack(
+            self._type_tag,
+            self.validate,
+            *pack_moment(self._due_timestamp, self._due_day),
+            self.interval,
+        )
+        return header + self._pack_state()
+
+    @classmethod
+    def from_bytes(cls, data: bytes | bytearray | memoryview) -> Self:
+        """Restore a scheduler serialized with :meth:`to_bytes`.
+
+        Called on the base class, this returns an instance of whichever
+        scheduler type wrote the record.
+
+        Args:
+            data: The serialized record.
+
+        Returns:
+            The restored scheduler.
+
+        Raises:
+            ValueError: If the record is malformed or of another scheduler type.
+            TypeError: If the record's scheduler type has no binary record format.
+        """
+        view = memoryview(data)
+        try:
+            tag, validate, kind, micros, offset, interval = _HEADER.unpack_from(view)
+        except struct.error as e:
+            raise ValueError("scheduler record is truncated") from e
+        record_type = _SCHEDULER_TYPES.get(tag)
+        if record_type is None:
+            raise ValueError(f"unknown scheduler type tag {tag}")
+        if issubclass(cls, record_type):
+            record_type = cls
+        elif not issubclass(record_type, cls):
+            raise ValueError(f"record holds a {record_type.__name__}, not a {cls.__name__}")
+        scheduler = record_type.__new__(record_type)
+        scheduler.validate = bool(validate)
+        scheduler.interval = interval
+        scheduler._due_timestamp, scheduler._due_day = unpack_moment(kind, micros, offset)
+        scheduler.on_due_change = None
+        try:
+            end = scheduler._unpack_state(view, _HEADER.size)
+        except struct.error as e:
+            raise ValueError("scheduler record is truncated") from e
+        if end != len(view):
+            raise ValueError(f"scheduler record has {len(view) - end} trailing bytes")
+        return scheduler
+
+    def _pack_state(self) -> bytes:
+        """Return the subclass part of the :meth:`to_bytes` record.
+
+        Raises:
+            TypeError: If the subclass declares a type tag without a record format.
+        """
+        raise TypeError(f"{type(self).__name__} has no binary record format")
+
+    def _unpack_state(self, data: memoryview, offset: int) -> int:
+        """Restore the subclass state from ``data[offset:]`` and return the end offset.
+
+        Raises:
+            TypeError: If the subclass declares a type tag without a record format.
+        """
+        raise TypeError(f"{type(self).__name__} has no binary record format")
 
     @abstractmethod
     def _compute_next_due_interval(
         self, attempted_at: datetime, result: int
     ) -> tuple[datetime, timedelta]:
         """Calculate the next due timestamp and interval."""
+
+    def _review_day(self, attempted_day: int, result: int) -> int:
+        """Update the algorithm state for a review on an epoch day and return the interval.
+
+        Subclasses override this to skip the timestamp arithmetic of
+        :meth:`_compute_next_due_interval`, which this default goes through.
+        """
+        self._compute_next_due_interval(from_epoch_day(attempted_day), result)
+        return self.interval
@@ -0,0 +1,210 @@
+"""Asyncio facade for serving reviews from a deck.
+
+:class:`ReviewService` owns a :class:`~spacedreppy.deck.Deck` and accepts
+concurrent ``await service.review(card, attempted_at, result)`` calls. Instead
+of updating one card per call, it queues the reviews and applies them as a
+micro-batch with the vectorized update path once the event loop gets to it
+(or after ``max_delay``, or as soon as ``max_batch_size`` reviews are queued).
+
+A batch is applied synchronously on the event loop thread, so batches never
+interleave and no locking is needed. Within a batch, the reviews of each card
+are applied in the order they were submitted (see
+:func:`~spacedreppy.replay.review_rounds`), so concurrent reviews of one card
+are as safe as sequential ones.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from types import TracebackType
+from typing import Self
+
+import numpy as np
+
+from spacedreppy.deck import Deck
+from spacedreppy.epoch import from_epoch_day, to_epoch_day
+from spacedreppy.replay import review_rounds
+
+DEFAULT_MAX_BATCH_SIZE = 4096
+DEFAULT_LATENCY_WINDOW = 10_000
+
+
+@dataclass(frozen=True, slots=True)
+class ServiceStats:
+    """A snapshot of the statistics of a :class:`ReviewService`.
+
+    Latencies are measured from the ``review`` call until its result is set,
+    over the most recent reviews only.
+    """
+
+    reviews: int
+    batches: int
+    mean_batch_size: float
+    mean_latency: float
+    p50_latency: float
+    p99_latency: float
+    max_latency: float
+    # Reviews per second since the first review was submitted.
+    throughput: float
+
+
+class ReviewService:
+    """Serves concurrent reviews of the cards of a deck in micro-batches.
+
+    Args:
+        deck: The deck to update. It must not be resized or reviewed directly
+            while the service has queued reviews.
+        max_batch_size: Apply the queued reviews as soon as this many are queued.
+        max_delay: How long, in seconds, a review may wait for more reviews to
+            join its batch. With 0, a batch holds the reviews submitted until
+            the event loop next runs its callbacks.
+        latency_window: The number of recent reviews whose latencies
+            :meth:`stats` reports on.
+    """
+
+    def __init__(
+        self,
+        deck: Deck,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_delay: float = 0.0,
+        latency_window: int = DEFAULT_LATENCY_WINDOW,
+    ) -> None:
+        if max_batch_size <= 0:
+            raise ValueError(f"max_batch_size must be positive, got {max_batch_size}")
+        if max_delay < 0:
+            raise ValueError(f"max_delay must be non-negative, got {max_delay}")
+        self.deck = deck
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._cards: list[int] = []
+        self._days: list[int] = []
+        self._results: list[int] = []
+        self._futures: list[asyncio.Future[tuple[datetime, timedelta]]] = []
+        self._submitted: list[float] = []
+        self._timer: asyncio.Handle | None = None
+        self._closed = False
+        self._reviews = 0
+        self._batches = 0
+        self._started: float | None = None
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+
+    async def __aenter__(self) -> Self:
+        """Return the service."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the service, applying the reviews still queued."""
+        await self.close()
+
+    async def review(
+        self, card: int, attempted_at: datetime, result: int
+    ) -> tuple[datetime, timedelta]:
+        """Review a card and wait for the batch holding the review to be applied.
+
+        The card and result are validated before the review is queued, so
+        one invalid review cannot fail the batch of others. Cancelling the
+        call after it was submitted does not withdraw the review.
+
+        Args:
+            card: The card index within the deck.
+            attempted_at: The timestamp of the review attempt.
+            result: The review result, as accepted by the deck's scheduler.
+
+        Returns:
+            The next due timestamp (midnight UTC) and interval of the card.
+
+        Raises:
+            ValueError: If the card index or the result is invalid.
+            RuntimeError: If the service is closed.
+        """
+        if self._closed:
+            raise RuntimeError("review service is closed")
+        if not 0 <= card < len(self.deck):
+            raise ValueError(f"card must be in [0, {len(self.deck)}), got {card}")
+        low, high = self.deck.result_range
+        if not low <= result <= high:
+            raise ValueError(f"result must be in [{low}, {high}], got {result}")
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[tuple[datetime, timedelta]] = loop.create_future()
+        now = time.perf_counter()
+        if self._started is None:
+            self._started = now
+        self._cards.append(card)
+        self._days.append(to_epoch_day(attempted_at))
+        self._results.append(result)
+        self._futures.append(future)
+        self._submitted.append(now)
+        if len(self._cards) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            if self.max_delay:
+                self._timer = loop.call_later(self.max_delay, self._flush)
+            else:
+                self._timer = loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Apply the queued reviews as one batch and resolve their futures."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._cards:
+            return
+        cards = np.array(self._cards, dtype=np.intp)
+        days = np.array(self._days, dtype=np.int64)
+        results = np.array(self._results, dtype=np.int64)
+        futures, submitted = self._futures, self._submitted
+        self._cards, self._days, self._results = [], [], []
+        self._futures, self._submitted = [], []
+        try:
+            due, intervals = review_rounds(self.deck, cards, days, results)
+        except Exception as exc:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for future, day, interval in zip(futures, due.tolist(), intervals.tolist(), strict=True):
+            if not future.done():
+                future.set_result((from_epoch_day(day), timedelta(days=interval)))
+        now = time.perf_counter()
+        self._latencies.extend(now - t for t in submitted)
+        self._reviews += len(futures)
+        self._batches += 1
+
+    async def flush(self) -> None:
+        """Apply the queued reviews now instead of waiting for the batch to fill."""
+        self._flush()
+
+    async def close(self) -> None:
+        """Apply the queued reviews and stop accepting new ones."""
+        self._closed = True
+        self._flush()
+
+    def stats(self) -> ServiceStats:
+        """Return the batching, latency and throughput statistics so far."""
+        latencies = np.array(self._latencies, dtype=np.float64)
+        if latencies.size:
+            p50, p99 = np.percentile(latencies, [50, 99]).tolist()
+            mean, worst = float(latencies.mean()), float(latencies.max())
+        else:
+            mean = p50 = p99 = worst = 0.0
+        elapsed = time.perf_counter() - self._started if self._started is not None else 0.0
+        return ServiceStats(
+            reviews=self._reviews,
+            batches=self._batches,
+            mean_batch_size=self._reviews / self._batches if self._batches else 0.0,
+            mean_latency=mean,
+            p50_latency=p50,
+            p99_latency=p99,
+            max_latency=worst,
+            throughput=self._reviews / elapsed if elapsed else 0.0,
+        )
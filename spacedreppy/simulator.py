@@ -0,0 +1,399 @@
+"""Monte-Carlo forecasts of the daily review workload of a deck.
+
+:func:`simulate` runs a deck of any scheduler type forward day by day. Every
+day, the cards that are due are reviewed (up to a daily limit), and a number of
+new cards is introduced. Whether a review is recalled is drawn from the FSRS-6
+forgetting curve of a simulated learner, whose memory of every card follows
+the FSRS model with its own weights; a recalled review is rated Hard, Good or
+Easy, and a forgotten one Again. The ratings are mapped to the results of the
+deck's scheduler, and the deck reschedules the card as it would in production.
+
+All runs are simulated together: the deck is tiled once per run, so each day
+is a handful of vectorized operations over ``runs * len(deck)`` cards and no
+Python code runs per card.
+
+:func:`optimal_retention` builds on it to choose the ``request_retention`` of
+an FSRS weight set: it simulates a deck at each candidate retention (in
+parallel processes) and recommends the one that minimizes the review time
+spent per memorized card.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Sequence
+from dataclasses import dataclass
+from multiprocessing import get_context
+from multiprocessing.context import BaseContext
+
+import numpy as np
+import numpy.typing as npt
+
+from spacedreppy.deck import UNSCHEDULED, Deck, FSRSDeck, LeitnerDeck, SM2Deck
+from spacedreppy.retrievability import memory_state
+from spacedreppy.schedulers.fsrs import (
+    AGAIN,
+    DEFAULT_MAXIMUM_INTERVAL,
+    DEFAULT_REQUEST_RETENTION,
+    DEFAULT_WEIGHTS,
+    forgetting_curve,
+    fsrs_batch,
+    fsrs_parameters,
+)
+
+DEFAULT_NEW_CARDS_PER_DAY = 20
+# Probabilities of Again, Hard, Good and Easy on the first review of a card.
+DEFAULT_FIRST_RATINGS = (0.2, 0.1, 0.6, 0.1)
+# Probabilities of Hard, Good and Easy when a card is recalled.
+DEFAULT_RECALL_RATINGS = (0.15, 0.75, 0.1)
+# Seconds spent on a card's first review, a recalled review and a forgotten one.
+DEFAULT_LEARN_COST = 20.0
+DEFAULT_RECALL_COST = 8.0
+DEFAULT_FORGET_COST = 23.0
+# The candidates of optimal_retention: 0.70, 0.71, ..., 0.97.
+DEFAULT_RETENTIONS = tuple(round(0.7 + 0.01 * i, 2) for i in range(28))
+# The difficulty assumed for cards whose deck does not model it.
+_DEFAULT_DIFFICULTY = 5.0
+
+# The deck result for each FSRS rating, from Again to Easy.
+_RESULTS: dict[type[Deck], tuple[int, int, int, int]] = {
+    FSRSDeck: (1, 2, 3, 4),
+    SM2Deck: (1, 3, 4, 5),
+    LeitnerDeck: (0, 1, 1, 1),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class SimulationResult:
+    """Per-run, per-day counts of a simulation.
+
+    Every array has shape ``(runs, days)``, except ``days`` (the simulated
+    epoch days) and ``memorized`` (one value per run).
+    """
+
+    days: npt.NDArray[np.int64]
+    # Reviews of cards that were already introduced.
+    reviews: npt.NDArray[np.int64]
+    new_cards: npt.NDArray[np.int64]
+    # Reviews (of introduced cards) rated Again.
+    lapses: npt.NDArray[np.int64]
+    # Cards due at the end of the day that the review limit left unreviewed.
+    backlog: npt.NDArray[np.int64]
+    # The expected number of introduced cards recalled on the day after the last.
+    memorized: npt.NDArray[np.float64]
+
+    @property
+    def retention(self) -> npt.NDArray[np.float64]:
+        """The fraction of each day's reviews that were recalled (NaN without reviews)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return 1 - self.lapses / self.reviews
+
+    def summary(self) -> dict[str, float]:
+        """Return averages over all runs and days, and the final backlog and memory."""
+        total = self.reviews.sum()
+        return {
+            "reviews_per_day": float((self.reviews + self.new_cards).mean()),
+            "peak_reviews_per_day": float((self.reviews + self.new_cards).mean(axis=0).max()),
+            "retention": float(1 - self.lapses.sum() / total) if total else float("nan"),
+            "final_backlog": float(self.backlog[:, -1].mean()) if self.days.size else 0.0,
+            "memorized": float(self.memorized.mean()),
+        }
+
+
+def _per_run(cards: npt.NDArray[np.intp], size: int, limit: int) -> npt.NDArray[np.intp]:
+    """Keep the first ``limit`` of the (ordered) cards of every run."""
+    if not cards.size:
+        return cards
+    runs = cards // size
+    first = np.ones(cards.size, dtype=bool)
+    first[1:] = runs[1:] != runs[:-1]
+    starts = np.flatnonzero(first)
+    rank = np.arange(cards.size) - starts[np.cumsum(first) - 1]
+    kept: npt.NDArray[np.intp] = cards[rank < limit]
+    return kept
+
+
+def _counts(cards: npt.NDArray[np.intp], size: int, runs: int) -> npt.NDArray[np.int64]:
+    return np.bincount(cards // size, minlength=runs).astype(np.int64)
+
+
+def simulate(
+    deck: Deck,
+    start_day: int,
+    days: int,
+    runs: int = 1,
+    new_cards_per_day: int | None = DEFAULT_NEW_CARDS_PER_DAY,
+    review_limit: int | None = None,
+    memory_weights: Sequence[float] = DEFAULT_WEIGHTS,
+    first_ratings: Sequence[float] = DEFAULT_FIRST_RATINGS,
+    recall_ratings: Sequence[float] = DEFAULT_RECALL_RATINGS,
+    seed: int | None = 0,
+) -> SimulationResult:
+    """Simulate the reviews of a deck over the coming days.
+
+    The deck itself is not modified. Its unscheduled cards are introduced in
+    index order. Cards it has already scheduled start with a memory stability
+    equal to their interval (the interval after which FSRS expects 90% recall)
+    unless the deck is an :class:`FSRSDeck`, whose own memory state is used
+    (see :mod:`spacedreppy.retrievability`).
+
+    Args:
+        deck: The deck to simulate, with its scheduler settings.
+        start_day: The epoch day of the first simulated day.
+        days: The number of days to simulate.
+        runs: The number of independent Monte-Carlo runs.
+        new_cards_per_day: How many unscheduled cards to introduce per day and
+            run. None introduces them all on the first day.
+        review_limit: The maximum number of due cards reviewed per day and run,
+            most overdue first; None for no limit. New cards do not count.
+        memory_weights: The FSRS-6 weights of the simulated learner's memory.
+        first_ratings: The probabilities of Again, Hard, Good and Easy on a
+            card's first review.
+        recall_ratings: The probabilities of Hard, Good and Easy for a
+            recalled card.
+        seed: The seed of the random generator.
+
+    Returns:
+        The per-run, per-day counts.
+
+    Raises:
+        ValueError: If an argument is out of range.
+        TypeError: If the deck type is not supported.
+    """
+    if days < 0:
+        raise ValueError(f"days must be non-negative, got {days}")
+    if runs <= 0:
+        raise ValueError(f"runs must be positive, got {runs}")
+    if new_cards_per_day is not None and new_cards_per_day < 0:
+        raise ValueError(f"new_cards_per_day must be non-negative, got {new_cards_per_day}")
+    if review_limit is not None and review_limit < 0:
+        raise ValueError(f"review_limit must be non-negative, got {review_limit}")
+    first_p = np.asarray(first_ratings, dtype=np.float64)
+    recall_p = np.asarray(recall_ratings, dtype=np.float64)
+    if first_p.shape != (4,) or recall_p.shape != (3,):
+        raise ValueError("first_ratings needs 4 probabilities and recall_ratings 3")
+    if not (np.isclose(first_p.sum(), 1) and np.isclose(recall_p.sum(), 1)):
+        raise ValueError("rating probabilities must sum to 1")
+    if (first_p < 0).any() or (recall_p < 0).any():
+        raise ValueError("rating probabilities must be non-negative")
+    results_for = _RESULTS.get(type(deck))
+    if results_for is None:
+        raise TypeError(f"cannot simulate a {type(deck).__name__}")
+    result_table = np.asarray(results_for, dtype=np.int64)
+    memory = fsrs_parameters(memory_weights, DEFAULT_REQUEST_RETENTION)
+    rng = np.random.default_rng(seed)
+
+    size = len(deck)
+    sim = deck.with_columns({name: np.tile(getattr(deck, name), runs) for name in deck.columns})
+    scheduled = sim.due != UNSCHEDULED
+    # The simulated learner's memory of every card.
+    stability, last_review = memory_state(sim)
+    if isinstance(sim, FSRSDeck):
+        difficulty = sim.difficulty.astype(np.float64)
+    else:
+        difficulty = np.where(scheduled, _DEFAULT_DIFFICULTY, 0.0)
+    # Unscheduled cards, introduced in the same order in every run.
+    unseen = np.flatnonzero(deck.due == UNSCHEDULED)
+    run_offsets = np.arange(runs) * size
+    introduced = 0
+
+    shape = (runs, days)
+    reviews = np.zeros(shape, dtype=np.int64)
+    new_cards = np.zeros(shape, dtype=np.int64)
+    lapses = np.zeros(shape, dtype=np.int64)
+    backlog = np.zeros(shape, dtype=np.int64)
+
+    for i, day in enumerate(range(start_day, start_day + days)):
+        due = np.flatnonzero(scheduled & (sim.due <= day))
+        if review_limit is not None and due.size:
+            # Within each run, most overdue first.
+            due = due[np.lexsort((sim.due[due], due // size))]
+            kept = _per_run(due, size, review_limit)
+            backlog[:, i] = _counts(due, size, runs) - _counts(kept, size, runs)
+            due = kept
+
+        count = unseen.size - introduced
+        if new_cards_per_day is not None:
+            count = min(count, new_cards_per_day)
+        fresh = (run_offsets[:, None] + unseen[introduced : introduced + count]).ravel()
+        introduced += count
+
+        elapsed = (day - last_review[due]).astype(np.float64)
+        recall = forgetting_curve(elapsed, stability[due], memory)
+        recalled = rng.random(due.size) < recall
+        ratings = np.where(recalled, 2 + rng.choice(3, due.size, p=recall_p), AGAIN)
+        fresh_ratings = 1 + rng.choice(4, fresh.size, p=first_p)
+
+        cards = np.concatenate([due, fresh])
+        all_ratings = np.concatenate([ratings, fresh_ratings])
+        elapsed_all = np.concatenate([elapsed, np.zeros(fresh.size)])
+        stability[cards], difficulty[cards], _ = fsrs_batch(
+            all_ratings, stability[cards], difficulty[cards], elapsed_all, parameters=memory
+        )
+        last_review[cards] = day
+        scheduled[fresh] = True
+        # The cards are distinct and the results valid by construction.
+        sim.review_unchecked(
+            cards, np.full(cards.size, day, dtype=np.int64), result_table[all_ratings - 1]
+        )
+
+        reviews[:, i] = _counts(due, size, runs)
+        new_cards[:, i] = _counts(fresh, size, runs)
+        lapses[:, i] = _counts(due[~recalled], size, runs)
+
+    end = start_day + days
+    learned = np.flatnonzero(scheduled)
+    retrievability = forgetting_curve(end - last_review[learned], stability[learned], memory)
+    memorized = np.bincount(learned // max(size, 1), weights=retrievability, minlength=runs)
+    return SimulationResult(
+        days=np.arange(start_day, end, dtype=np.int64),
+        reviews=reviews,
+        new_cards=new_cards,
+        lapses=lapses,
+        backlog=backlog,
+        memorized=memorized.astype(np.float64),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class RetentionSearch:
+    """The outcome of :func:`optimal_retention`.
+
+    ``costs`` and ``memorized`` hold one value per entry of ``retentions``.
+    """
+
+    # The candidate with the lowest cost.
+    retention: float
+    retentions: npt.NDArray[np.float64]
+    # Seconds of reviews per memorized card at the end of the simulation.
+    costs: npt.NDArray[np.float64]
+    # The mean expected number of memorized cards at the end of the simulation.
+    memorized: npt.NDArray[np.float64]
+
+
+@dataclass(frozen=True, slots=True)
+class _Candidate:
+    retention: float
+    weights: tuple[float, ...]
+    deck_size: int
+    days: int
+    runs: int
+    new_cards_per_day: int
+    review_limit: int | None
+    maximum_interval: int
+    costs: tuple[float, float, float]
+    seed: int | None
+
+
+def _evaluate(candidate: _Candidate) -> tuple[float, float]:
+    """Simulate a deck at one retention and return its cost per memorized card."""
+    deck = FSRSDeck(
+        candidate.deck_size,
+        weights=candidate.weights,
+        request_retention=candidate.retention,
+        maximum_interval=candidate.maximum_interval,
+    )
+    result = simulate(
+        deck,
+        0,
+        candidate.days,
+        runs=candidate.runs,
+        new_cards_per_day=candidate.new_cards_per_day,
+        review_limit=candidate.review_limit,
+        memory_weights=candidate.weights,
+        seed=candidate.seed,
+    )
+    learn, recall, forget = candidate.costs
+    lapses = result.lapses.sum(axis=1)
+    seconds = (
+        learn * result.new_cards.sum(axis=1)
+        + recall * (result.reviews.sum(axis=1) - lapses)
+        + forget * lapses
+    )
+    memorized = float(result.memorized.mean())
+    return float(seconds.mean()) / memorized if memorized else float("inf"), memorized
+
+
+def optimal_retention(
+    weights: Sequence[float] = DEFAULT_WEIGHTS,
+    retentions: Sequence[float] = DEFAULT_RETENTIONS,
+    deck_size: int = 10_000,
+    days: int = 365,
+    new_cards_per_day: int = DEFAULT_NEW_CARDS_PER_DAY,
+    review_limit: int | None = None,
+    runs: int = 4,
+    learn_cost: float = DEFAULT_LEARN_COST,
+    recall_cost: float = DEFAULT_RECALL_COST,
+    forget_cost: float = DEFAULT_FORGET_COST,
+    maximum_interval: int = DEFAULT_MAXIMUM_INTERVAL,
+    processes: int | None = None,
+    mp_context: BaseContext | None = None,
+    seed: int | None = 0,
+) -> RetentionSearch:
+    """Find the ``request_retention`` that minimizes review time per memorized card.
+
+    Every candidate retention schedules a new :class:`FSRSDeck` with the given
+    weights, reviewed by a learner whose memory follows the same weights, for
+    ``runs`` Monte-Carlo runs. The time spent on reviews is divided by the
+    number of cards memorized at the end: low retentions save reviews but
+    forget more cards (and forgotten reviews cost more), high retentions keep
+    cards but review them very often. All candidates use the same seed, so
+    their costs differ by the retention rather than by chance.
+
+    Args:
+        weights: The FSRS-6 weights of the scheduler and of the learner.
+        retentions: The candidate retentions, each in (0, 1).
+        deck_size: The number of cards introduced over the simulation.
+        days: The number of days to simulate.
+        new_cards_per_day: How many new cards are introduced per day.
+        review_limit: The maximum number of due cards reviewed per day, or None.
+        runs: The number of Monte-Carlo runs per candidate.
+        learn_cost: Seconds spent on the first review of a card.
+        recall_cost: Seconds spent on a recalled review.
+        forget_cost: Seconds spent on a forgotten review.
+        maximum_interval: The scheduler's maximum interval in days.
+        processes: The number of worker processes; 1 evaluates the candidates
+            in this process. Defaults to the CPU count.
+        mp_context: The multiprocessing context. Defaults to the platform's.
+        seed: The seed of the random generator of every candidate.
+
+    Returns:
+        The recommended retention and the cost of every candidate.
+
+    Raises:
+        ValueError: If no candidate is given or one is out of range.
+    """
+    candidates = np.asarray(retentions, dtype=np.float64)
+    if candidates.ndim != 1 or not candidates.size:
+        raise ValueError("retentions must be a non-empty sequence")
+    if ((candidates <= 0) | (candidates >= 1)).any():
+        raise ValueError("retentions must be in (0, 1)")
+    tasks = [
+        _Candidate(
+            retention=retention,
+            weights=tuple(weights),
+            deck_size=deck_size,
+            days=days,
+            runs=runs,
+            new_cards_per_day=new_cards_per_day,
+            review_limit=review_limit,
+            maximum_interval=maximum_interval,
+            costs=(learn_cost, recall_cost, forget_cost),
+            seed=seed,
+        )
+        for retention in candidates.tolist()
+    ]
+    workers = min(processes or os.cpu_count() or 1, len(tasks))
+    if workers == 1:
+        outcomes = [_evaluate(task) for task in tasks]
+    else:
+        ctx = mp_context if mp_context is not None else get_context()
+        with ctx.Pool(workers) as pool:
+            outcomes = pool.map(_evaluate, tasks)
+    costs = np.array([cost for cost, _ in outcomes])
+    return RetentionSearch(
+        retention=float(candidates[np.argmin(costs)]),
+        retentions=candidates,
+        costs=costs,
+        memorized=np.array([memorized for _, memorized in outcomes]),
+    )
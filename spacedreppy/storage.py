@@ -0,0 +1,350 @@
+r"""Columnar deck files.
+
+A deck file stores one :class:`~spacedreppy.deck.Deck` as a small header
+followed by its raw columns::
+
+    offset 0   magic b"\x93SRPDECK"
+    offset 8   format version (uint32, little-endian)
+    offset 12  header length in bytes (uint32, little-endian)
+    offset 16  JSON header, space-padded so the first column starts on a
+               64-byte boundary
+    ...        each column's raw values, starting on a 64-byte boundary
+
+The JSON header names the deck type, its size and its settings, including the
+FSRS weights, which are therefore stored once per file rather than once per
+card. For each column it records the dtype (with byte order) and the absolute
+file offset. Every card thus has a fixed-width record per deck type, spread
+over the columns. Saving writes the column buffers directly, and loading wraps
+one read buffer in column views, so neither copies the columns.
+
+:func:`open_deck` maps a deck file into memory instead of reading it: opening
+costs only the header, pages are read as cards are touched, and reviews update
+the file in place until :meth:`MappedDeck.flush` commits them.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import mmap
+import os
+import struct
+from types import TracebackType
+from typing import IO, Any, Literal, Self
+
+import numpy as np
+import numpy.typing as npt
+
+from spacedreppy.deck import Deck, FSRSDeck, LeitnerDeck, SM2Deck
+
+MAGIC = b"\x93SRPDECK"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct("<8sII")
+_DECK_TYPES: dict[str, type[Deck]] = {cls.__name__: cls for cls in (FSRSDeck, SM2Deck, LeitnerDeck)}
+
+Destination = str | os.PathLike[str] | IO[bytes]
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def column_layout(deck: Deck, start: int = 0) -> tuple[dict[str, int], int]:
+    """Return the 64-byte aligned offset of each column and the end offset.
+
+    Args:
+        deck: The deck whose columns are laid out back to back.
+        start: The offset of the first byte available for columns.
+
+    Returns:
+        A mapping of column name to offset, and the offset just past the last column.
+    """
+    offsets = {}
+    end = start
+    for name in deck.columns:
+        offsets[name] = _align(end)
+        end = offsets[name] + getattr(deck, name).nbytes
+    return offsets, end
+
+
+def _header(deck: Deck, data_start: int = 0) -> tuple[bytes, dict[str, int]]:
+    """Return the padded preamble and JSON header, and the column offsets.
+
+    The columns start at ``data_start`` if the header fits in front of it,
+    and at the first aligned offset after the header otherwise.
+    """
+    # The column offsets depend on the header length and vice versa; grow the
+    # data start until the header fits in front of it.
+    while True:
+        offsets, _ = column_layout(deck, data_start)
+        header = {
+            "deck": type(deck).__name__,
+            "size": len(deck),
+            "settings": deck.settings(),
+            "columns": {
+                name: {"dtype": getattr(deck, name).dtype.str, "offset": offset}
+                for name, offset in offsets.items()
+            },
+        }
+        text = json.dumps(header).encode()
+        needed = _align(_PREAMBLE.size + len(text))
+        if needed <= data_start:
+            break
+        data_start = needed
+    text = text.ljust(data_start - _PREAMBLE.size)
+    return _PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(text)) + text, offsets
+
+
+def save_deck(deck: Deck, destination: Destination) -> None:
+    """Write a deck to a file.
+
+    Args:
+        deck: The deck to save.
+        destination: A path, or a binary file open for writing.
+    """
+    if isinstance(destination, str | os.PathLike):
+        with open(destination, "wb") as f:
+            _write(deck, f)
+    else:
+        _write(deck, destination)
+
+
+def _write(deck: Deck, f: IO[bytes]) -> None:
+    header, offsets = _header(deck)
+    f.write(header)
+    position = len(header)
+    for name, offset in offsets.items():
+        f.write(b"\0" * (offset - position))
+        column = np.ascontiguousarray(getattr(deck, name))
+        f.write(column.data)
+        position = offset + column.nbytes
+
+
+def read_header(buffer: bytes | bytearray | memoryview) -> dict[str, Any]:
+    """Parse and check the header of a deck file.
+
+    Args:
+        buffer: At least the beginning of the file, up to the end of the header.
+
+    Returns:
+        The JSON header: deck type name, size, settings and column layout.
+
+    Raises:
+        ValueError: If the buffer does not start with a supported deck file header.
+    """
+    if len(buffer) < _PREAMBLE.size:
+        raise ValueError("not a deck file: too short")
+    magic, version, length = _PREAMBLE.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("not a deck file: bad magic")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"unsupported deck file version {version}")
+    header: dict[str, Any] = json.loads(bytes(buffer[_PREAMBLE.size : _PREAMBLE.size + length]))
+    if header.get("deck") not in _DECK_TYPES:
+        raise ValueError(f"unknown deck type {header.get('deck')!r}")
+    return header
+
+
+def _data_start(buffer: Any) -> int:
+    """Return the offset just past the padded header of a deck file."""
+    _, _, length = _PREAMBLE.unpack_from(buffer)
+    return int(_PREAMBLE.size + length)
+
+
+def deck_from_buffer(buffer: Any, header: dict[str, Any] | None = None) -> Deck:
+    """Build a deck whose columns are views into a buffer holding a deck file.
+
+    Nothing is copied: writable buffers (a ``bytearray``, a writable ``mmap``)
+    give a deck that writes through to them.
+
+    Args:
+        buffer: The whole file, as any object supporting the buffer protocol.
+        header: The parsed header, if already read with :func:`read_header`.
+
+    Returns:
+        The deck.
+
+    Raises:
+        ValueError: If the buffer is not a valid deck file.
+    """
+    with memoryview(buffer) as view:
+        if header is None:
+            header = read_header(view)
+        nbytes = view.nbytes
+    size = header["size"]
+    columns: dict[str, npt.NDArray[Any]] = {}
+    for name, spec in header["columns"].items():
+        dtype = np.dtype(spec["dtype"])
+        if spec["offset"] + size * dtype.itemsize > nbytes:
+            raise ValueError(f"deck file is truncated in column {name!r}")
+        column = np.frombuffer(buffer, dtype=dtype, count=size, offset=spec["offset"])
+        if not dtype.isnative:
+            column = column.astype(dtype.newbyteorder("="))
+        columns[name] = column
+    template = _DECK_TYPES[header["deck"]](0, **header["settings"])
+    return template.with_columns(columns)
+
+
+def load_deck(source: Destination) -> Deck:
+    """Read a deck from a file into memory.
+
+    The file is read with a single call into one buffer, which the columns
+    then share.
+
+    Args:
+        source: A path, or a binary file open for reading.
+
+    Returns:
+        The deck.
+
+    Raises:
+        ValueError: If the file is not a valid deck file.
+    """
+    if isinstance(source, str | os.PathLike):
+        with open(source, "rb") as f:
+            buffer = bytearray(os.fstat(f.fileno()).st_size)
+            f.readinto(buffer)
+    else:
+        buffer = bytearray(source.read())
+    return deck_from_buffer(buffer)
+
+
+class MappedDeck:
+    """A deck whose columns are views into a memory-mapped deck file.
+
+    Reviews change the mapped pages directly; :meth:`flush` commits them to
+    disk. A flush also stores changed deck settings (such as new FSRS weights)
+    in the header. After :meth:`Deck.resize`, or a settings change that no
+    longer fits the header, the columns no longer fit the file's layout: the
+    flush then rewrites the file (via a temporary file, replaced atomically)
+    and maps the new one, still behind the same :attr:`deck` object.
+
+    Use :func:`open_deck` to create one.
+
+    Args:
+        path: The deck file, as written by :func:`save_deck`.
+        mode: ``"r+"`` to read and update the file, ``"r"`` for read-only
+            columns.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], mode: Literal["r", "r+"] = "r+") -> None:
+        if mode not in ("r", "r+"):
+            raise ValueError(f"mode must be 'r' or 'r+', got {mode!r}")
+        self.path = os.fspath(path)
+        self.mode = mode
+        self._map, self.deck = self._open()
+        self._columns = {name: getattr(self.deck, name) for name in self.deck.columns}
+        self._data_start = _data_start(self._map)
+        # Set once the deck's columns are detached from the mapping, which may
+        # stay open while the caller holds a column.
+        self._closed = False
+
+    def __enter__(self) -> Self:
+        """Return the open mapped deck."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Flush (in ``"r+"`` mode) and close the mapped deck."""
+        self.close()
+
+    def _open(self) -> tuple[mmap.mmap, Deck]:
+        access = mmap.ACCESS_READ if self.mode == "r" else mmap.ACCESS_WRITE
+        with open(self.path, "rb" if self.mode == "r" else "r+b") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=access)
+        try:
+            return mapped, deck_from_buffer(mapped)
+        except Exception:
+            mapped.close()
+            raise
+
+    @property
+    def closed(self) -> bool:
+        """Whether the deck was detached from the file."""
+        return self._closed
+
+    def flush(self) -> None:
+        """Commit the deck's state and settings to the file.
+
+        Raises:
+            ValueError: If the deck was opened read-only or was closed.
+        """
+        if self.mode == "r":
+            raise ValueError("deck file is open read-only")
+        if self.closed:
+            raise ValueError("deck file is closed")
+        header, _ = _header(self.deck, self._data_start)
+        if len(header) == self._data_start and all(
+            getattr(self.deck, name) is column for name, column in self._columns.items()
+        ):
+            if self._map[: len(header)] != header:
+                self._map[: len(header)] = header
+            self._map.flush()
+        else:
+            self._rewrite()
+
+    def _rewrite(self) -> None:
+        """Write the deck to a new file, replace the old one with it, and map it."""
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "wb") as f:
+            _write(self.deck, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+        self._release()
+        self._map, deck = self._open()
+        for name in self.deck.columns:
+            setattr(self.deck, name, getattr(deck, name))
+        self._columns = {name: getattr(self.deck, name) for name in self.deck.columns}
+        self._data_start = _data_start(self._map)
+        self._closed = False
+
+    def _release(self) -> None:
+        """Detach the deck from the mapping and unmap it."""
+        # Closed first, so nothing flushes the emptied columns over the file.
+        self._closed = True
+        for name, column in self.deck.allocate(0).items():
+            setattr(self.deck, name, column)
+        self.deck.bump_version()
+        self._columns = {}
+        # Columns the caller still references keep the mapping alive until
+        # they are released.
+        with contextlib.suppress(BufferError):
+            self._map.close()
+
+    def close(self) -> None:
+        """Flush (in ``"r+"`` mode) and unmap the file.
+
+        The deck is left empty; re-open the file to keep using it.
+        """
+        if self.closed:
+            return
+        if self.mode == "r+":
+            self.flush()
+        self._release()
+
+
+def open_deck(path: str | os.PathLike[str], mode: Literal["r", "r+"] = "r+") -> MappedDeck:
+    """Memory-map a deck file.
+
+    Opening reads only the header, so it takes about as long for a million
+    cards as for ten.
+
+    Args:
+        path: The deck file, as written by :func:`save_deck`.
+        mode: ``"r+"`` to read and update the file, ``"r"`` for read-only
+            columns.
+
+    Returns:
+        The mapped deck; its :attr:`~MappedDeck.deck` is ready for reviews.
+
+    Raises:
+        ValueError: If the file is not a valid deck file.
+    """
+    return MappedDeck(path, mode)
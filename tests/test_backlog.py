@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from spacedreppy.backlog import DailyQueue, plan_catch_up, rank_overdue
+from spacedreppy.deck import UNSCHEDULED, Deck, FSRSDeck, LeitnerDeck, SM2Deck
+from spacedreppy.epoch import from_epoch_day
+from spacedreppy.retrievability import retrievability
+
+START_DAY = 20_089
+LATER = START_DAY + 120
+
+
+def _backlog(deck: Deck, seed: int = 0) -> Deck:
+    """Review all cards but the last 10 three times, with random results."""
+    rng = np.random.default_rng(seed)
+    low, high = deck.result_range
+    cards = np.arange(len(deck) - 10)
+    for day in (0, 3, 10):
+        deck.review(cards, START_DAY + day, rng.integers(low, high + 1, cards.size))
+    return deck
+
+
+def _overdue(deck: Deck, day: int) -> np.ndarray:
+    return np.flatnonzero((deck.due != UNSCHEDULED) & (deck.due < day))
+
+
+def test_fsrs_cards_ranked_by_retrievability() -> None:
+    deck = _backlog(FSRSDeck(200))
+    ranked = rank_overdue(deck, LATER)
+    r = retrievability(deck, LATER)
+    np.testing.assert_array_equal(np.sort(ranked), _overdue(deck, LATER))
+    assert 0 < ranked.size < 190
+    assert np.all(np.diff(r[ranked]) >= 0)
+
+
+@pytest.mark.parametrize("deck", [SM2Deck(200), LeitnerDeck(200)], ids=["sm2", "leitner"])
+def test_other_cards_ranked_by_overdue_ratio(deck: Deck) -> None:
+    deck = _backlog(deck)
+    ranked = rank_overdue(deck, from_epoch_day(LATER))
+    ratio = (LATER - deck.due[ranked]) / deck.interval[ranked]
+    assert ranked.size == 190
+    assert np.all(np.diff(ratio) <= 0)
+
+
+def test_cards_not_overdue_are_left_out() -> None:
+    deck = SM2Deck(4)
+    deck.review([0, 1, 2], START_DAY, 4)
+    assert rank_overdue(deck, START_DAY + 1).size == 0
+    assert rank_overdue(deck, START_DAY + 2).tolist() == [0, 1, 2]
+
+
+@pytest.mark.parametrize("days", [1, 3, 7])
+def test_plan_spreads_backlog_evenly(days: int) -> None:
+    deck = _backlog(SM2Deck(200))
+    queues = list(plan_catch_up(deck, days=days, at=LATER))
+    assert [q.day for q in queues] == list(range(LATER, LATER + days))
+    sizes = [q.cards.size for q in queues]
+    assert max(sizes) - min(sizes) <= 1
+    ranked = rank_overdue(deck, LATER)
+    np.testing.assert_array_equal(
+        np.sort(np.concatenate([q.cards for q in queues])), np.sort(ranked)
+    )
+    np.testing.assert_array_equal(queues[0].cards, ranked[: sizes[0]])
+
+
+def test_plan_ranks_remaining_cards_each_day() -> None:
+    deck = _backlog(FSRSDeck(200))
+    day = START_DAY + 400
+    plan = plan_catch_up(deck, days=4, at=day)
+    first = next(plan)
+    deck.review(first.cards, day, 3)
+    second = next(plan)
+    assert second.day == day + 1
+    remaining = np.setdiff1d(_overdue(deck, day), first.cards)
+    r = retrievability(deck, day + 1)[remaining]
+    expected = remaining[np.argsort(r, kind="stable")]
+    np.testing.assert_array_equal(second.cards, expected[: second.cards.size])
+
+
+def test_plan_stops_when_backlog_is_handed_out() -> None:
+    deck = SM2Deck(5)
+    deck.review([0, 1], START_DAY, 4)
+    queues = list(plan_catch_up(deck, days=7, at=START_DAY + 10))
+    assert [q.cards.tolist() for q in queues] == [[0], [1]]
+    assert isinstance(queues[0], DailyQueue)
+    assert list(plan_catch_up(SM2Deck(5), at=START_DAY)) == []
+
+
+def test_plan_invalid_days() -> None:
+    with pytest.raises(ValueError, match="days"):
+        plan_catch_up(SM2Deck(1), days=0)
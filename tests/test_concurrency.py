@@ -0,0 +1,162 @@
+import datetime
+import sys
+import threading
+from collections.abc import Callable, Iterator
+
+import numpy as np
+import pytest
+
+from spacedreppy import concurrency
+from spacedreppy.concurrency import ConcurrentDeck, SchedulerStore
+from spacedreppy.deck import LeitnerDeck, SM2Deck
+from spacedreppy.epoch import from_epoch_day
+from spacedreppy.schedulers.leitner import LeitnerScheduler
+from spacedreppy.schedulers.sm2 import SM2Scheduler
+
+START_DAY = 20_089
+THREADS = 8
+
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches() -> Iterator[None]:
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _run_threads(target: Callable[[int], None]) -> None:
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+# Every correct answer moves a card up one box, whatever the order of reviews.
+INTERVALS = list(range(1, 2001))
+
+
+def test_concurrent_review_one_loses_no_updates():
+    deck = ConcurrentDeck(LeitnerDeck(4, intervals=INTERVALS), stripes=2)
+
+    def work(_: int) -> None:
+        for i in range(200):
+            deck.review_one(i % 4, START_DAY, 1)
+
+    _run_threads(work)
+    assert [deck.snapshot(card)["box"] for card in range(4)] == [THREADS * 50] * 4
+
+
+def test_concurrent_batches_lose_no_updates(monkeypatch):
+    monkeypatch.setattr(concurrency, "MIN_LOCKED_BATCH", 4)
+    deck = ConcurrentDeck(LeitnerDeck(100, intervals=INTERVALS), stripes=8)
+
+    def work(seed: int) -> None:
+        rng = np.random.default_rng(seed)
+        for _ in range(50):
+            deck.review(rng.permutation(100)[:30], START_DAY, 1)
+
+    _run_threads(work)
+    assert sum(deck.snapshot(card)["box"] for card in range(100)) == THREADS * 50 * 30
+
+
+@pytest.mark.parametrize("min_locked_batch", [1, 8192])
+def test_review_locks_only_the_stripes_of_its_cards(monkeypatch, min_locked_batch):
+    monkeypatch.setattr(concurrency, "MIN_LOCKED_BATCH", min_locked_batch)
+    deck = ConcurrentDeck(SM2Deck(16), stripes=8)
+    # Cards 0, 1, 8 and 9 are on stripes 0 and 1; stripe 5 is held elsewhere.
+    with deck.lock(5):
+        thread = threading.Thread(target=deck.review, args=([0, 8, 1, 9], START_DAY, 5))
+        thread.start()
+        thread.join(timeout=10)
+        assert not thread.is_alive()
+    assert [deck.snapshot(card)["repetitions"] for card in (0, 1, 8, 9)] == [1] * 4
+
+
+def test_concurrent_reviews_count_every_version(monkeypatch):
+    monkeypatch.setattr(concurrency, "MIN_LOCKED_BATCH", 4)
+    deck = ConcurrentDeck(LeitnerDeck(THREADS * 8, intervals=INTERVALS), stripes=THREADS)
+
+    def work(thread: int) -> None:
+        cards = np.arange(thread, THREADS * 8, THREADS)
+        for _ in range(100):
+            deck.review(cards, START_DAY, 1)
+            deck.review_one(int(cards[0]), START_DAY, 1)
+
+    _run_threads(work)
+    assert deck.deck.version == THREADS * 200
+
+
+@pytest.mark.parametrize("min_locked_batch", [1, 4, 8192])
+def test_review_matches_deck_review(monkeypatch, min_locked_batch):
+    monkeypatch.setattr(concurrency, "MIN_LOCKED_BATCH", min_locked_batch)
+    expected = SM2Deck(50)
+    deck = ConcurrentDeck(SM2Deck(50), stripes=7)
+    rng = np.random.default_rng(0)
+    for day in range(3):
+        cards = rng.permutation(50)[:40]
+        results = rng.integers(0, 6, 40)
+        due, intervals = deck.review(cards, START_DAY + day, results)
+        expected_due, expected_intervals = expected.review(cards, START_DAY + day, results)
+        np.testing.assert_array_equal(due, expected_due)
+        np.testing.assert_array_equal(intervals, expected_intervals)
+    for name in expected.columns:
+        np.testing.assert_array_equal(getattr(deck.deck, name), getattr(expected, name))
+
+
+@pytest.mark.parametrize(
+    "cards, results, match",
+    [([0, 50], 5, r"\[0, 50\)"), ([1, 1], 5, "duplicates"), ([0, 1], [5, 6], "results")],
+)
+def test_invalid_review_modifies_nothing(cards, results, match):
+    deck = ConcurrentDeck(SM2Deck(50))
+    with pytest.raises(ValueError, match=match):
+        deck.review(cards, START_DAY, results)
+    assert all(deck.snapshot(card)["repetitions"] == 0 for card in range(50))
+
+
+def test_negative_index_uses_the_cards_lock():
+    deck = ConcurrentDeck(SM2Deck(10), stripes=4)
+    assert deck.lock(-1) is deck.lock(9)
+    deck.review_one(-1, START_DAY, 5)
+    assert deck.snapshot(9)["repetitions"] == 1
+    with pytest.raises(IndexError):
+        deck.lock(10)
+
+
+def test_compute_next_due_interval_and_resize():
+    deck = ConcurrentDeck(SM2Deck(2))
+    due, interval = deck.compute_next_due_interval(1, from_epoch_day(START_DAY), 5)
+    assert due == from_epoch_day(START_DAY + 1)
+    assert interval == datetime.timedelta(days=1)
+    deck.resize(3)
+    assert len(deck) == 3
+    assert deck.snapshot(1)["repetitions"] == 1
+
+
+def test_scheduler_store_loses_no_updates():
+    store: SchedulerStore[str] = SchedulerStore(stripes=4)
+    for card_id in "abc":
+        store.add(card_id, LeitnerScheduler(intervals=INTERVALS))
+    attempted_at = from_epoch_day(START_DAY)
+
+    def work(_: int) -> None:
+        for i in range(150):
+            store.review("abc"[i % 3], attempted_at, 1)
+
+    _run_threads(work)
+    assert [store.snapshot(card_id)["current_box"] for card_id in "abc"] == [THREADS * 50] * 3
+
+
+def test_scheduler_store_errors():
+    store: SchedulerStore[int] = SchedulerStore()
+    store.add(1, SM2Scheduler())
+    assert 1 in store
+    assert len(store) == 1
+    with pytest.raises(ValueError, match="already stored"):
+        store.add(1, SM2Scheduler())
+    with pytest.raises(KeyError):
+        store.review(2, from_epoch_day(START_DAY), 5)
+    with pytest.raises(ValueError, match="stripes"):
+        SchedulerStore(stripes=0)
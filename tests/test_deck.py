@@ -0,0 +1,308 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from spacedreppy.deck import UNSCHEDULED, FSRSDeck, LeitnerDeck, SM2Deck
+from spacedreppy.epoch import as_epoch_day, from_epoch_day, to_epoch_day, to_epoch_days
+from spacedreppy.schedulers.fsrs import AGAIN, EASY, GOOD, HARD, FSRSScheduler
+from spacedreppy.schedulers.leitner import LeitnerScheduler
+from spacedreppy.schedulers.sm2 import SM2Scheduler
+
+START_DAY = to_epoch_day(datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC))
+
+
+def test_epoch_day_round_trip():
+    day = to_epoch_day(datetime.datetime(2025, 1, 1, 13, 30))
+    assert from_epoch_day(day) == datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC)
+
+
+def test_as_epoch_day():
+    assert as_epoch_day(START_DAY) == START_DAY
+    assert as_epoch_day(from_epoch_day(START_DAY) + datetime.timedelta(hours=23)) == START_DAY
+    assert as_epoch_day() == to_epoch_day(datetime.datetime.now(datetime.UTC))
+
+
+@pytest.mark.parametrize(
+    "timestamps",
+    [
+        np.array(["1969-12-31T23:00", "2025-01-01T13:30"], dtype="datetime64[s]"),
+        [-3600, (START_DAY * 86400) + 48600],
+        [datetime.datetime(1969, 12, 31, 23), datetime.datetime(2025, 1, 1, 13, 30)],
+    ],
+)
+def test_to_epoch_days(timestamps):
+    assert to_epoch_days(timestamps).tolist() == [-1, START_DAY]
+
+
+@pytest.mark.parametrize(
+    "deck, columns",
+    [
+        (FSRSDeck(3), ("stability", "difficulty", "last_review")),
+        (SM2Deck(3), ("easiness", "repetitions")),
+        (LeitnerDeck(3), ("box",)),
+    ],
+)
+def test_deck_initial_state(deck, columns):
+    assert len(deck) == 3
+    assert deck.interval.dtype == np.int32
+    assert deck.due.dtype == np.int64
+    assert (deck.due == UNSCHEDULED).all()
+    for name in columns:
+        assert name in deck.columns
+        assert getattr(deck, name).shape == (3,)
+
+
+def test_deck_float_dtype():
+    deck = FSRSDeck(2, float_dtype=np.float32)
+    deck.review([0, 1], START_DAY, GOOD)
+    assert deck.stability.dtype == np.float32
+    assert deck.difficulty.dtype == np.float32
+    assert deck.stability[0] == pytest.approx(2.3065, rel=1e-6)
+
+
+def test_deck_negative_size_raises():
+    with pytest.raises(ValueError, match="size must be non-negative"):
+        SM2Deck(-1)
+
+
+def test_deck_resize_keeps_state():
+    deck = SM2Deck(2)
+    deck.review([0, 1], START_DAY, 5)
+    deck.resize(4)
+    assert len(deck) == 4
+    assert deck.repetitions.tolist() == [1, 1, 0, 0]
+    assert deck.easiness[3] == 2.5
+    assert deck.due[3] == UNSCHEDULED
+    deck.resize(1)
+    assert deck.repetitions.tolist() == [1]
+
+
+def test_deck_version_counts_updates():
+    deck = FSRSDeck(3)
+    assert deck.version == 0
+    deck.review([0, 1], START_DAY, 3)
+    deck.review_one(2, START_DAY, 3)
+    deck.scheduler(0).compute_next_due_interval(from_epoch_day(START_DAY + 4), 3)
+    deck.resize(5)
+    assert deck.version == 4
+    with pytest.raises(ValueError):
+        deck.review([9], START_DAY, 3)
+    assert deck.version == 4
+
+
+def test_deck_with_columns_shares_arrays():
+    deck = FSRSDeck(3, request_retention=0.8)
+    columns = {name: getattr(deck, name).copy() for name in deck.columns}
+    view = deck.with_columns(columns)
+    view.review([1], START_DAY, GOOD)
+    assert view.stability is columns["stability"]
+    assert columns["stability"][1] > 0
+    assert deck.stability[1] == 0
+    assert view.parameters is deck.parameters
+
+
+@pytest.mark.parametrize(
+    "change, match",
+    [
+        (lambda columns: columns.pop("box"), "missing column 'box'"),
+        (lambda columns: columns.update(box=np.zeros(3, dtype=np.int64)), "int32"),
+        (lambda columns: columns.update(box=np.zeros(4, dtype=np.int32)), "same length"),
+    ],
+)
+def test_deck_with_columns_invalid(change, match):
+    deck = LeitnerDeck(3)
+    columns = {name: getattr(deck, name) for name in deck.columns}
+    change(columns)
+    with pytest.raises(ValueError, match=match):
+        deck.with_columns(columns)
+
+
+def _schedulers_match(deck, schedulers, reviews):
+    """Replay the same reviews through the deck in bulk and the schedulers one by one."""
+    n = len(schedulers)
+    for offset, results in reviews:
+        day = START_DAY + offset
+        attempted_at = from_epoch_day(day)
+        deck.review(np.arange(n), day, results)
+        for scheduler, result in zip(schedulers, results, strict=True):
+            scheduler.compute_next_due_interval(attempted_at=attempted_at, result=int(result))
+    for i, scheduler in enumerate(schedulers):
+        assert deck.interval[i] == scheduler.interval
+        assert from_epoch_day(int(deck.due[i])) == scheduler.due_timestamp
+    return deck
+
+
+def test_fsrs_deck_review_matches_scheduler():
+    rng = np.random.default_rng(0)
+    n = 50
+    reviews = [(offset, rng.integers(AGAIN, EASY + 1, n)) for offset in (0, 0, 3, 10, 40)]
+    schedulers = [FSRSScheduler() for _ in range(n)]
+    deck = _schedulers_match(FSRSDeck(n), schedulers, reviews)
+    for i, scheduler in enumerate(schedulers):
+        assert deck.stability[i] == pytest.approx(scheduler.stability, rel=1e-12)
+        assert deck.difficulty[i] == pytest.approx(scheduler.difficulty, rel=1e-12)
+
+
+def test_sm2_deck_review_matches_scheduler():
+    rng = np.random.default_rng(0)
+    n = 50
+    reviews = [(offset, rng.integers(0, 6, n)) for offset in (0, 1, 7, 20)]
+    schedulers = [SM2Scheduler() for _ in range(n)]
+    deck = _schedulers_match(SM2Deck(n), schedulers, reviews)
+    for i, scheduler in enumerate(schedulers):
+        assert deck.easiness[i] == scheduler.easiness
+        assert deck.repetitions[i] == scheduler.repetitions
+
+
+def test_leitner_deck_review_matches_scheduler():
+    rng = np.random.default_rng(0)
+    n = 50
+    reviews = [(offset, rng.integers(0, 2, n)) for offset in (0, 1, 4, 11, 25, 50)]
+    schedulers = [LeitnerScheduler(intervals=[2, 5, 10]) for _ in range(n)]
+    deck = _schedulers_match(LeitnerDeck(n, intervals=[2, 5, 10]), schedulers, reviews)
+    for i, scheduler in enumerate(schedulers):
+        assert deck.box[i] == scheduler.current_box
+
+
+def test_deck_review_subset():
+    deck = LeitnerDeck(4)
+    due, intervals = deck.review([3, 1], START_DAY, [1, 0])
+    assert due.tolist() == [START_DAY + 3, START_DAY + 1]
+    assert intervals.tolist() == [3, 1]
+    assert deck.box.tolist() == [0, 0, 0, 1]
+    assert deck.due[0] == UNSCHEDULED
+
+
+@pytest.mark.parametrize(
+    "cards, match",
+    [
+        ([0, 0], "duplicates"),
+        ([0, 3], r"cards must be in"),
+        ([-1], r"cards must be in"),
+    ],
+)
+def test_deck_review_invalid_cards(cards, match):
+    deck = SM2Deck(3)
+    with pytest.raises(ValueError, match=match):
+        deck.review(cards, START_DAY, 4)
+
+
+def test_deck_review_invalid_result_leaves_state_unchanged():
+    deck = FSRSDeck(2)
+    with pytest.raises(ValueError):
+        deck.review([0, 1], START_DAY, [GOOD, 5])
+    assert (deck.stability == 0).all()
+    assert (deck.due == UNSCHEDULED).all()
+
+
+@pytest.mark.parametrize("invalid_result", [-1, 2])
+def test_leitner_deck_invalid_result(invalid_result: int) -> None:
+    deck = LeitnerDeck(1)
+    with pytest.raises(ValueError, match="result"):
+        deck.review([0], START_DAY, invalid_result)
+    with pytest.raises(ValueError, match="result"):
+        deck[0].compute_next_due_interval(from_epoch_day(START_DAY), invalid_result)
+
+
+# --- CardView tests ---
+
+
+def test_card_view_reads_columns():
+    deck = FSRSDeck(2)
+    card = deck[1]
+    assert card.card == 1
+    assert card.stability == 0.0
+    assert card.due_timestamp is None
+    assert card.interval_td is None
+    with pytest.raises(AttributeError):
+        _ = card.easiness
+
+
+def test_card_view_index_out_of_range():
+    deck = SM2Deck(2)
+    with pytest.raises(IndexError):
+        deck[2]
+    assert deck[-1].card == 1
+
+
+@pytest.mark.parametrize(
+    "deck, scheduler, results",
+    [
+        (FSRSDeck(1), FSRSScheduler(), (GOOD, GOOD, HARD, AGAIN, EASY)),
+        (SM2Deck(1), SM2Scheduler(), (5, 4, 3, 1, 5)),
+        (LeitnerDeck(1), LeitnerScheduler(), (1, 1, 0, 1, 1)),
+    ],
+)
+def test_card_view_compute_next_due_interval_matches_scheduler(deck, scheduler, results):
+    card = deck[0]
+    for offset, result in zip((0, 2, 9, 30, 31), results, strict=True):
+        attempted_at = from_epoch_day(START_DAY + offset)
+        due, interval = card.compute_next_due_interval(attempted_at=attempted_at, result=result)
+        expected_due, expected_interval = scheduler.compute_next_due_interval(
+            attempted_at=attempted_at, result=result
+        )
+        assert isinstance(due, datetime.datetime)
+        assert isinstance(interval, datetime.timedelta)
+        assert due == expected_due == card.due_timestamp
+        assert interval == expected_interval == card.interval_td
+    assert card.interval == scheduler.interval
+
+
+@pytest.mark.parametrize(
+    "deck, scheduler, results",
+    [
+        (FSRSDeck(1), FSRSScheduler(), (GOOD, GOOD, HARD, AGAIN, EASY)),
+        (SM2Deck(1), SM2Scheduler(), (5, 4, 3, 1, 5)),
+        (LeitnerDeck(1), LeitnerScheduler(), (1, 1, 0, 1, 1)),
+    ],
+)
+def test_card_view_compute_next_due_day_matches_scheduler(deck, scheduler, results):
+    card = deck[0]
+    assert card.due_day is None
+    for offset, result in zip((0, 2, 9, 30, 31), results, strict=True):
+        attempted_day = START_DAY + offset
+        due, interval = card.compute_next_due_day(attempted_day, result)
+        assert (due, interval) == scheduler.compute_next_due_day(attempted_day, result)
+        assert due == card.due_day == scheduler.due_day
+
+
+@pytest.mark.parametrize(
+    "deck, scheduler, results",
+    [
+        (FSRSDeck(2), FSRSScheduler(), (GOOD, GOOD, HARD, AGAIN, EASY)),
+        (SM2Deck(2), SM2Scheduler(), (5, 4, 3, 1, 5)),
+        (
+            LeitnerDeck(2, intervals=[1, 2, 4]),
+            LeitnerScheduler(intervals=[1, 2, 4]),
+            (1, 1, 0, 1, 1),
+        ),
+    ],
+)
+def test_deck_scheduler_writes_back(deck, scheduler, results):
+    # Each review materializes a fresh scheduler, as a worker would per reviewed card.
+    for offset, result in zip((0, 2, 9, 30, 31), results, strict=True):
+        attempted_at = from_epoch_day(START_DAY + offset) + datetime.timedelta(hours=15)
+        materialized = deck.scheduler(1)
+        assert type(materialized) is type(scheduler)
+        assert materialized.due_timestamp == deck[1].due_timestamp
+        materialized.compute_next_due_interval(attempted_at=attempted_at, result=result)
+        scheduler.compute_next_due_interval(attempted_at=attempted_at, result=result)
+        assert deck[1].due == to_epoch_day(scheduler.due_timestamp)
+        assert deck[1].interval == scheduler.interval
+    assert deck[0].due_timestamp is None
+
+
+def test_deck_scheduler_state_matches_deck_review():
+    deck = FSRSDeck(2)
+    deck.review([0, 1], START_DAY, GOOD)
+    deck.review([0], START_DAY + 4, HARD)
+    scheduler = deck.scheduler(1)
+    scheduler.compute_next_due_interval(attempted_at=from_epoch_day(START_DAY + 4), result=HARD)
+    for name in deck.columns:
+        assert getattr(deck, name)[0] == getattr(deck, name)[1]
+
+
+def test_deck_scheduler_index_out_of_range():
+    with pytest.raises(IndexError):
+        SM2Deck(2).scheduler(2)
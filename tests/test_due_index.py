@@ -0,0 +1,123 @@
+import datetime
+
+import pytest
+
+from spacedreppy.deck import UNSCHEDULED, SM2Deck
+from spacedreppy.due_index import DueIndex
+from spacedreppy.epoch import to_epoch_day
+from spacedreppy.schedulers.fsrs import GOOD, FSRSScheduler
+from spacedreppy.schedulers.leitner import LeitnerScheduler
+from spacedreppy.schedulers.sm2 import SM2Scheduler
+
+T0 = datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC)
+
+
+def day(n: int) -> datetime.datetime:
+    return T0 + datetime.timedelta(days=n)
+
+
+@pytest.fixture
+def index() -> DueIndex[int]:
+    index: DueIndex[int] = DueIndex()
+    for card_id, offset in [(5, 3), (1, 1), (4, 3), (2, 2), (3, 10)]:
+        index.update(card_id, day(offset))
+    return index
+
+
+def test_next_due_order(index: DueIndex[int]) -> None:
+    assert index.next_due(3) == [(1, day(1)), (2, day(2)), (4, day(3))]
+    assert len(index) == 5
+
+
+def test_next_due_pagination(index: DueIndex[int]) -> None:
+    pages = []
+    after = None
+    while page := index.next_due(2, after=after):
+        pages.append(page)
+        after = page[-1]
+    assert [card_id for page in pages for card_id, _ in page] == [1, 2, 4, 5, 3]
+    assert [len(page) for page in pages] == [2, 2, 1]
+
+
+def test_due_before(index: DueIndex[int]) -> None:
+    assert index.due_before(day(3)) == [(1, day(1)), (2, day(2))]
+    assert index.due_before(day(4), limit=3) == [(1, day(1)), (2, day(2)), (4, day(3))]
+    assert index.due_before(day(4), after=(4, day(3))) == [(5, day(3))]
+    assert index.due_before(day(0)) == []
+
+
+def test_update_moves_and_dequeues(index: DueIndex[int]) -> None:
+    index.update(1, day(20))
+    assert index.next_due(1) == [(2, day(2))]
+    assert index.due_timestamp(1) == day(20)
+    index.update(2, None)
+    assert 2 in index
+    assert len(index) == 4
+    assert index.next_due(1) == [(4, day(3))]
+
+
+def test_untrack(index: DueIndex[int]) -> None:
+    index.untrack(4)
+    assert 4 not in index
+    assert index.due_before(day(4)) == [(1, day(1)), (2, day(2)), (5, day(3))]
+    with pytest.raises(KeyError):
+        index.untrack(4)
+
+
+@pytest.mark.parametrize(
+    "scheduler, result",
+    [(FSRSScheduler(), GOOD), (SM2Scheduler(), 4), (LeitnerScheduler(), 1)],
+)
+def test_track_follows_scheduler_updates(scheduler, result):
+    index: DueIndex[str] = DueIndex()
+    index.track("card", scheduler)
+    assert "card" in index
+    assert len(index) == 0
+
+    due, _ = scheduler.compute_next_due_interval(attempted_at=T0, result=result)
+    assert index.next_due(1) == [("card", due)]
+
+    due, _ = scheduler.compute_next_due_interval(attempted_at=due, result=result)
+    assert index.next_due(2) == [("card", due)]
+
+    index.untrack("card")
+    assert scheduler.on_due_change is None
+    scheduler.compute_next_due_interval(attempted_at=due, result=result)
+    assert len(index) == 0
+
+
+def test_track_chains_deck_write_back() -> None:
+    deck = SM2Deck(2)
+    scheduler = deck.scheduler(0)
+    write_back = scheduler.on_due_change
+    index: DueIndex[int] = DueIndex()
+    index.track(0, scheduler)
+
+    due, _ = scheduler.compute_next_due_interval(attempted_at=T0, result=4)
+    assert index.next_due(1) == [(0, due)]
+    assert deck.due[0] == scheduler.due_day == to_epoch_day(due)
+    assert deck.interval[0] == 1
+
+    index.untrack(0)
+    assert scheduler.on_due_change is write_back
+    scheduler.compute_next_due_interval(attempted_at=due, result=4)
+    assert deck.due[0] == scheduler.due_day
+    assert deck.due[1] == UNSCHEDULED
+
+
+def test_track_twice_raises():
+    index: DueIndex[int] = DueIndex()
+    index.track(1, SM2Scheduler())
+    with pytest.raises(ValueError, match="already tracked"):
+        index.track(1, SM2Scheduler())
+
+
+def test_many_cards_sorted():
+    index: DueIndex[int] = DueIndex()
+    schedulers = [LeitnerScheduler(current_box=i % 5) for i in range(100)]
+    for card_id, scheduler in enumerate(schedulers):
+        index.track(card_id, scheduler)
+        scheduler.compute_next_due_interval(attempted_at=T0, result=1)
+    entries = index.next_due(100)
+    assert len(entries) == 100
+    assert entries == sorted(entries, key=lambda e: (e[1], e[0]))
@@ -1,5 +1,10 @@
+import dataclasses
 import datetime
+import math
+import pickle
 
+import numpy as np
+import numpy.typing as npt
 import pytest
 
 from spacedreppy.schedulers.fsrs import (
@@ -10,8 +15,14 @@ from spacedreppy.schedulers.fsrs import (
     EASY,
     GOOD,
     HARD,
+    FSRSParameters,
     FSRSScheduler,
+    _forgetting_curve,
+    forgetting_curve,
     fsrs,
+    fsrs_batch,
+    fsrs_parameters,
+    fsrs_unchecked,
 )
 from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
 
@@ -288,3 +299,270 @@ def test_scheduler_forget_path(scheduler: FSRSScheduler) -> None:
     assert scheduler.stability == pytest.approx(0.6075801062519337)
     assert scheduler.difficulty == pytest.approx(7.40027437198288)
     assert scheduler.interval == 1
+
+
+# --- fsrs_batch tests ---
+
+
+def test_fsrs_batch_return_types():
+    stabilities, difficulties, intervals = fsrs_batch(
+        ratings=[GOOD], stabilities=[0], difficulties=[0], elapsed_days=[0]
+    )
+    assert stabilities.dtype == np.float64
+    assert difficulties.dtype == np.float64
+    assert intervals.dtype == np.int64
+
+
+@pytest.mark.parametrize(
+    "stability, difficulty, elapsed_days",
+    [
+        (0, 0, 0),  # new card
+        (0.212, 6.4133, 0),  # same-day review
+        (2.3065, 2.118103970459015, 2),  # regular review
+        (8.2956, 1.0, 8),
+        (77.06450547606927, 1.0, 300),
+    ],
+)
+def test_fsrs_batch_matches_scalar(stability: float, difficulty: float, elapsed_days: int) -> None:
+    ratings = [AGAIN, HARD, GOOD, EASY]
+    stabilities, difficulties, intervals = fsrs_batch(
+        ratings=ratings, stabilities=stability, difficulties=difficulty, elapsed_days=elapsed_days
+    )
+    for i, rating in enumerate(ratings):
+        s, d, ivl = fsrs(
+            rating=rating, stability=stability, difficulty=difficulty, elapsed_days=elapsed_days
+        )
+        assert stabilities[i] == pytest.approx(s, rel=1e-12)
+        assert difficulties[i] == pytest.approx(d, rel=1e-12)
+        assert intervals[i] == ivl
+
+
+def test_fsrs_batch_mixed_branches_match_scalar():
+    rng = np.random.default_rng(0)
+    n = 1000
+    ratings = rng.integers(AGAIN, EASY + 1, n)
+    stabilities = rng.uniform(0.1, 100, n)
+    stabilities[rng.random(n) < 0.2] = 0
+    difficulties = rng.uniform(1, 10, n)
+    elapsed_days = rng.integers(0, 120, n)
+    elapsed_days[rng.random(n) < 0.2] = 0
+
+    new_s, new_d, intervals = fsrs_batch(ratings, stabilities, difficulties, elapsed_days)
+
+    for i in range(n):
+        s, d, ivl = fsrs(
+            rating=int(ratings[i]),
+            stability=float(stabilities[i]),
+            difficulty=float(difficulties[i]),
+            elapsed_days=float(elapsed_days[i]),
+        )
+        assert new_s[i] == pytest.approx(s, rel=1e-12)
+        assert new_d[i] == pytest.approx(d, rel=1e-12)
+        assert intervals[i] == ivl
+
+
+def test_fsrs_batch_empty():
+    stabilities, difficulties, intervals = fsrs_batch([], [], [], [])
+    assert stabilities.shape == difficulties.shape == intervals.shape == (0,)
+
+
+def test_fsrs_batch_interval_clamped_to_maximum():
+    _, _, intervals = fsrs_batch([EASY], [0], [0], [0], maximum_interval=3)
+    assert intervals[0] == 3
+
+
+@pytest.mark.parametrize(
+    "ratings, stabilities, elapsed_days",
+    [
+        ([GOOD, 0], [0, 0], [0, 0]),  # rating too low
+        ([GOOD, 5], [0, 0], [0, 0]),  # rating too high
+        ([GOOD, GOOD], [0, -1], [0, 0]),  # negative stability
+        ([GOOD, GOOD], [0, 0], [0, -1]),  # negative elapsed_days
+    ],
+)
+def test_fsrs_batch_invalid_inputs(
+    ratings: list[int], stabilities: list[float], elapsed_days: list[float]
+) -> None:
+    with pytest.raises(ValueError):
+        fsrs_batch(ratings, stabilities, [0, 0], elapsed_days)
+
+
+@pytest.mark.parametrize("ratings", [[GOOD, 2.7], [GOOD, np.nan], ["good"]])
+def test_fsrs_batch_rejects_non_integer_ratings(ratings: npt.ArrayLike) -> None:
+    with pytest.raises(ValueError, match="ratings must be integers"):
+        fsrs_batch(ratings, 1.0, 5.0, 1)
+
+
+def test_fsrs_batch_accepts_integral_float_ratings() -> None:
+    expected = fsrs_batch([GOOD, EASY], 1.0, 5.0, 1)
+    for got, want in zip(fsrs_batch([3.0, 4.0], 1.0, 5.0, 1), expected, strict=True):
+        np.testing.assert_array_equal(got, want)
+
+
+@pytest.mark.parametrize("rating", [AGAIN, HARD, GOOD, EASY])
+def test_fsrs_batch_intervals_match_scalar_at_rounding_ties(rating: int) -> None:
+    p = fsrs_parameters()
+
+    def unrounded(elapsed: float) -> float:
+        new_s, _, _ = fsrs(rating, 40.0, 5.0, elapsed)
+        return new_s / p.factor * p.retention_term
+
+    # Bisect the elapsed days at which the scalar interval crosses a rounding tie.
+    lo, hi = 1.0, 400.0
+    tie = math.ceil(min(unrounded(lo), unrounded(hi))) + 0.5
+    rising = unrounded(hi) > unrounded(lo)
+    while np.nextafter(lo, hi) < hi:
+        mid = (lo + hi) / 2
+        if (unrounded(mid) < tie) == rising:
+            lo = mid
+        else:
+            hi = mid
+    elapsed = np.array([lo, hi, np.nextafter(lo, 0), np.nextafter(hi, 1e9)])
+    new_s, new_d, intervals = fsrs_batch(rating, 40.0, 5.0, elapsed)
+    for i, t in enumerate(elapsed.tolist()):
+        assert (new_s[i], new_d[i], intervals[i]) == fsrs(rating, 40.0, 5.0, t)
+    assert len(set(intervals.tolist())) == 2
+    assert fsrs_batch(rating, 40.0, 5.0, lo)[2] == fsrs(rating, 40.0, 5.0, lo)[2]
+
+
+def test_fsrs_batch_invalid_parameters():
+    with pytest.raises(ValueError, match="weights must have 21 elements"):
+        fsrs_batch([GOOD], [0], [0], [0], weights=(1.0, 2.0))
+    with pytest.raises(ValueError, match="request_retention"):
+        fsrs_batch([GOOD], [0], [0], [0], request_retention=1.0)
+    with pytest.raises(ValueError, match="maximum_interval"):
+        fsrs_batch([GOOD], [0], [0], [0], maximum_interval=0)
+
+
+# --- FSRSParameters tests ---
+
+
+def test_fsrs_parameters_are_cached():
+    assert fsrs_parameters() is fsrs_parameters(list(DEFAULT_WEIGHTS), DEFAULT_REQUEST_RETENTION)
+    assert fsrs_parameters(request_retention=0.85) is not fsrs_parameters()
+
+
+def test_fsrs_parameters_are_immutable():
+    parameters = fsrs_parameters()
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        parameters.decay = 0.0  # type: ignore[misc]
+
+
+def test_fsrs_parameters_derived_constants():
+    parameters = fsrs_parameters()
+    w = DEFAULT_WEIGHTS
+    assert parameters.decay == -w[20]
+    assert parameters.factor == 0.9 ** (1 / -w[20]) - 1
+    assert parameters.retention_term == 0.9 ** (1 / -w[20]) - 1
+    assert parameters.initial_stability == (0.212, 1.2931, 2.3065, 8.2956)
+    assert parameters.initial_difficulty[EASY - 1] == parameters.d0_easy == 1.0
+
+
+def test_fsrs_parameters_pickle_returns_shared_instance():
+    parameters = fsrs_parameters(request_retention=0.8)
+    assert pickle.loads(pickle.dumps(parameters)) is parameters
+
+
+@pytest.mark.parametrize(
+    "weights, request_retention, match",
+    [
+        ((1.0, 2.0), 0.9, "weights must have 21 elements"),
+        (DEFAULT_WEIGHTS, 0.0, "request_retention"),
+        (DEFAULT_WEIGHTS, 1.0, "request_retention"),
+    ],
+)
+def test_fsrs_parameters_invalid(
+    weights: tuple[float, ...], request_retention: float, match: str
+) -> None:
+    with pytest.raises(ValueError, match=match):
+        FSRSParameters(weights, request_retention)
+
+
+def test_fsrs_with_parameters_matches_weights():
+    parameters = fsrs_parameters(request_retention=0.8)
+    s0, d0, _ = fsrs(rating=GOOD, stability=0, difficulty=0, elapsed_days=0)
+    expected = fsrs(rating=HARD, stability=s0, difficulty=d0, elapsed_days=5, request_retention=0.8)
+    assert (
+        fsrs(rating=HARD, stability=s0, difficulty=d0, elapsed_days=5, parameters=parameters)
+        == expected
+    )
+
+
+def test_schedulers_share_parameters():
+    a = FSRSScheduler(request_retention=0.85)
+    b = FSRSScheduler(request_retention=0.85)
+    assert a.parameters is b.parameters
+    assert a.request_retention == 0.85
+
+
+def test_scheduler_parameter_setters():
+    scheduler = FSRSScheduler()
+    scheduler.request_retention = 0.8
+    assert scheduler.parameters is fsrs_parameters(request_retention=0.8)
+    custom_w = tuple(float(i) for i in range(21))
+    scheduler.weights = custom_w
+    assert scheduler.parameters is fsrs_parameters(custom_w, 0.8)
+
+
+def test_scheduler_with_parameters():
+    parameters = fsrs_parameters(request_retention=0.8)
+    scheduler = FSRSScheduler(parameters=parameters)
+    assert scheduler.parameters is parameters
+    assert scheduler.request_retention == 0.8
+
+
+def test_scheduler_invalid_weights_raise_on_construction():
+    with pytest.raises(ValueError, match="weights must have 21 elements"):
+        FSRSScheduler(weights=(1.0, 2.0))
+
+
+# --- unchecked fast path tests ---
+
+
+@pytest.mark.parametrize(
+    "rating, stability, difficulty, elapsed_days",
+    [
+        (GOOD, 0, 0, 0),
+        (AGAIN, 0.212, 6.4133, 0),
+        (HARD, 8.2956, 1.0, 8),
+        (AGAIN, 2.3065, 2.118103970459015, 2),
+    ],
+)
+def test_fsrs_unchecked_matches_fsrs(
+    rating: int, stability: float, difficulty: float, elapsed_days: float
+) -> None:
+    assert fsrs_unchecked(rating, stability, difficulty, elapsed_days, fsrs_parameters()) == fsrs(
+        rating, stability, difficulty, elapsed_days
+    )
+
+
+def test_scheduler_without_validation_matches():
+    checked = FSRSScheduler()
+    unchecked = FSRSScheduler(validate=False)
+    at = datetime.datetime(year=2025, month=1, day=1, tzinfo=datetime.UTC)
+    for days, rating in ((0, GOOD), (2, HARD), (9, AGAIN), (10, EASY)):
+        attempted_at = at + datetime.timedelta(days=days)
+        assert checked.compute_next_due_interval(
+            attempted_at, rating
+        ) == unchecked.compute_next_due_interval(attempted_at, rating)
+    assert unchecked.stability == checked.stability
+    assert unchecked.difficulty == checked.difficulty
+
+
+def test_forgetting_curve_matches_scalar():
+    p = fsrs_parameters(request_retention=0.85)
+    elapsed = np.array([0, 1, 5, 30, 365])
+    stability = np.array([0.5, 3.0, 5.0, 12.5, 100.0])
+    expected = [
+        _forgetting_curve(t, s, p.decay, p.factor) for t, s in zip(elapsed, stability, strict=True)
+    ]
+    np.testing.assert_allclose(forgetting_curve(elapsed, stability, p), expected, rtol=1e-12)
+    # R(S, S) == 0.9 for any stability.
+    np.testing.assert_allclose(forgetting_curve(stability, stability), 0.9)
+
+
+def test_forgetting_curve_edge_cases():
+    r = forgetting_curve([-3, 4, 4], [2.0, 0.0, 2.0])
+    assert r[0] == 1.0
+    assert np.isnan(r[1])
+    assert 0 < r[2] < 0.9
@@ -0,0 +1,173 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from spacedreppy.instrumentation import (
+    Histogram,
+    MetricsRecorder,
+    disable,
+    enable,
+    enabled,
+    instrument,
+)
+from spacedreppy.schedulers import fsrs as fsrs_module
+from spacedreppy.schedulers import leitner as leitner_module
+from spacedreppy.schedulers import sm2 as sm2_module
+from spacedreppy.schedulers.fsrs import FSRSScheduler
+from spacedreppy.schedulers.leitner import LeitnerScheduler
+from spacedreppy.schedulers.sm2 import SM2Scheduler
+from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
+
+ATTEMPTED_AT = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def _originals() -> list[object]:
+    return [
+        SpacedRepetitionScheduler.__dict__["compute_next_due_interval"],
+        SpacedRepetitionScheduler.__dict__["compute_next_due_day"],
+        fsrs_module.fsrs,
+        fsrs_module.fsrs_unchecked,
+        sm2_module.sm2,
+        sm2_module.sm2_unchecked,
+        leitner_module.leitner,
+        leitner_module.leitner_unchecked,
+    ]
+
+
+def _review(scheduler: SpacedRepetitionScheduler, result: int, days: list[int]) -> None:
+    for day in days:
+        scheduler.compute_next_due_interval(ATTEMPTED_AT + timedelta(days=day), result)
+
+
+@pytest.mark.parametrize(
+    ("name", "algorithm", "factory", "result"),
+    [
+        ("FSRSScheduler", "fsrs", FSRSScheduler, 3),
+        ("SM2Scheduler", "sm2", SM2Scheduler, 4),
+        ("LeitnerScheduler", "leitner", LeitnerScheduler, 1),
+    ],
+)
+@pytest.mark.parametrize("validate", [True, False])
+def test_reviews_are_counted_and_timed(
+    name: str, algorithm: str, factory: type[SpacedRepetitionScheduler], result: int, validate: bool
+) -> None:
+    with instrument() as sink:
+        assert isinstance(sink, MetricsRecorder)
+        _review(factory(validate=validate), result, [0, 3, 10])  # type: ignore[call-arg]
+    assert sink.counters[f"{name}.reviews"] == 3
+    review = sink.histograms[f"{name}.review"]
+    update = sink.histograms[f"{algorithm}.update"]
+    assert review.count == update.count == sink.histograms[f"{algorithm}.algorithm"].count == 3
+    assert review.total_ns >= update.total_ns > 0
+
+
+def test_instrumented_reviews_match_plain_reviews() -> None:
+    plain = FSRSScheduler()
+    _review(plain, 3, [0, 0, 4, 20])
+    with instrument():
+        instrumented = FSRSScheduler()
+        _review(instrumented, 3, [0, 0, 4, 20])
+    assert instrumented.__getstate__() == plain.__getstate__()
+
+
+def test_reviews_accept_keyword_arguments() -> None:
+    plain = SM2Scheduler()
+    plain.compute_next_due_interval(attempted_at=ATTEMPTED_AT, result=4)
+    plain.compute_next_due_day(attempted_day=20_095, result=4)
+    with instrument() as sink:
+        assert isinstance(sink, MetricsRecorder)
+        instrumented = SM2Scheduler()
+        instrumented.compute_next_due_interval(attempted_at=ATTEMPTED_AT, result=4)
+        instrumented.compute_next_due_day(attempted_day=20_095, result=4)
+    assert sink.counters == {"SM2Scheduler.reviews": 2}
+    assert instrumented.__getstate__() == plain.__getstate__()
+
+
+def test_day_reviews_are_counted() -> None:
+    with instrument() as sink:
+        assert isinstance(sink, MetricsRecorder)
+        scheduler = FSRSScheduler()
+        for day in [0, 0, 4]:
+            scheduler.compute_next_due_day(20_089 + day, 3)
+    assert sink.counters["FSRSScheduler.reviews"] == 3
+    assert sink.histograms["fsrs.update"].count == 3
+    assert sink.counters["fsrs.same_day"] == 1
+
+
+def test_fsrs_branches_are_counted() -> None:
+    with instrument() as sink:
+        assert isinstance(sink, MetricsRecorder)
+        _review(FSRSScheduler(), 3, [0, 0, 4, 20, 20])
+    assert sink.counters["fsrs.new"] == 1
+    assert sink.counters["fsrs.same_day"] == 2
+    assert sink.counters["fsrs.regular"] == 2
+
+
+def test_errors_are_counted() -> None:
+    with instrument() as sink:
+        assert isinstance(sink, MetricsRecorder)
+        with pytest.raises(ValueError, match="rating"):
+            FSRSScheduler().compute_next_due_interval(ATTEMPTED_AT, 9)
+    assert sink.counters == {"FSRSScheduler.errors": 1}
+    assert "FSRSScheduler.review" not in sink.histograms
+
+
+def test_disable_restores_original_code() -> None:
+    originals = _originals()
+    with instrument():
+        assert enabled()
+        assert _originals() != originals
+    assert not enabled()
+    assert all(a is b for a, b in zip(_originals(), originals, strict=True))
+    disable()
+
+
+def test_custom_sink() -> None:
+    events: list[tuple[str, int]] = []
+
+    class ListSink:
+        def count(self, name: str, value: int = 1) -> None:
+            events.append((name, value))
+
+        def observe(self, name: str, nanoseconds: int) -> None:
+            events.append((name, -1))
+
+    with instrument(ListSink()):
+        _review(SM2Scheduler(), 4, [0])
+    assert [name for name, _ in events] == [
+        "sm2.algorithm",
+        "sm2.update",
+        "SM2Scheduler.review",
+        "SM2Scheduler.reviews",
+    ]
+
+
+def test_enable_twice_raises() -> None:
+    enable()
+    try:
+        with pytest.raises(RuntimeError, match="already enabled"):
+            enable()
+    finally:
+        disable()
+
+
+def test_histogram_percentiles() -> None:
+    histogram = Histogram()
+    for nanoseconds in [100, 200, 300, 5000]:
+        histogram.add(nanoseconds)
+    assert histogram.mean_ns == 1400
+    assert histogram.percentile(50) == 256
+    assert histogram.percentile(75) == 512
+    assert histogram.percentile(100) == 5000
+
+
+def test_recorder_snapshot_and_reset() -> None:
+    recorder = MetricsRecorder()
+    recorder.count("a")
+    recorder.count("a", 2)
+    recorder.observe("t", 1000)
+    snapshot = recorder.snapshot()
+    assert snapshot["counters"] == {"a": 3}
+    assert snapshot["timers"]["t"]["count"] == 1
+    recorder.reset()
+    assert recorder.snapshot() == {"counters": {}, "timers": {}}
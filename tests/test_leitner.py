@@ -1,11 +1,15 @@
 import datetime
 
+import numpy as np
 import pytest
 
 from spacedreppy.schedulers.leitner import (
     DEFAULT_INTERVALS,
     LeitnerScheduler,
     leitner,
+    leitner_batch,
+    leitner_transitions,
+    leitner_unchecked,
 )
 from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
 
@@ -217,3 +221,89 @@ def test_scheduler_custom_intervals_review():
     s.compute_next_due_interval(attempted_at=attempted_at, result=0)
     assert s.current_box == 0
     assert s.interval == 2
+
+
+# --- leitner_batch tests ---
+
+
+def test_leitner_batch_return_type():
+    result = leitner_batch(correct=[True], current_box=[0], num_boxes=5)
+    assert result.dtype == np.int64
+
+
+@pytest.mark.parametrize("num_boxes", [1, 2, 5])
+def test_leitner_batch_matches_scalar(num_boxes: int) -> None:
+    boxes = np.repeat(np.arange(num_boxes), 2)
+    correct = np.tile([True, False], num_boxes)
+    result = leitner_batch(correct=correct, current_box=boxes, num_boxes=num_boxes)
+    expected = [
+        leitner(correct=bool(c), current_box=int(b), num_boxes=num_boxes)
+        for c, b in zip(correct, boxes, strict=True)
+    ]
+    assert result.tolist() == expected
+
+
+def test_leitner_batch_broadcasts_correct():
+    result = leitner_batch(correct=True, current_box=[0, 1, 4], num_boxes=5)
+    assert result.tolist() == [1, 2, 4]
+
+
+def test_leitner_batch_invalid_num_boxes():
+    with pytest.raises(ValueError, match="num_boxes must be positive"):
+        leitner_batch(correct=[True], current_box=[0], num_boxes=0)
+
+
+@pytest.mark.parametrize("current_box", [-1, 5])
+def test_leitner_batch_invalid_current_box(current_box: int) -> None:
+    with pytest.raises(ValueError, match="current_box must be in"):
+        leitner_batch(correct=[True, True], current_box=[0, current_box], num_boxes=5)
+
+
+# --- transition table tests ---
+
+
+@pytest.mark.parametrize("num_boxes", [1, 2, 5])
+def test_leitner_transitions_match_scalar(num_boxes: int) -> None:
+    table = leitner_transitions(num_boxes)
+    assert table.shape == (num_boxes, 2)
+    for box in range(num_boxes):
+        for result in (0, 1):
+            assert table[box, result] == leitner(bool(result), box, num_boxes)
+
+
+def test_leitner_transitions_are_cached_and_read_only():
+    table = leitner_transitions(5)
+    assert leitner_transitions(5) is table
+    with pytest.raises(ValueError, match="read-only"):
+        table[0, 0] = 3
+
+
+def test_leitner_transitions_invalid_num_boxes():
+    with pytest.raises(ValueError, match="num_boxes must be positive"):
+        leitner_transitions(0)
+
+
+def test_scheduler_rejects_corrupted_box():
+    scheduler = LeitnerScheduler()
+    scheduler.current_box = 7
+    with pytest.raises(ValueError, match="current_box must be in"):
+        scheduler.compute_next_due_interval(attempted_at=datetime.datetime(2021, 10, 1), result=1)
+
+
+# --- unchecked fast path tests ---
+
+
+@pytest.mark.parametrize("correct", [True, False])
+@pytest.mark.parametrize("current_box", [0, 2, 4])
+def test_leitner_unchecked_matches_leitner(correct: bool, current_box: int) -> None:
+    assert leitner_unchecked(correct, current_box, 5) == leitner(correct, current_box, 5)
+
+
+def test_scheduler_without_validation():
+    scheduler = LeitnerScheduler(validate=False)
+    attempted_at = datetime.datetime(year=2021, month=10, day=1)
+    scheduler.compute_next_due_interval(attempted_at=attempted_at, result=1)
+    assert scheduler.current_box == 1
+    # Out-of-range results are not rejected; anything but 1 counts as incorrect.
+    scheduler.compute_next_due_interval(attempted_at=attempted_at, result=2)
+    assert scheduler.current_box == 0
@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+from spacedreppy.deck import UNSCHEDULED, Deck, FSRSDeck, LeitnerDeck, SM2Deck
+from spacedreppy.load_balancer import LoadBalancer, fuzz_window
+
+START_DAY = 20_089
+
+
+def _histogram(deck: Deck, start: int, days: int) -> list[int]:
+    due = deck.due[deck.due != UNSCHEDULED]
+    return [int(np.count_nonzero(due == day)) for day in range(start, start + days)]
+
+
+def _copy(deck: Deck) -> Deck:
+    return deck.with_columns({name: getattr(deck, name).copy() for name in deck.columns})
+
+
+@pytest.mark.parametrize(
+    ("interval", "expected"),
+    [(1, (1, 1)), (2, (2, 2)), (3, (2, 4)), (10, (8, 12)), (100, (93, 107)), (365, (345, 385))],
+)
+def test_fuzz_window(interval: int, expected: tuple[int, int]) -> None:
+    assert fuzz_window(interval) == expected
+
+
+def test_fuzz_window_respects_maximum_interval() -> None:
+    assert fuzz_window(100, maximum_interval=100) == (93, 100)
+    assert fuzz_window(100, maximum_interval=50) == (93, 100)
+
+
+@pytest.mark.parametrize(
+    ("deck", "result"),
+    [(FSRSDeck(2000), 3), (SM2Deck(2000), 4)],
+    ids=["fsrs", "sm2"],
+)
+def test_balancing_flattens_daily_load(deck: Deck, result: int) -> None:
+    plain = _copy(deck)
+    balancer = LoadBalancer(deck)
+    cards = np.arange(len(deck))
+    for day in range(3):
+        plain.review(cards[day::3], START_DAY + day, result)
+        balancer.review(cards[day::3], START_DAY + day, result)
+    for _ in range(3):
+        for card in range(len(deck)):
+            day = int(plain.due[card])
+            plain.review_one(card, day, result)
+            balancer.review_one(card, int(deck.due[card]), result)
+    window = (START_DAY, int(max(plain.due.max(), deck.due.max())) - START_DAY + 1)
+    assert max(balancer.loads(*window)) < max(_histogram(plain, *window)) / 2
+    assert sum(balancer.loads(*window)) == len(deck)
+
+
+def test_balanced_due_dates_stay_in_fuzz_window() -> None:
+    deck = SM2Deck(500)
+    balancer = LoadBalancer(deck)
+    for day in [0, 1, 7]:
+        plain = _copy(deck)
+        previous = deck.due.copy()
+        _, scheduled = plain.review(np.arange(500), START_DAY + day, 5)
+        due, intervals = balancer.review(np.arange(500), START_DAY + day, 5)
+        np.testing.assert_array_equal(due, deck.due)
+        np.testing.assert_array_equal(intervals, deck.interval)
+        if day:
+            np.testing.assert_array_equal(due - intervals, previous)
+        for interval, expected in zip(intervals.tolist(), scheduled.tolist(), strict=True):
+            low, high = fuzz_window(expected)
+            assert low <= interval <= high
+    assert len(np.unique(deck.due)) > 1
+
+
+def test_short_intervals_are_not_moved() -> None:
+    deck = LeitnerDeck(100)
+    balancer = LoadBalancer(deck)
+    due, intervals = balancer.review(np.arange(100), START_DAY, 0)
+    np.testing.assert_array_equal(due, START_DAY + 1)
+    np.testing.assert_array_equal(intervals, 1)
+    assert balancer.load(START_DAY + 1) == 100
+
+
+def test_review_matches_review_one() -> None:
+    batch, one = FSRSDeck(300), FSRSDeck(300)
+    by_batch, by_one = LoadBalancer(batch), LoadBalancer(one)
+    for day, rating in [(0, 3), (1, 4), (20, 3)]:
+        cards = np.arange(300)
+        due, intervals = by_batch.review(cards, START_DAY + day, rating)
+        for card in cards.tolist():
+            assert by_one.review_one(card, START_DAY + day, rating) == (
+                due[card],
+                intervals[card],
+            )
+    np.testing.assert_array_equal(batch.due, one.due)
+
+
+def test_histogram_follows_outside_changes() -> None:
+    deck = FSRSDeck(100)
+    deck.review(np.arange(50), START_DAY, 3)
+    balancer = LoadBalancer(deck)
+    assert balancer.load(int(deck.due[0])) == 50
+    deck.review(np.arange(50, 100), START_DAY, 3)
+    assert balancer.load(int(deck.due[0])) == 100
+    balancer.review(np.arange(100), START_DAY + 5, 3)
+    np.testing.assert_array_equal(balancer.loads(START_DAY, 60), _histogram(deck, START_DAY, 60))
+
+
+@pytest.mark.parametrize(
+    ("cards", "result", "match"),
+    [
+        ([0, 10], 4, r"cards must be in \[0, 10\)"),
+        ([-1, 0], 4, r"cards must be in \[0, 10\)"),
+        ([0, 0], 4, "duplicates"),
+        ([0, 1], 9, "qualit"),
+    ],
+)
+def test_invalid_review_changes_nothing(cards: list[int], result: int, match: str) -> None:
+    deck = SM2Deck(10)
+    balancer = LoadBalancer(deck)
+    balancer.review(np.arange(10), START_DAY, 4)
+    before, due = balancer.loads(START_DAY, 10), deck.due.copy()
+    with pytest.raises(ValueError, match=match):
+        balancer.review(cards, START_DAY + 1, result)
+    np.testing.assert_array_equal(balancer.loads(START_DAY, 10), before)
+    np.testing.assert_array_equal(deck.due, due)
+
+
+@pytest.mark.parametrize(
+    ("card", "result", "match"),
+    [
+        (10, 4, r"card must be in \[0, 10\)"),
+        (-1, 4, r"card must be in \[0, 10\)"),
+        (0, 9, "qualit"),
+    ],
+)
+def test_invalid_review_one_changes_nothing(card: int, result: int, match: str) -> None:
+    deck = SM2Deck(10)
+    balancer = LoadBalancer(deck)
+    balancer.review(np.arange(10), START_DAY, 4)
+    before, due = balancer.loads(START_DAY, 10), deck.due.copy()
+    with pytest.raises(ValueError, match=match):
+        balancer.review_one(card, START_DAY + 1, result)
+    np.testing.assert_array_equal(balancer.loads(START_DAY, 10), before)
+    np.testing.assert_array_equal(deck.due, due)
@@ -0,0 +1,153 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from spacedreppy.deck import UNSCHEDULED, FSRSDeck, LeitnerDeck, SM2Deck
+from spacedreppy.migration import migrate_scheduler, migrate_to_fsrs
+from spacedreppy.retrievability import retrievability
+from spacedreppy.schedulers.fsrs import GOOD, FSRSScheduler, fsrs_parameters
+from spacedreppy.schedulers.leitner import LeitnerScheduler
+from spacedreppy.schedulers.sm2 import SM2Scheduler
+
+START_DAY = 20_089
+
+
+def _sm2_deck() -> SM2Deck:
+    deck = SM2Deck(6)
+    deck.review(np.arange(5), START_DAY, 4)
+    deck.review(np.arange(4), START_DAY + 1, [5, 4, 3, 5])
+    deck.review(np.arange(3), START_DAY + 7, [5, 3, 4])
+    return deck
+
+
+def _leitner_deck() -> LeitnerDeck:
+    deck = LeitnerDeck(6)
+    for day, cards in [(0, [0, 1, 2, 3, 4]), (1, [0, 1, 2]), (4, [0, 1]), (11, [0])]:
+        deck.review(cards, START_DAY + day, 1)
+    return deck
+
+
+@pytest.mark.parametrize("deck", [_sm2_deck(), _leitner_deck()], ids=["sm2", "leitner"])
+def test_migrated_cards_keep_schedule(deck: SM2Deck | LeitnerDeck) -> None:
+    migrated = migrate_to_fsrs(deck)
+    assert isinstance(migrated, FSRSDeck)
+    np.testing.assert_array_equal(migrated.due, deck.due)
+    np.testing.assert_array_equal(migrated.interval, deck.interval)
+    np.testing.assert_array_equal(migrated.last_review[:5], deck.due[:5] - deck.interval[:5])
+    for card in range(5):
+        due = int(deck.due[card])
+        assert retrievability(migrated, due)[card] == pytest.approx(0.9)
+    assert (migrated.difficulty[:5] >= 1).all() and (migrated.difficulty[:5] <= 10).all()
+    assert (migrated.stability[5], migrated.difficulty[5]) == (0, 0)
+    assert migrated.last_review[5] == UNSCHEDULED
+
+
+def test_source_retention_scales_stability() -> None:
+    deck = _sm2_deck()
+    migrated = migrate_to_fsrs(deck, source_retention=0.8)
+    for card in range(5):
+        assert retrievability(migrated, int(deck.due[card]))[card] == pytest.approx(0.8)
+    assert (migrated.stability[:5] < deck.interval[:5]).all()
+
+
+def test_lower_easiness_means_higher_difficulty() -> None:
+    deck = SM2Deck(4)
+    deck.review(np.arange(4), START_DAY, 4)
+    deck.easiness[:] = [1.3, 1.8, 2.5, 3.0]
+    difficulty = migrate_to_fsrs(deck).difficulty
+    assert np.all(np.diff(difficulty) < 0)
+    assert difficulty[0] == 10
+
+
+def test_good_review_grows_stability_by_ease() -> None:
+    deck = SM2Deck(1)
+    deck.review([0], START_DAY, 4)
+    deck.interval[0] = 20
+    deck.due[0] = START_DAY + 20
+    migrated = migrate_to_fsrs(deck)
+    stability = float(migrated.stability[0])
+    migrated.review([0], START_DAY + 20, GOOD)
+    assert migrated.stability[0] / stability == pytest.approx(deck.easiness[0])
+
+
+def test_refinement_replays_log_from_first_logged_gap() -> None:
+    deck = SM2Deck(3)
+    days = [START_DAY, START_DAY + 1, START_DAY + 7, START_DAY + 20]
+    for day, quality in zip(days, [4, 5, 2, 4], strict=True):
+        deck.review([0, 1, 2], day, quality)
+    # Card 0: its whole log, out of order. Card 1: one review. Card 2: a log
+    # that stops before its last review.
+    cards = [0, 0, 0, 1, 0, 2, 2]
+    log_days = [days[1], days[2], days[3], days[3], days[0], days[0], days[1]]
+    qualities = [5, 2, 4, 4, 4, 4, 5]
+    migrated = migrate_to_fsrs(deck, cards, log_days, qualities)
+
+    # Restarted after the first logged review with the one-day gap to the next as interval.
+    restarted = deck.with_columns({name: getattr(deck, name).copy() for name in deck.columns})
+    restarted.interval[0], restarted.due[0] = 1, days[1]
+    start = migrate_to_fsrs(restarted)
+    expected = start.scheduler(0)
+    assert isinstance(expected, FSRSScheduler)
+    for day, rating in zip(days[1:], [4, 1, 3], strict=True):
+        expected.compute_next_due_day(day, rating)
+    assert migrated.stability[0] == pytest.approx(expected.stability)
+    assert migrated.difficulty[0] == pytest.approx(expected.difficulty)
+    assert migrated.due[0] == expected.due_day
+    assert migrated.last_review[0] == expected.last_review_day == days[3]
+
+    plain = migrate_to_fsrs(deck)
+    for card in (1, 2):
+        assert migrated.stability[card] == plain.stability[card]
+        assert migrated.due[card] == plain.due[card]
+
+
+def test_migrate_scheduler_matches_deck() -> None:
+    deck = _sm2_deck()
+    migrated = migrate_to_fsrs(deck, parameters=fsrs_parameters(request_retention=0.85))
+    scheduler = SM2Scheduler(easiness=float(deck.easiness[1]), repetitions=int(deck.repetitions[1]))
+    scheduler.interval = int(deck.interval[1])
+    scheduler.due_day = int(deck.due[1])
+    fsrs_scheduler = migrate_scheduler(
+        scheduler, parameters=fsrs_parameters(request_retention=0.85)
+    )
+    assert fsrs_scheduler.on_due_change is None
+    assert fsrs_scheduler.stability == migrated.stability[1]
+    assert fsrs_scheduler.difficulty == migrated.difficulty[1]
+    assert fsrs_scheduler.due_day == deck.due[1]
+    assert fsrs_scheduler.last_review_day == migrated.last_review[1]
+    assert fsrs_scheduler.request_retention == 0.85
+
+    new = migrate_scheduler(LeitnerScheduler(intervals=[2, 5]))
+    assert (new.stability, new.due_timestamp) == (0.0, None)
+
+
+def test_migrate_scheduler_keeps_naive_timestamps() -> None:
+    scheduler = SM2Scheduler()
+    scheduler.compute_next_due_interval(datetime(2024, 1, 1, 15), 4)
+    scheduler.compute_next_due_interval(datetime(2024, 1, 2, 15), 4)
+    migrated = migrate_scheduler(scheduler)
+    assert migrated.due_timestamp == scheduler.due_timestamp == datetime(2024, 1, 8, 15)
+    assert migrated.last_review_at == datetime(2024, 1, 2, 15)
+    due, interval = migrated.compute_next_due_interval(datetime(2024, 1, 8, 15), GOOD)
+    assert due == datetime(2024, 1, 8, 15) + interval
+    assert due.tzinfo is None
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "error", "match"),
+    [
+        ({"source_retention": 1.0}, ValueError, "source_retention"),
+        ({"cards": [0]}, ValueError, "attempted_at"),
+        ({"cards": [9], "attempted_at": [START_DAY], "results": [4]}, ValueError, "cards"),
+        ({"cards": [0], "attempted_at": [START_DAY], "results": [6]}, ValueError, "results"),
+    ],
+)
+def test_invalid_migration(kwargs: dict[str, object], error: type[Exception], match: str) -> None:
+    with pytest.raises(error, match=match):
+        migrate_to_fsrs(_sm2_deck(), **kwargs)  # type: ignore[arg-type]
+
+
+def test_fsrs_deck_is_not_migrated() -> None:
+    with pytest.raises(TypeError, match="FSRSDeck"):
+        migrate_to_fsrs(FSRSDeck(1))  # type: ignore[arg-type]
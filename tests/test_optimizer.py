@@ -0,0 +1,152 @@
+import math
+
+import numpy as np
+import pytest
+
+from spacedreppy.optimizer import (
+    WEIGHT_LOWER_BOUNDS,
+    WEIGHT_UPPER_BOUNDS,
+    fit_fsrs_weights,
+    fsrs_log_loss,
+)
+from spacedreppy.schedulers.fsrs import (
+    AGAIN,
+    DEFAULT_WEIGHTS,
+    FSRSScheduler,
+    _forgetting_curve,
+    fsrs_batch,
+    fsrs_parameters,
+    fsrs_unchecked,
+)
+
+DAY = 86400
+TRUE_WEIGHTS = (1.0, 3.0, 6.0, 15.0, *DEFAULT_WEIGHTS[4:8], 1.3, *DEFAULT_WEIGHTS[9:20], 0.3)
+
+
+def _simulate(weights, n_cards, n_reviews, seed=0):
+    """Generate a review log whose recalls follow the forgetting curve of ``weights``."""
+    rng = np.random.default_rng(seed)
+    p = fsrs_parameters(weights)
+    s = np.zeros(n_cards)
+    d = np.zeros(n_cards)
+    day = rng.integers(0, 30, n_cards)
+    ids, days, ratings = [], [], []
+    for k in range(n_reviews):
+        if k == 0:
+            t = np.zeros(n_cards)
+            g = rng.integers(1, 5, n_cards)
+        else:
+            t = np.rint(s * rng.uniform(0.0, 2.0, n_cards))
+            recalled = rng.random(n_cards) < (1 + p.factor * t / s) ** p.decay
+            g = np.where(recalled, rng.choice([2, 3, 3, 3, 4], n_cards), AGAIN)
+        day = day + t.astype(np.int64)
+        ids.append(np.arange(n_cards))
+        days.append(day)
+        ratings.append(g)
+        s, d, _ = fsrs_batch(g, s, d, t, parameters=p)
+    # Shuffle the rows: the log need not be sorted.
+    order = rng.permutation(n_cards * n_reviews)
+    return (
+        np.concatenate(ids)[order],
+        np.concatenate(days)[order] * DAY,
+        np.concatenate(ratings)[order],
+    )
+
+
+def _scalar_log_loss(card_ids, timestamps, ratings, weights):
+    p = fsrs_parameters(weights)
+    history: dict[int, list[tuple[int, int]]] = {}
+    rows = zip(card_ids.tolist(), timestamps.tolist(), ratings.tolist(), strict=True)
+    for card, ts, rating in sorted(rows, key=lambda row: row[:2]):
+        history.setdefault(card, []).append((ts // DAY, rating))
+    total, count = 0.0, 0
+    for reviews in history.values():
+        s = d = 0.0
+        last = reviews[0][0]
+        for day, rating in reviews:
+            elapsed = day - last
+            if s and elapsed:
+                r = _forgetting_curve(elapsed, s, p.decay, p.factor)
+                total -= math.log(r) if rating > AGAIN else math.log(1 - r)
+                count += 1
+            s, d, _ = fsrs_unchecked(rating, s, d, elapsed, p)
+            last = day
+    return total / count
+
+
+@pytest.mark.parametrize("weights", [DEFAULT_WEIGHTS, TRUE_WEIGHTS])
+def test_log_loss_matches_scalar_replay(weights):
+    card_ids, timestamps, ratings = _simulate(TRUE_WEIGHTS, 40, 8)
+    # Drop some rows so cards have histories of different lengths.
+    keep = np.random.default_rng(1).random(len(card_ids)) < 0.7
+    args = card_ids[keep], timestamps[keep], ratings[keep]
+    assert fsrs_log_loss(*args, weights=weights) == pytest.approx(
+        _scalar_log_loss(*args, weights), rel=1e-9
+    )
+
+
+def test_log_loss_accepts_datetime64():
+    card_ids, timestamps, ratings = _simulate(DEFAULT_WEIGHTS, 20, 5)
+    as_datetime64 = timestamps.astype("datetime64[s]")
+    assert fsrs_log_loss(card_ids, as_datetime64, ratings) == fsrs_log_loss(
+        card_ids, timestamps, ratings
+    )
+
+
+def test_fit_reduces_log_loss():
+    card_ids, timestamps, ratings = _simulate(TRUE_WEIGHTS, 2000, 12)
+    weights = fit_fsrs_weights(card_ids, timestamps, ratings, epochs=3, batch_size=256)
+    assert len(weights) == len(DEFAULT_WEIGHTS)
+    assert all(isinstance(x, float) for x in weights)
+    fitted = fsrs_log_loss(card_ids, timestamps, ratings, weights)
+    initial = fsrs_log_loss(card_ids, timestamps, ratings)
+    truth = fsrs_log_loss(card_ids, timestamps, ratings, TRUE_WEIGHTS)
+    assert fitted < initial
+    assert fitted - truth < (initial - truth) / 2
+    assert all(
+        lo <= x <= hi
+        for x, lo, hi in zip(weights, WEIGHT_LOWER_BOUNDS, WEIGHT_UPPER_BOUNDS, strict=True)
+    )
+    FSRSScheduler(weights=weights)
+
+
+def test_fit_is_deterministic_for_a_seed():
+    card_ids, timestamps, ratings = _simulate(DEFAULT_WEIGHTS, 100, 6)
+    first = fit_fsrs_weights(card_ids, timestamps, ratings, epochs=1, batch_size=16)
+    second = fit_fsrs_weights(card_ids, timestamps, ratings, epochs=1, batch_size=16)
+    assert first == second
+
+
+def test_fit_zero_epochs_returns_initial_weights():
+    card_ids, timestamps, ratings = _simulate(DEFAULT_WEIGHTS, 10, 3)
+    assert fit_fsrs_weights(card_ids, timestamps, ratings, epochs=0) == DEFAULT_WEIGHTS
+
+
+@pytest.mark.parametrize(
+    "card_ids, timestamps, ratings, match",
+    [
+        ([0, 0], [0, DAY], [3, 5], "ratings must be between"),
+        ([0, 0], [0], [3, 3], "same length"),
+        ([0, 1], [0, DAY], [3, 3], "no reviews"),
+        ([0, 0], [0, 60], [3, 3], "no reviews"),
+        ([], [], [], "no reviews"),
+    ],
+)
+def test_invalid_logs_raise(card_ids, timestamps, ratings, match):
+    with pytest.raises(ValueError, match=match):
+        fit_fsrs_weights(card_ids, timestamps, ratings)
+    with pytest.raises(ValueError, match=match):
+        fsrs_log_loss(card_ids, timestamps, ratings)
+
+
+@pytest.mark.parametrize(
+    "kwargs, match",
+    [
+        ({"initial_weights": (1.0,) * 20}, "21 elements"),
+        ({"batch_size": 0}, "batch_size"),
+        ({"epochs": -1}, "epochs"),
+    ],
+)
+def test_invalid_options_raise(kwargs, match):
+    with pytest.raises(ValueError, match=match):
+        fit_fsrs_weights([0, 0], [0, DAY], [3, 3], **kwargs)
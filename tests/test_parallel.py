@@ -0,0 +1,80 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from spacedreppy.deck import FSRSDeck, LeitnerDeck, SM2Deck
+from spacedreppy.optimizer import fit_fsrs_weights
+from spacedreppy.parallel import Shard, run_shards
+from spacedreppy.schedulers.fsrs import DEFAULT_WEIGHTS
+
+DAY = 86400
+
+
+def _reviews(low, high, size, seed):
+    rng = np.random.default_rng(seed)
+    return [(np.arange(size), day, rng.integers(low, high + 1, size)) for day in (0, 3, 10, 30)]
+
+
+def _assert_same_columns(a, b):
+    for name in a.columns:
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name), err_msg=name)
+
+
+@pytest.mark.parametrize("start_method", ["fork", "spawn"])
+def test_run_shards_matches_sequential_reviews(start_method):
+    shards = [
+        Shard(FSRSDeck(200), _reviews(1, 4, 200, 0)),
+        Shard(SM2Deck(50), _reviews(0, 5, 50, 1)),
+        Shard(LeitnerDeck(300, intervals=[1, 4, 9]), _reviews(0, 1, 300, 2)),
+        Shard(SM2Deck(0)),
+    ]
+    expected = [FSRSDeck(200), SM2Deck(50), LeitnerDeck(300, intervals=[1, 4, 9]), SM2Deck(0)]
+    for deck, shard in zip(expected, shards, strict=True):
+        for batch in shard.reviews:
+            deck.review(*batch)
+
+    results = run_shards(shards, processes=2, mp_context=multiprocessing.get_context(start_method))
+
+    assert results == [None] * len(shards)
+    for deck, shard in zip(expected, shards, strict=True):
+        _assert_same_columns(deck, shard.deck)
+
+
+def test_run_shards_fits_weights():
+    card_ids = np.repeat(np.arange(20), 4)
+    timestamps = np.tile([0, 2, 9, 30], 20) * DAY
+    ratings = np.tile([3, 3, 1, 3], 20)
+    log = (card_ids, timestamps, ratings)
+    deck = FSRSDeck(20, request_retention=0.85)
+    reviews = [(np.arange(20), 0, 3)]
+
+    (weights,) = run_shards([Shard(deck, reviews, fit_log=log)], fit_options={"epochs": 1})
+
+    assert weights == fit_fsrs_weights(*log, epochs=1)
+    assert weights != DEFAULT_WEIGHTS
+    assert deck.weights == weights
+    assert deck.request_retention == 0.85
+    expected = FSRSDeck(20, weights=weights, request_retention=0.85)
+    expected.review(*reviews[0])
+    _assert_same_columns(expected, deck)
+
+
+def test_run_shards_failure_keeps_completed_decks():
+    good, bad = SM2Deck(5), SM2Deck(5)
+    with pytest.raises(ValueError, match="quality"):
+        run_shards([Shard(bad, [(np.arange(5), 0, 9)]), Shard(good, [(np.arange(5), 0, 4)])])
+    assert (good.repetitions == 1).all()
+    assert (bad.repetitions == 0).all()
+
+
+@pytest.mark.parametrize(
+    "shards, match",
+    [
+        (lambda deck: [Shard(deck), Shard(deck)], "only one shard"),
+        (lambda deck: [Shard(deck, fit_log=([0], [0], [3]))], "FSRSDeck"),
+    ],
+)
+def test_run_shards_invalid(shards, match):
+    with pytest.raises(ValueError, match=match):
+        run_shards(shards(SM2Deck(1)))
@@ -0,0 +1,183 @@
+import io
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from spacedreppy.deck import FSRSDeck, LeitnerDeck, SM2Deck, deck_for
+from spacedreppy.epoch import to_epoch_day
+from spacedreppy.pipeline import (
+    INVALID_RESULT,
+    CardIndex,
+    LogChunk,
+    ReviewPipeline,
+    batched,
+    read_csv,
+    read_jsonl,
+    validate,
+)
+from spacedreppy.schedulers.fsrs import FSRSScheduler
+from spacedreppy.schedulers.leitner import LeitnerScheduler
+from spacedreppy.schedulers.sm2 import SM2Scheduler
+from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
+
+ROWS = [
+    ("b", "2025-01-01T08:00:00Z", 3),
+    ("a", "2025-01-01T09:00:00Z", 1),
+    ("b", "2025-01-01T18:00:00Z", 4),
+    ("a", "2025-01-03T09:00:00Z", 3),
+    ("c", "2025-01-04T09:00:00Z", 2),
+    ("b", "2025-01-09T20:00:00Z", 3),
+]
+
+
+def _schedulers(scheduler_cls, rows):
+    schedulers: dict[str, SpacedRepetitionScheduler] = {}
+    for card_id, timestamp, result in rows:
+        scheduler = schedulers.setdefault(card_id, scheduler_cls())
+        scheduler.compute_next_due_interval(datetime.fromisoformat(timestamp), int(result))
+    return schedulers
+
+
+def _final_states(chunks):
+    states = {}
+    for chunk in chunks:
+        for i, card_id in enumerate(chunk.card_ids):
+            states[card_id] = {name: column[i] for name, column in chunk.columns.items()}
+    return states
+
+
+@pytest.mark.parametrize(
+    "scheduler_cls, results",
+    [
+        (FSRSScheduler, (3, 1, 4, 3, 2, 3)),
+        (SM2Scheduler, (5, 1, 4, 3, 2, 5)),
+        (LeitnerScheduler, (1, 0, 1, 1, 0, 1)),
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 2, 100])
+def test_pipeline_matches_schedulers(scheduler_cls, results, chunk_size):
+    rows = [(c, t, r) for (c, t, _), r in zip(ROWS, results, strict=True)]
+    pipeline = ReviewPipeline(scheduler_cls(), chunk_size=chunk_size)
+    states = _final_states(pipeline.run(iter(rows)))
+    schedulers = _schedulers(scheduler_cls, rows)
+    assert states.keys() == schedulers.keys()
+    for card_id, scheduler in schedulers.items():
+        assert states[card_id]["interval"] == scheduler.interval
+        assert states[card_id]["due"] == to_epoch_day(scheduler.due_timestamp)
+        view = pipeline.deck[int(pipeline.index.rows([card_id])[0])]
+        assert view.due_timestamp is not None
+        assert scheduler.due_timestamp is not None
+        assert view.due_timestamp.date() == scheduler.due_timestamp.date()
+
+
+def test_pipeline_emits_touched_cards_per_chunk():
+    pipeline = ReviewPipeline(FSRSScheduler(), chunk_size=3)
+    chunks = list(pipeline.run(ROWS))
+    assert [sorted(chunk.card_ids) for chunk in chunks] == [["a", "b"], ["a", "b", "c"]]
+    assert set(chunks[0].columns) == set(FSRSDeck.columns)
+    assert len(pipeline.index) == 3
+
+
+def test_read_csv_and_jsonl_give_the_same_rows():
+    text = "rating,card_id,timestamp\n" + "".join(f"{r},{c},{t}\n" for c, t, r in ROWS)
+    csv_rows = list(read_csv(io.StringIO(text)))
+    assert csv_rows == [(c, t, str(r)) for c, t, r in ROWS]
+    jsonl = "\n".join(json.dumps({"card_id": c, "timestamp": t, "rating": r}) for c, t, r in ROWS)
+    assert list(read_jsonl(io.StringIO(jsonl + "\n\n"))) == ROWS
+    csv_states = _final_states(ReviewPipeline(FSRSScheduler()).run(csv_rows))
+    jsonl_states = _final_states(
+        ReviewPipeline(FSRSScheduler()).run(read_jsonl(io.StringIO(jsonl)))
+    )
+    assert csv_states.keys() == jsonl_states.keys()
+    for card_id, state in csv_states.items():
+        assert state == jsonl_states[card_id]
+
+
+def test_read_csv_from_path(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text("id;when;grade\nx;1735689600;3\n")
+    rows = read_csv(
+        path, card_column="id", timestamp_column="when", result_column="grade", delimiter=";"
+    )
+    (chunk,) = batched(rows)
+    assert chunk.card_ids.tolist() == ["x"]
+    assert chunk.attempted_at.tolist() == [20089]
+    assert chunk.results.tolist() == [3]
+
+
+def test_read_csv_missing_column():
+    with pytest.raises(ValueError, match="lacks a required column"):
+        list(read_csv(io.StringIO("card_id,rating\n")))
+
+
+def test_read_is_lazy():
+    lines = iter(["card_id,timestamp,rating\n", "a,0,3\n"])
+    rows = read_csv(lines)
+    assert next(rows) == ("a", "0", "3")
+
+
+def test_validate_raise_and_skip():
+    chunk = LogChunk(np.array(["a", "b", "c"]), np.array([1, 2, 3]), np.array([3, 9, 1]))
+    with pytest.raises(ValueError, match="card 'b'"):
+        list(validate([chunk], FSRSDeck.result_range))
+    (kept,) = validate([chunk], FSRSDeck.result_range, errors="skip")
+    assert kept.card_ids.tolist() == ["a", "c"]
+
+
+def test_pipeline_skips_invalid_rows():
+    pipeline = ReviewPipeline(LeitnerScheduler(), errors="skip")
+    states = _final_states(pipeline.run([("a", 0, 1), ("b", 0, 2), ("a", 86400, 1)]))
+    assert list(states) == ["a"]
+    assert states["a"]["box"] == 2
+
+
+@pytest.mark.parametrize("bad", ["good", "", "2.5", 2.5, None])
+def test_unparsable_results_are_invalid_rows(bad):
+    rows = [("a", 0, "3"), ("b", 0, bad), ("a", 86400, 4.0)]
+    with pytest.raises(ValueError, match="card 'b': result is not an integer"):
+        list(ReviewPipeline(FSRSScheduler()).run(rows))
+    states = _final_states(ReviewPipeline(FSRSScheduler(), errors="skip").run(rows))
+    assert list(states) == ["a"]
+    (chunk,) = batched(rows)
+    assert chunk.results.tolist() == [3, INVALID_RESULT, 4]
+
+
+def test_mixed_card_id_types_are_rejected():
+    with pytest.raises(ValueError, match="card ids"):
+        list(batched([(1, 0, 3), ("1", 0, 3)]))
+    (chunk,) = batched([(1, 0, 3), (2, 0, 3)])
+    assert chunk.card_ids.tolist() == [1, 2]
+
+
+def test_card_index_assigns_rows_in_first_appearance_order():
+    index = CardIndex()
+    assert index.rows(["b", "a", "b"]).tolist() == [1, 0, 1]
+    assert index.rows(["c", "a"]).tolist() == [2, 0]
+    assert "c" in index
+    assert index.ids([2, 0]).tolist() == ["c", "a"]
+
+
+@pytest.mark.parametrize(
+    "scheduler, deck_type",
+    [
+        (FSRSScheduler(request_retention=0.8, maximum_interval=100), FSRSDeck),
+        (SM2Scheduler(), SM2Deck),
+        (LeitnerScheduler(intervals=[2, 4]), LeitnerDeck),
+    ],
+)
+def test_deck_for(scheduler, deck_type):
+    deck = deck_for(scheduler, size=2)
+    assert type(deck) is deck_type
+    assert len(deck) == 2
+    if isinstance(deck, FSRSDeck):
+        assert deck.request_retention == 0.8
+        assert deck.maximum_interval == 100
+    if isinstance(deck, LeitnerDeck):
+        assert deck.intervals == [2, 4]
+
+
+def test_deck_for_unknown_scheduler():
+    with pytest.raises(TypeError, match="no deck type"):
+        deck_for(object())  # type: ignore[arg-type]
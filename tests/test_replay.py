@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from spacedreppy.deck import FSRSDeck, LeitnerDeck, SM2Deck
+from spacedreppy.load_balancer import LoadBalancer
+from spacedreppy.replay import ReplayEngine, replay_reviews
+from spacedreppy.retrievability import RetrievabilityCache, retrievability
+
+
+def _log(n_cards, n_rows, low, high, seed=0):
+    """Return a log sorted by day, with several reviews of a card on some days."""
+    rng = np.random.default_rng(seed)
+    days = np.sort(rng.integers(20000, 20060, n_rows))
+    return rng.integers(0, n_cards, n_rows), days, rng.integers(low, high + 1, n_rows)
+
+
+def _one_by_one(deck, cards, days, results):
+    for card, day, result in zip(cards.tolist(), days.tolist(), results.tolist(), strict=True):
+        deck.review_one(card, day, result)
+    return deck
+
+
+def _assert_same_columns(a, b):
+    for name in a.columns:
+        np.testing.assert_allclose(getattr(a, name), getattr(b, name), rtol=1e-12, err_msg=name)
+
+
+@pytest.mark.parametrize(
+    "make_deck, low, high",
+    [(lambda: FSRSDeck(30), 1, 4), (lambda: SM2Deck(30), 0, 5), (lambda: LeitnerDeck(30), 0, 1)],
+)
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+def test_replay_reviews_matches_one_by_one(make_deck, low, high, chunk_size):
+    cards, days, results = _log(30, 400, low, high)
+    deck = make_deck()
+    replay_reviews(deck, cards, days, results, chunk_size=chunk_size)
+    _assert_same_columns(_one_by_one(make_deck(), cards, days, results), deck)
+
+
+def test_engine_feeds_in_pieces_and_checkpoints():
+    log = _log(30, 400, 1, 4)
+    engine = ReplayEngine(FSRSDeck(30), checkpoint_interval=100, max_checkpoints=2, chunk_size=33)
+    for start in range(0, 400, 150):
+        engine.feed(*(column[start : start + 150] for column in log))
+    assert engine.offset == 400
+    assert engine.checkpoints == [200, 300, 400]
+    _assert_same_columns(_one_by_one(FSRSDeck(30), *log), engine.deck)
+
+
+@pytest.mark.parametrize("offset, restored", [(400, 400), (399, 300), (250, 200), (100, 100)])
+def test_engine_rewind_and_replay_tail(offset, restored):
+    log = _log(30, 400, 0, 5)
+    engine = ReplayEngine(SM2Deck(30), checkpoint_interval=100, chunk_size=64)
+    engine.feed(*log)
+
+    assert engine.rewind(offset) == restored
+    assert engine.offset == restored
+    _assert_same_columns(
+        _one_by_one(SM2Deck(30), *(column[:restored] for column in log)), engine.deck
+    )
+
+    engine.feed(*(column[restored:] for column in log))
+    _assert_same_columns(_one_by_one(SM2Deck(30), *log), engine.deck)
+
+
+def test_engine_rewind_past_dropped_checkpoint_raises():
+    engine = ReplayEngine(LeitnerDeck(30), checkpoint_interval=100, max_checkpoints=1)
+    engine.feed(*_log(30, 400, 0, 1))
+    assert engine.checkpoints == [300, 400]
+    with pytest.raises(ValueError, match="no checkpoint"):
+        engine.rewind(299)
+
+
+def test_engine_failed_feed_rewinds_to_latest_checkpoint():
+    cards, days, results = _log(30, 400, 1, 4)
+    results[250] = 7
+    engine = ReplayEngine(FSRSDeck(30), checkpoint_interval=100, chunk_size=64)
+    with pytest.raises(ValueError, match="ratings"):
+        engine.feed(cards, days, results)
+    assert engine.offset == 200
+    _assert_same_columns(
+        _one_by_one(FSRSDeck(30), cards[:200], days[:200], results[:200]), engine.deck
+    )
+
+
+def test_engine_rewind_invalidates_deck_observers():
+    deck = FSRSDeck(30)
+    engine = ReplayEngine(deck, checkpoint_interval=100)
+    engine.feed(*_log(30, 400, 1, 4))
+    cache, balancer = RetrievabilityCache(deck), LoadBalancer(deck)
+    cache.retrievability(20070)
+    balancer.load(20070)
+    version = deck.version
+
+    engine.rewind(250)
+    assert deck.version > version
+    np.testing.assert_array_equal(cache.retrievability(20070), retrievability(deck, 20070))
+    expected = [np.count_nonzero(deck.due == day) for day in range(20000, 20200)]
+    np.testing.assert_array_equal(balancer.loads(20000, 200), expected)
+
+
+def test_engine_follows_growing_deck():
+    cards, days, results = _log(30, 200, 0, 1)
+    deck = LeitnerDeck(10)
+    engine = ReplayEngine(deck, checkpoint_interval=50)
+    small = cards < 10
+    engine.feed(cards[small], days[small], results[small])
+    deck.resize(30)
+    engine.feed(cards[~small], days[~small], results[~small])
+    engine.rewind(0)
+    assert (deck.box == 0).all()
+
+
+def test_engine_rejects_out_of_range_cards():
+    engine = ReplayEngine(SM2Deck(3))
+    with pytest.raises(ValueError, match=r"cards must be in"):
+        engine.feed([0, 3], 0, 4)
+    assert engine.offset == 0
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from spacedreppy.deck import Deck, FSRSDeck, LeitnerDeck, SM2Deck
+from spacedreppy.epoch import from_epoch_day
+from spacedreppy.retrievability import RetrievabilityCache, retrievability
+from spacedreppy.schedulers.fsrs import _forgetting_curve, fsrs_parameters
+
+START_DAY = 20_089
+
+
+def _deck(deck: Deck) -> Deck:
+    deck.review(np.arange(4), START_DAY, deck.result_range[1])
+    deck.review(np.arange(2), START_DAY + 5, deck.result_range[1])
+    return deck
+
+
+def test_fsrs_deck_matches_scalar_curve() -> None:
+    deck = _deck(FSRSDeck(6, request_retention=0.8))
+    assert isinstance(deck, FSRSDeck)
+    day = START_DAY + 20
+    r = retrievability(deck, day)
+    p = deck.parameters
+    for card in range(4):
+        elapsed = day - int(deck.last_review[card])
+        expected = _forgetting_curve(elapsed, float(deck.stability[card]), p.decay, p.factor)
+        assert r[card] == pytest.approx(expected, rel=1e-12)
+    assert np.isnan(r[4:]).all()
+
+
+@pytest.mark.parametrize("deck", [SM2Deck(6), LeitnerDeck(6)], ids=["sm2", "leitner"])
+def test_other_decks_recall_90_percent_on_due_date(deck: Deck) -> None:
+    deck = _deck(deck)
+    for card in range(4):
+        r = retrievability(deck, int(deck.due[card]))
+        assert r[card] == pytest.approx(0.9)
+    assert np.isnan(retrievability(deck, START_DAY)[4:]).all()
+
+
+def test_retrievability_accepts_timestamps_and_decreases() -> None:
+    deck = _deck(FSRSDeck(6))
+    np.testing.assert_array_equal(
+        retrievability(deck, from_epoch_day(START_DAY + 9)), retrievability(deck, START_DAY + 9)
+    )
+    np.testing.assert_array_equal(retrievability(deck, START_DAY + 5)[:2], 1.0)
+    earlier, later = retrievability(deck, START_DAY + 10), retrievability(deck, START_DAY + 40)
+    assert (later[:4] < earlier[:4]).all()
+
+
+def test_cache_reuses_day_until_deck_changes() -> None:
+    deck = _deck(FSRSDeck(6))
+    cache = RetrievabilityCache(deck)
+    first = cache.retrievability(START_DAY + 10)
+    assert cache.retrievability(START_DAY + 10) is first
+    assert not first.flags.writeable
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    deck.review([2], START_DAY + 10, 3)
+    updated = cache.retrievability(START_DAY + 10)
+    assert updated is not first
+    assert updated[2] == 1.0
+    np.testing.assert_array_equal(updated, retrievability(deck, START_DAY + 10))
+
+    assert isinstance(deck, FSRSDeck)
+    deck.parameters = fsrs_parameters(request_retention=0.8)
+    assert cache.retrievability(START_DAY + 10) is not updated
+    assert cache.misses == 3
+
+
+def test_cache_keeps_recent_days() -> None:
+    cache = RetrievabilityCache(_deck(SM2Deck(6)), max_days=2)
+    first = cache.retrievability(START_DAY + 1)
+    cache.retrievability(START_DAY + 2)
+    cache.retrievability(START_DAY + 3)
+    assert cache.retrievability(START_DAY + 1) is not first
+    assert cache.misses == 4
+
+
+def test_cache_aggregates() -> None:
+    cache = RetrievabilityCache(_deck(FSRSDeck(6)))
+    day = START_DAY + 30
+    r = retrievability(cache.deck, day)
+    assert cache.mean(day) == pytest.approx(np.nanmean(r))
+    assert cache.count_below(1.0, day) == 4
+    assert cache.count_below(float(np.nanmin(r)), day) == 0
+    empty = RetrievabilityCache(FSRSDeck(3))
+    assert np.isnan(empty.mean(day))
+    assert empty.count_below(0.9, day) == 0
+
+
+def test_cache_invalid_max_days() -> None:
+    with pytest.raises(ValueError, match="max_days"):
+        RetrievabilityCache(SM2Deck(1), max_days=0)
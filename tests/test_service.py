@@ -0,0 +1,137 @@
+import asyncio
+import datetime
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from spacedreppy.deck import FSRSDeck, LeitnerDeck, SM2Deck
+from spacedreppy.epoch import from_epoch_day, to_epoch_day
+from spacedreppy.replay import replay_reviews
+from spacedreppy.service import ReviewService
+
+START_DAY = 20_089
+
+
+def _log(
+    n_cards: int, n_reviews: int, low: int, high: int, seed: int = 0
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    rng = np.random.default_rng(seed)
+    cards = rng.integers(0, n_cards, n_reviews)
+    days = START_DAY + np.sort(rng.integers(0, 60, n_reviews))
+    results = rng.integers(low, high + 1, n_reviews)
+    return cards, days, results
+
+
+@pytest.mark.parametrize("deck_type", [FSRSDeck, SM2Deck, LeitnerDeck])
+@pytest.mark.parametrize("max_batch_size", [1, 7, 4096])
+def test_concurrent_reviews_match_replay(deck_type, max_batch_size):
+    expected = deck_type(20)
+    cards, days, results = _log(20, 500, *expected.result_range)
+    replay_reviews(expected, cards, days, results)
+
+    deck = deck_type(20)
+
+    async def main():
+        async with ReviewService(deck, max_batch_size=max_batch_size) as service:
+            return await asyncio.gather(
+                *(
+                    service.review(int(c), from_epoch_day(int(d)), int(r))
+                    for c, d, r in zip(cards, days, results, strict=True)
+                )
+            ), service.stats()
+
+    replies, stats = asyncio.run(main())
+    for name in deck.columns:
+        np.testing.assert_array_equal(getattr(deck, name), getattr(expected, name))
+    last = {int(c): i for i, c in enumerate(cards)}
+    for card, i in last.items():
+        due, interval = replies[i]
+        assert to_epoch_day(due) == deck.due[card]
+        assert interval == datetime.timedelta(days=int(deck.interval[card]))
+    assert stats.reviews == 500
+    assert stats.batches == -(-500 // max_batch_size)
+    assert stats.mean_batch_size == 500 / stats.batches
+    assert 0 < stats.p50_latency <= stats.p99_latency <= stats.max_latency
+    assert stats.throughput > 0
+
+
+def test_reviews_of_one_card_apply_in_submission_order():
+    deck = SM2Deck(1)
+    expected = SM2Deck(1)
+    for quality in (5, 4, 1):
+        expected.review_one(0, START_DAY, quality)
+
+    async def main():
+        service = ReviewService(deck)
+        replies = await asyncio.gather(
+            *(service.review(0, from_epoch_day(START_DAY), quality) for quality in (5, 4, 1))
+        )
+        return replies, service.stats()
+
+    replies, stats = asyncio.run(main())
+    assert stats.batches == 1
+    assert [interval.days for _, interval in replies] == [1, 6, 1]
+    np.testing.assert_array_equal(deck.easiness, expected.easiness)
+
+
+def test_max_delay_coalesces_staggered_reviews():
+    deck = LeitnerDeck(10)
+
+    async def main():
+        service = ReviewService(deck, max_delay=0.05)
+
+        async def later(card: int) -> None:
+            await asyncio.sleep(0.001 * card)
+            await service.review(card, from_epoch_day(START_DAY), 1)
+
+        await asyncio.gather(*(later(card) for card in range(10)))
+        return service.stats()
+
+    stats = asyncio.run(main())
+    assert stats.batches == 1
+    assert deck.box.tolist() == [1] * 10
+
+
+def test_invalid_review_does_not_fail_others():
+    deck = FSRSDeck(2)
+
+    async def main():
+        service = ReviewService(deck)
+        return await asyncio.gather(
+            service.review(0, from_epoch_day(START_DAY), 3),
+            service.review(1, from_epoch_day(START_DAY), 5),
+            service.review(2, from_epoch_day(START_DAY), 3),
+            return_exceptions=True,
+        )
+
+    ok, bad_result, bad_card = asyncio.run(main())
+    assert isinstance(ok, tuple)
+    assert isinstance(bad_result, ValueError)
+    assert isinstance(bad_card, ValueError)
+    assert deck.due[0] != deck.due[1]
+
+
+def test_closed_service_rejects_reviews():
+    async def main():
+        service = ReviewService(SM2Deck(1))
+        await service.close()
+        await service.review(0, from_epoch_day(START_DAY), 5)
+
+    with pytest.raises(RuntimeError, match="closed"):
+        asyncio.run(main())
+
+
+def test_empty_stats():
+    stats = ReviewService(SM2Deck(1)).stats()
+    assert stats.reviews == stats.batches == 0
+    assert stats.throughput == stats.max_latency == 0.0
+
+
+@pytest.mark.parametrize(
+    "kwargs, match",
+    [({"max_batch_size": 0}, "max_batch_size"), ({"max_delay": -1.0}, "max_delay")],
+)
+def test_invalid_arguments(kwargs, match):
+    with pytest.raises(ValueError, match=match):
+        ReviewService(SM2Deck(1), **kwargs)
@@ -0,0 +1,144 @@
+import multiprocessing
+from typing import Any
+
+import numpy as np
+import pytest
+
+from spacedreppy.deck import UNSCHEDULED, Deck, FSRSDeck, LeitnerDeck, SM2Deck
+from spacedreppy.simulator import RetentionSearch, optimal_retention, simulate
+
+START_DAY = 20_089
+
+
+@pytest.fixture(
+    params=[lambda: FSRSDeck(200), lambda: SM2Deck(200), lambda: LeitnerDeck(200)],
+    ids=["fsrs", "sm2", "leitner"],
+)
+def deck(request: pytest.FixtureRequest) -> Deck:
+    deck: Deck = request.param()
+    return deck
+
+
+def test_simulation_counts(deck: Deck) -> None:
+    result = simulate(deck, START_DAY, 20, runs=3, new_cards_per_day=10)
+    assert result.reviews.shape == result.new_cards.shape == (3, 20)
+    np.testing.assert_array_equal(result.days, np.arange(START_DAY, START_DAY + 20))
+    np.testing.assert_array_equal(result.new_cards, 10)
+    assert (result.lapses <= result.reviews).all()
+    assert (result.backlog == 0).all()
+    assert result.reviews[:, 0].sum() == 0
+    assert result.reviews.sum() > 0
+    assert ((result.memorized > 0) & (result.memorized <= 200)).all()
+    summary = result.summary()
+    assert 0.5 < summary["retention"] < 1
+    assert summary["reviews_per_day"] > 10
+
+
+def test_simulation_leaves_deck_unchanged(deck: Deck) -> None:
+    deck.review(np.arange(50), START_DAY - 5, deck.result_range[1])
+    before = {name: getattr(deck, name).copy() for name in deck.columns}
+    simulate(deck, START_DAY, 10, runs=2)
+    for name in deck.columns:
+        np.testing.assert_array_equal(getattr(deck, name), before[name])
+
+
+def test_simulation_is_reproducible(deck: Deck) -> None:
+    a = simulate(deck, START_DAY, 20, runs=2, seed=1)
+    b = simulate(deck, START_DAY, 20, runs=2, seed=1)
+    np.testing.assert_array_equal(a.reviews, b.reviews)
+    np.testing.assert_array_equal(a.lapses, b.lapses)
+    np.testing.assert_array_equal(a.memorized, b.memorized)
+
+
+def test_review_limit_builds_backlog(deck: Deck) -> None:
+    result = simulate(deck, START_DAY, 40, runs=2, new_cards_per_day=None, review_limit=5)
+    np.testing.assert_array_equal(result.new_cards[:, 0], 200)
+    np.testing.assert_array_equal(result.new_cards[:, 1:], 0)
+    assert (result.reviews <= 5).all()
+    assert result.backlog[:, 1].min() > 0
+
+
+def test_recalled_cards_follow_the_deck_schedule() -> None:
+    intervals = [1, 2, 4, 8]
+    result = simulate(
+        LeitnerDeck(5, intervals=intervals),
+        START_DAY,
+        20,
+        new_cards_per_day=None,
+        first_ratings=(0, 0, 0, 1),
+        recall_ratings=(0, 0, 1),
+    )
+    # Until the first lapse, every review is Easy and moves the cards up a box.
+    lapses = np.flatnonzero(result.lapses[0])
+    days = lapses[0] if lapses.size else 20
+    expected = LeitnerDeck(5, intervals=intervals)
+    review_days = []
+    for day in range(START_DAY, START_DAY + days + 1):
+        if expected.due[0] == UNSCHEDULED or expected.due[0] <= day:
+            expected.review(np.arange(5), day, 1)
+            review_days.append(day - START_DAY)
+    reviewed = np.flatnonzero(result.reviews[0, : days + 1] + result.new_cards[0, : days + 1])
+    np.testing.assert_array_equal(reviewed, review_days)
+
+
+def test_simulation_of_empty_deck() -> None:
+    result = simulate(SM2Deck(0), START_DAY, 5, runs=2)
+    assert result.reviews.sum() == 0
+    np.testing.assert_array_equal(result.memorized, [0, 0])
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "match"),
+    [
+        ({"days": -1}, "days"),
+        ({"runs": 0}, "runs"),
+        ({"new_cards_per_day": -1}, "new_cards_per_day"),
+        ({"review_limit": -1}, "review_limit"),
+        ({"first_ratings": (0.5, 0.5)}, "4 probabilities"),
+        ({"recall_ratings": (0.5, 0.5, 0.5)}, "sum to 1"),
+        ({"recall_ratings": (1.5, -0.5, 0)}, "non-negative"),
+    ],
+)
+def test_invalid_arguments(kwargs: dict[str, object], match: str) -> None:
+    arguments: dict[str, object] = {"days": 5} | kwargs
+    with pytest.raises(ValueError, match=match):
+        simulate(SM2Deck(5), START_DAY, **arguments)  # type: ignore[arg-type]
+
+
+def _search(retentions: list[float], **kwargs: Any) -> RetentionSearch:
+    return optimal_retention(
+        retentions=retentions, deck_size=300, days=60, new_cards_per_day=10, runs=2, **kwargs
+    )
+
+
+def test_optimal_retention_picks_cheapest_candidate() -> None:
+    search = _search([0.75, 0.85, 0.95], processes=1)
+    np.testing.assert_array_equal(search.retentions, [0.75, 0.85, 0.95])
+    assert search.retention == search.retentions[np.argmin(search.costs)]
+    assert (search.costs > 0).all()
+    # Higher retentions review more often and keep more cards in memory.
+    assert search.costs[0] < search.costs[-1]
+    assert search.memorized[0] < search.memorized[-1]
+
+
+@pytest.mark.parametrize("start_method", ["fork", "spawn"])
+def test_optimal_retention_in_parallel_matches_sequential(start_method: str) -> None:
+    sequential = _search([0.8, 0.9], processes=1)
+    parallel = _search(
+        [0.8, 0.9], processes=2, mp_context=multiprocessing.get_context(start_method)
+    )
+    np.testing.assert_array_equal(parallel.costs, sequential.costs)
+    assert parallel.retention == sequential.retention
+
+
+def test_forget_cost_raises_optimal_retention() -> None:
+    retentions = [0.7, 0.8, 0.9, 0.95]
+    cheap = _search(retentions, forget_cost=0, processes=1)
+    costly = _search(retentions, forget_cost=1000, processes=1)
+    assert cheap.retention < costly.retention
+
+
+@pytest.mark.parametrize("retentions", [[], [0.9, 1.0], [0.0]])
+def test_optimal_retention_invalid_candidates(retentions: list[float]) -> None:
+    with pytest.raises(ValueError, match="retentions"):
+        _search(retentions, processes=1)
@@ -1,8 +1,9 @@
 import datetime
 
+import numpy as np
 import pytest
 
-from spacedreppy.schedulers.sm2 import SM2Scheduler, sm2
+from spacedreppy.schedulers.sm2 import SM2Scheduler, sm2, sm2_batch, sm2_unchecked
 from spacedreppy.schedulers.spaced_repetition_scheduler import SpacedRepetitionScheduler
 
 
@@ -204,3 +205,80 @@ def test_sm2_easiness_floor():
 
     _, _, easiness = sm2(quality=0, interval=1, repetitions=1, easiness=1.4)
     assert easiness >= 1.3
+
+
+# --- sm2_batch tests ---
+
+
+def test_sm2_batch_return_types():
+    interval, repetitions, easiness = sm2_batch(
+        quality=[3], interval=[2], repetitions=[2], easiness=[2]
+    )
+    assert interval.dtype == np.int64
+    assert repetitions.dtype == np.int64
+    assert easiness.dtype == np.float64
+
+
+def test_sm2_batch_matches_scalar():
+    rng = np.random.default_rng(0)
+    n = 500
+    interval = np.zeros(n, dtype=np.int64)
+    repetitions = np.zeros(n, dtype=np.int64)
+    easiness = np.full(n, 2.5)
+    expected = [(0, 0, 2.5)] * n
+
+    for _ in range(6):
+        quality = rng.integers(0, 6, n)
+        interval, repetitions, easiness = sm2_batch(quality, interval, repetitions, easiness)
+        expected = [sm2(int(q), *state) for q, state in zip(quality, expected, strict=True)]
+        assert interval.tolist() == [e[0] for e in expected]
+        assert repetitions.tolist() == [e[1] for e in expected]
+        assert easiness.tolist() == [e[2] for e in expected]
+
+
+def test_sm2_batch_empty():
+    interval, repetitions, easiness = sm2_batch([], [], [], [])
+    assert interval.shape == repetitions.shape == easiness.shape == (0,)
+
+
+@pytest.mark.parametrize(
+    "quality, interval, repetitions, easiness",
+    [
+        (-1, 0, 0, 2.5),
+        (6, 0, 0, 2.5),
+        (3, -1, 0, 2.5),
+        (3, 0, -1, 2.5),
+        (3, 0, 0, -0.1),
+    ],
+)
+def test_sm2_batch_invalid_inputs(quality, interval, repetitions, easiness):
+    with pytest.raises(ValueError):
+        sm2_batch(
+            quality=[3, quality],
+            interval=[0, interval],
+            repetitions=[0, repetitions],
+            easiness=[2.5, easiness],
+        )
+
+
+# --- unchecked fast path tests ---
+
+
+@pytest.mark.parametrize(
+    "quality, interval, repetitions, easiness",
+    [(0, 0, 0, 2.5), (3, 1, 1, 2.5), (5, 6, 2, 2.6), (4, 15, 3, 1.3)],
+)
+def test_sm2_unchecked_matches_sm2(quality, interval, repetitions, easiness):
+    assert sm2_unchecked(quality, interval, repetitions, easiness) == sm2(
+        quality, interval, repetitions, easiness
+    )
+
+
+def test_sm2_scheduler_without_validation():
+    scheduler = SM2Scheduler(validate=False)
+    attempted_at = datetime.datetime(year=2021, month=10, day=13)
+    for quality in (5, 4, 5):
+        scheduler.compute_next_due_interval(attempted_at=attempted_at, result=quality)
+    assert scheduler.interval == 16
+    # Out-of-range input is not rejected.
+    scheduler.compute_next_due_interval(attempted_at=attempted_at, result=6)
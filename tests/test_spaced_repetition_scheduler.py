@@ -0,0 +1,331 @@
+import base64
+import copy
+import datetime
+import pickle
+from collections.abc import Callable
+
+import pytest
+
+from spacedreppy.due_index import DueIndex
+from spacedreppy.epoch import from_epoch_day, to_epoch_day
+from spacedreppy.schedulers import spaced_repetition_scheduler
+from spacedreppy.schedulers.fsrs import GOOD, FSRSScheduler
+from spacedreppy.schedulers.leitner import LeitnerScheduler
+from spacedreppy.schedulers.sm2 import SM2Scheduler
+from spacedreppy.schedulers.spaced_repetition_scheduler import (
+    SpacedRepetitionScheduler,
+    pack_timestamp,
+    unpack_timestamp,
+)
+
+ATTEMPTED_AT = datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC)
+ATTEMPTED_DAY = to_epoch_day(ATTEMPTED_AT)
+
+ConcreteScheduler = FSRSScheduler | SM2Scheduler | LeitnerScheduler
+
+# Schedulers pickled by the original dict-based classes, each after one review at ATTEMPTED_AT.
+BASELINE_PICKLES: dict[type[ConcreteScheduler], tuple[str, int]] = {
+    FSRSScheduler: (
+        "gASVFAIAAAAAAACMG3NwYWNlZHJlcHB5LnNjaGVkdWxlcnMuZnNyc5SMDUZTUlNTY2hlZHVsZXKUk5QpgZR9"
+        "lCiMCGludGVydmFslEsCjAtpbnRlcnZhbF90ZJSMCGRhdGV0aW1llIwJdGltZWRlbHRhlJOUSwJLAEsAh5RS"
+        "lIwNZHVlX3RpbWVzdGFtcJRoB4wIZGF0ZXRpbWWUk5RDCgfpAQMAAAAAAACUaAeMCHRpbWV6b25llJOUaAlL"
+        "AEsASwCHlFKUhZRSlIaUUpSMCXN0YWJpbGl0eZRHQAJztkWhysGMCmRpZmZpY3VsdHmUR0AA8eB+lTGajAd3"
+        "ZWlnaHRzlChHP8si0OVgQYlHP/SwiaAnUlRHQAJztkWhysFHQCCXWOIZZSxHQBmnOB19v0hHP+qrNnoPkJdH"
+        "QAgnuy/sVtZHP1BiTdLxqfxHP/30h/y5I6NHP8VTJhfBvaVHP+l41P3ztkZHP/e8an752yNHP69v0h/y5I9H"
+        "P9DTWoWHk95HP/pfb9If8uVHP+M+qzZ6D5FHP/33Zf2K2rpHP+FcKPXCj1xHP7dY4hllK9RHP7DYRNATqSpH"
+        "P8O801qFh5R0lIwRcmVxdWVzdF9yZXRlbnRpb26URz/szMzMzMzNjBBtYXhpbXVtX2ludGVydmFslE2UjowO"
+        "bGFzdF9yZXZpZXdfYXSUaA5DCgfpAQEAAAAAAACUaBWGlFKUdWIu",
+        GOOD,
+    ),
+    SM2Scheduler: (
+        "gASV6AAAAAAAAACMGnNwYWNlZHJlcHB5LnNjaGVkdWxlcnMuc20ylIwMU00yU2NoZWR1bGVylJOUKYGUfZQo"
+        "jAhpbnRlcnZhbJRLAYwLaW50ZXJ2YWxfdGSUjAhkYXRldGltZZSMCXRpbWVkZWx0YZSTlEsBSwBLAIeUUpSM"
+        "DWR1ZV90aW1lc3RhbXCUaAeMCGRhdGV0aW1llJOUQwoH6QECAAAAAAAAlGgHjAh0aW1lem9uZZSTlGgJSwBL"
+        "AEsAh5RSlIWUUpSGlFKUjAhlYXNpbmVzc5RHQAQAAAAAAACMC3JlcGV0aXRpb25zlEsBdWIu",
+        4,
+    ),
+    LeitnerScheduler: (
+        "gASVBAEAAAAAAACMHnNwYWNlZHJlcHB5LnNjaGVkdWxlcnMubGVpdG5lcpSMEExlaXRuZXJTY2hlZHVsZXKU"
+        "k5QpgZR9lCiMCGludGVydmFslEsDjAtpbnRlcnZhbF90ZJSMCGRhdGV0aW1llIwJdGltZWRlbHRhlJOUSwNL"
+        "AEsAh5RSlIwNZHVlX3RpbWVzdGFtcJRoB4wIZGF0ZXRpbWWUk5RDCgfpAQQAAAAAAACUaAeMCHRpbWV6b25l"
+        "lJOUaAlLAEsASwCHlFKUhZRSlIaUUpSMCWludGVydmFsc5RdlChLAUsDSwdLDkseZYwJbnVtX2JveGVzlEsF"
+        "jAtjdXJyZW50X2JveJRLAXViLg==",
+        1,
+    ),
+}
+
+
+@pytest.fixture(
+    params=[(FSRSScheduler, GOOD), (SM2Scheduler, 4), (LeitnerScheduler, 1)],
+    ids=["fsrs", "sm2", "leitner"],
+)
+def reviewed(request: pytest.FixtureRequest) -> SpacedRepetitionScheduler:
+    cls, result = request.param
+    scheduler: SpacedRepetitionScheduler = cls()
+    scheduler.compute_next_due_interval(attempted_at=ATTEMPTED_AT, result=result)
+    return scheduler
+
+
+@pytest.fixture(
+    params=[(FSRSScheduler, GOOD), (SM2Scheduler, 4), (LeitnerScheduler, 1)],
+    ids=["fsrs", "sm2", "leitner"],
+)
+def reviewed_by_day(request: pytest.FixtureRequest) -> SpacedRepetitionScheduler:
+    cls, result = request.param
+    scheduler: SpacedRepetitionScheduler = cls()
+    scheduler.compute_next_due_day(ATTEMPTED_DAY, result)
+    return scheduler
+
+
+def test_schedulers_have_no_instance_dict(reviewed: SpacedRepetitionScheduler) -> None:
+    assert not hasattr(reviewed, "__dict__")
+    with pytest.raises(AttributeError):
+        reviewed.unknown_attribute = 1  # type: ignore[attr-defined]
+
+
+@pytest.mark.parametrize(
+    "clone",
+    [
+        lambda s: pickle.loads(pickle.dumps(s)),
+        copy.copy,
+        copy.deepcopy,
+    ],
+    ids=["pickle", "copy", "deepcopy"],
+)
+def test_scheduler_clone_keeps_state(
+    reviewed: SpacedRepetitionScheduler,
+    clone: Callable[[SpacedRepetitionScheduler], SpacedRepetitionScheduler],
+) -> None:
+    clone_ = clone(reviewed)
+    assert type(clone_) is type(reviewed)
+    assert clone_.__getstate__() == reviewed.__getstate__()
+    assert clone_.due_timestamp == reviewed.due_timestamp
+    assert clone_.interval_td == reviewed.interval_td
+
+
+def test_scheduler_clone_drops_due_change_hook(reviewed: SpacedRepetitionScheduler) -> None:
+    index: DueIndex[int] = DueIndex()
+    index.track(1, reviewed)
+    clone = pickle.loads(pickle.dumps(reviewed))
+    assert clone.on_due_change is None
+    assert copy.copy(reviewed).on_due_change is None
+    assert reviewed.on_due_change is not None
+
+
+def test_unslotted_subclass_state_is_kept():
+    class TaggedScheduler(SM2Scheduler):
+        def __init__(self) -> None:
+            super().__init__()
+            self.tag = "deck-1"
+
+    scheduler = TaggedScheduler()
+    clone = copy.deepcopy(scheduler)
+    assert clone.tag == "deck-1"
+    assert clone.easiness == scheduler.easiness
+
+
+def _baseline(
+    cls: type[ConcreteScheduler],
+) -> tuple[SpacedRepetitionScheduler, SpacedRepetitionScheduler, int]:
+    """Return a baseline pickle of ``cls`` loaded, the same scheduler built now, and the result."""
+    data, result = BASELINE_PICKLES[cls]
+    expected = cls()
+    expected.compute_next_due_interval(attempted_at=ATTEMPTED_AT, result=result)
+    return pickle.loads(base64.b64decode(data)), expected, result
+
+
+@pytest.mark.parametrize("cls", list(BASELINE_PICKLES), ids=["fsrs", "sm2", "leitner"])
+def test_baseline_pickle_loads(cls: type[ConcreteScheduler]) -> None:
+    loaded, expected, _ = _baseline(cls)
+    assert type(loaded) is cls
+    assert loaded.on_due_change is None
+    assert loaded.due_timestamp == expected.due_timestamp
+    assert loaded.due_day == expected.due_day
+    assert loaded.interval_td == expected.interval_td
+    assert loaded.validate is True
+    for name, value in expected.__getstate__().items():
+        assert getattr(loaded, name) == value, name
+
+
+def test_baseline_fsrs_pickle_shares_parameters() -> None:
+    loaded, expected, _ = _baseline(FSRSScheduler)
+    assert isinstance(loaded, FSRSScheduler) and isinstance(expected, FSRSScheduler)
+    assert loaded.parameters is expected.parameters
+    assert loaded.last_review_day == ATTEMPTED_DAY
+
+
+@pytest.mark.parametrize(
+    "timestamp",
+    [
+        None,
+        datetime.datetime(2025, 1, 1, 13, 30, 0, 123456),
+        datetime.datetime(1969, 12, 31, 23, 59, tzinfo=datetime.UTC),
+        datetime.datetime(2025, 1, 1, 8, tzinfo=datetime.timezone(datetime.timedelta(hours=-5))),
+    ],
+    ids=["none", "naive", "utc", "offset"],
+)
+def test_timestamp_round_trip(timestamp: datetime.datetime | None) -> None:
+    restored = unpack_timestamp(*pack_timestamp(timestamp))
+    assert restored == timestamp
+    if timestamp is not None:
+        assert restored is not None
+        assert restored.utcoffset() == timestamp.utcoffset()
+
+
+@pytest.mark.parametrize("via_base_class", [False, True])
+def test_to_bytes_round_trip(reviewed: SpacedRepetitionScheduler, via_base_class: bool) -> None:
+    cls = SpacedRepetitionScheduler if via_base_class else type(reviewed)
+    restored = cls.from_bytes(reviewed.to_bytes())
+    assert type(restored) is type(reviewed)
+    assert restored.__getstate__() == reviewed.__getstate__()
+    assert restored.on_due_change is None
+
+
+@pytest.mark.parametrize(
+    "scheduler",
+    [FSRSScheduler(), SM2Scheduler(), LeitnerScheduler()],
+    ids=["fsrs", "sm2", "leitner"],
+)
+def test_to_bytes_round_trip_new_card(scheduler: SpacedRepetitionScheduler) -> None:
+    restored = type(scheduler).from_bytes(scheduler.to_bytes())
+    assert restored.__getstate__() == scheduler.__getstate__()
+
+
+def test_to_bytes_is_smaller_than_pickle(reviewed: SpacedRepetitionScheduler) -> None:
+    assert len(reviewed.to_bytes()) < len(pickle.dumps(reviewed)) / 2
+
+
+def test_tagged_scheduler_without_record_format(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(spaced_repetition_scheduler, "_SCHEDULER_TYPES", {})
+
+    class TaggedScheduler(SpacedRepetitionScheduler):
+        _type_tag = 200
+
+        def _compute_next_due_interval(
+            self, attempted_at: datetime.datetime, result: int
+        ) -> tuple[datetime.datetime, datetime.timedelta]:
+            return attempted_at, datetime.timedelta()
+
+    with pytest.raises(TypeError, match="TaggedScheduler has no binary record format"):
+        TaggedScheduler(interval=0).to_bytes()
+    record = bytes([200]) + SM2Scheduler().to_bytes()[1:]
+    with pytest.raises(TypeError, match="TaggedScheduler has no binary record format"):
+        SpacedRepetitionScheduler.from_bytes(record)
+
+
+def test_from_bytes_wrong_type() -> None:
+    with pytest.raises(ValueError, match="not a LeitnerScheduler"):
+        LeitnerScheduler.from_bytes(SM2Scheduler().to_bytes())
+
+
+@pytest.mark.parametrize(
+    "corrupt",
+    [
+        lambda data: data[:-1],
+        lambda data: data[:3],
+        lambda data: data + b"\0",
+        lambda data: b"\xff" + data[1:],
+    ],
+    ids=["truncated-state", "truncated-header", "trailing", "unknown-tag"],
+)
+def test_from_bytes_malformed(
+    reviewed: SpacedRepetitionScheduler, corrupt: Callable[[bytes], bytes]
+) -> None:
+    with pytest.raises(ValueError):
+        SpacedRepetitionScheduler.from_bytes(corrupt(reviewed.to_bytes()))
+
+
+def test_from_bytes_rejects_invalid_leitner_box() -> None:
+    scheduler = LeitnerScheduler(intervals=[1, 2])
+    scheduler.current_box = 5
+    with pytest.raises(ValueError):
+        LeitnerScheduler.from_bytes(scheduler.to_bytes())
+
+
+@pytest.mark.parametrize(
+    ("cls", "results"),
+    [
+        (FSRSScheduler, [3, 3, 1, 4, 2]),
+        (SM2Scheduler, [4, 5, 1, 3, 4]),
+        (LeitnerScheduler, [1, 1, 0, 1, 1]),
+    ],
+    ids=["fsrs", "sm2", "leitner"],
+)
+def test_day_reviews_match_timestamp_reviews(
+    cls: type[SpacedRepetitionScheduler], results: list[int]
+) -> None:
+    by_day, by_timestamp = cls(), cls()  # type: ignore[call-arg]
+    for offset, result in zip([0, 0, 3, 10, 40], results, strict=True):
+        day = ATTEMPTED_DAY + offset
+        due_day, interval = by_day.compute_next_due_day(day, result)
+        due, interval_td = by_timestamp.compute_next_due_interval(from_epoch_day(day), result)
+        assert (from_epoch_day(due_day), datetime.timedelta(days=interval)) == (due, interval_td)
+    assert by_day.due_timestamp == by_timestamp.due_timestamp
+    assert by_day.interval_td == by_timestamp.interval_td
+
+
+def test_day_reviews_build_datetimes_on_demand(reviewed_by_day: SpacedRepetitionScheduler) -> None:
+    due_day = reviewed_by_day.due_day
+    assert isinstance(due_day, int)
+    assert reviewed_by_day._due_timestamp is None
+    assert reviewed_by_day.due_timestamp == from_epoch_day(due_day)
+    assert reviewed_by_day.due_timestamp is reviewed_by_day.due_timestamp
+    assert reviewed_by_day.interval_td == datetime.timedelta(days=reviewed_by_day.interval)
+
+
+def test_fsrs_day_reviews_keep_last_review_as_day() -> None:
+    scheduler = FSRSScheduler()
+    scheduler.compute_next_due_day(ATTEMPTED_DAY, GOOD)
+    assert scheduler._last_review_at is None
+    assert scheduler.last_review_day == ATTEMPTED_DAY
+    assert scheduler.last_review_at == ATTEMPTED_AT
+
+
+def test_mixed_reviews_continue_from_due_date() -> None:
+    scheduler = SM2Scheduler()
+    due, _ = scheduler.compute_next_due_interval(ATTEMPTED_AT, 4)
+    due_day, interval = scheduler.compute_next_due_day(to_epoch_day(due), 4)
+    assert due_day == to_epoch_day(due) + interval
+    due, interval_td = scheduler.compute_next_due_interval(from_epoch_day(due_day), 4)
+    assert due == from_epoch_day(due_day) + interval_td
+
+
+def test_new_scheduler_has_no_due_date() -> None:
+    scheduler = SM2Scheduler()
+    assert scheduler.due_day is None
+    assert scheduler.due_timestamp is None
+    assert scheduler.interval_td is None
+
+
+@pytest.mark.parametrize(
+    "clone",
+    [lambda s: pickle.loads(pickle.dumps(s)), lambda s: type(s).from_bytes(s.to_bytes())],
+    ids=["pickle", "to_bytes"],
+)
+def test_day_state_clone_keeps_days(
+    reviewed_by_day: SpacedRepetitionScheduler,
+    clone: Callable[[SpacedRepetitionScheduler], SpacedRepetitionScheduler],
+) -> None:
+    restored = clone(reviewed_by_day)
+    assert restored.__getstate__() == reviewed_by_day.__getstate__()
+    assert restored._due_timestamp is None
+    assert restored.due_day == reviewed_by_day.due_day
+
+
+@pytest.mark.parametrize("cls", list(BASELINE_PICKLES), ids=["fsrs", "sm2", "leitner"])
+@pytest.mark.parametrize("by_day", [False, True], ids=["timestamp", "day"])
+def test_baseline_pickle_keeps_reviewing(cls: type[ConcreteScheduler], by_day: bool) -> None:
+    loaded, expected, result = _baseline(cls)
+    for _ in range(3):
+        day = expected.due_day
+        assert day is not None
+        if by_day:
+            assert loaded.compute_next_due_day(day, result) == expected.compute_next_due_day(
+                day, result
+            )
+        else:
+            attempted_at = from_epoch_day(day)
+            assert loaded.compute_next_due_interval(
+                attempted_at, result
+            ) == expected.compute_next_due_interval(attempted_at, result)
+    assert loaded.__getstate__() == expected.__getstate__()
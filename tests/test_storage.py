@@ -0,0 +1,218 @@
+import io
+import json
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from spacedreppy.deck import UNSCHEDULED, Deck, FSRSDeck, LeitnerDeck, SM2Deck
+from spacedreppy.epoch import from_epoch_day
+from spacedreppy.schedulers.fsrs import fsrs_parameters
+from spacedreppy.storage import (
+    ALIGNMENT,
+    MAGIC,
+    deck_from_buffer,
+    load_deck,
+    open_deck,
+    read_header,
+    save_deck,
+)
+
+START_DAY = 20_089
+
+
+def _reviewed(deck: Deck, result: int) -> Deck:
+    deck.review(np.arange(0, len(deck), 2), START_DAY, result)
+    deck.review(np.arange(0, len(deck), 4), START_DAY + 3, result)
+    return deck
+
+
+@pytest.fixture(
+    params=[
+        lambda: _reviewed(FSRSDeck(10, request_retention=0.85, maximum_interval=365), 3),
+        lambda: _reviewed(FSRSDeck(10, float_dtype=np.float32), 3),
+        lambda: _reviewed(SM2Deck(10), 4),
+        lambda: _reviewed(LeitnerDeck(10, intervals=[1, 2, 7]), 1),
+        lambda: SM2Deck(0),
+    ],
+    ids=["fsrs", "fsrs-float32", "sm2", "leitner", "empty"],
+)
+def deck(request: pytest.FixtureRequest) -> Deck:
+    deck: Deck = request.param()
+    return deck
+
+
+def _assert_same(a: Deck, b: Deck) -> None:
+    assert type(a) is type(b)
+    assert a.settings() == b.settings()
+    for name in a.columns:
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name))
+        assert getattr(a, name).dtype == getattr(b, name).dtype
+
+
+def test_save_load_round_trip(deck: Deck, tmp_path: Path) -> None:
+    path = tmp_path / "deck.srp"
+    save_deck(deck, path)
+    _assert_same(deck, load_deck(path))
+
+
+def test_save_load_file_objects(deck: Deck) -> None:
+    f = io.BytesIO()
+    save_deck(deck, f)
+    f.seek(0)
+    _assert_same(deck, load_deck(f))
+
+
+def test_loaded_deck_can_review(deck: Deck) -> None:
+    f = io.BytesIO()
+    save_deck(deck, f)
+    loaded = load_deck(io.BytesIO(f.getvalue()))
+    if len(deck):
+        result = deck.result_range[1]
+        deck.review([1], START_DAY + 5, result)
+        loaded.review([1], START_DAY + 5, result)
+    _assert_same(deck, loaded)
+
+
+def test_columns_are_aligned_and_weights_stored_once() -> None:
+    deck = FSRSDeck(3)
+    f = io.BytesIO()
+    save_deck(deck, f)
+    header = read_header(f.getvalue())
+    assert header["settings"]["weights"] == list(deck.weights)
+    assert header["size"] == 3
+    assert all(spec["offset"] % ALIGNMENT == 0 for spec in header["columns"].values())
+    assert f.getvalue().count(json.dumps(list(deck.weights)).encode()) == 1
+
+
+def test_deck_from_buffer_writes_through() -> None:
+    f = io.BytesIO()
+    save_deck(SM2Deck(4), f)
+    buffer = bytearray(f.getvalue())
+    deck = deck_from_buffer(buffer)
+    deck.review([2], START_DAY, 5)
+    _assert_same(deck, deck_from_buffer(buffer))
+    loaded = deck_from_buffer(bytes(buffer))
+    assert isinstance(loaded, SM2Deck)
+    assert loaded.repetitions[2] == 1
+
+
+def test_deck_from_read_only_buffer_is_read_only() -> None:
+    f = io.BytesIO()
+    save_deck(SM2Deck(4), f)
+    deck = deck_from_buffer(f.getvalue())
+    with pytest.raises(ValueError, match="read-only"):
+        deck.review([2], START_DAY, 5)
+
+
+@pytest.mark.parametrize(
+    ("corrupt", "match"),
+    [
+        (lambda data: data[:10], "too short"),
+        (lambda data: b"X" + data[1:], "bad magic"),
+        (lambda data: MAGIC + b"\x02" + data[9:], "version 2"),
+        (lambda data: data[:-8], "truncated"),
+        (lambda data: data.replace(b'"SM2Deck"', b'"XYZDeck"'), "unknown deck type"),
+    ],
+    ids=["short", "magic", "version", "truncated", "type"],
+)
+def test_invalid_files(corrupt: Callable[[bytes], bytes], match: str) -> None:
+    f = io.BytesIO()
+    save_deck(SM2Deck(4), f)
+    with pytest.raises(ValueError, match=match):
+        load_deck(io.BytesIO(corrupt(f.getvalue())))
+
+
+@pytest.fixture
+def deck_file(tmp_path: Path) -> Path:
+    path = tmp_path / "deck.srp"
+    save_deck(_reviewed(FSRSDeck(10), 3), path)
+    return path
+
+
+def test_open_deck_updates_file_in_place(deck_file: Path) -> None:
+    expected = load_deck(deck_file)
+    expected.review([1, 2], START_DAY + 5, 4)
+    with open_deck(deck_file) as mapped:
+        mapped.deck.review([1, 2], START_DAY + 5, 4)
+        size = deck_file.stat().st_size
+        mapped.flush()
+        _assert_same(expected, load_deck(deck_file))
+    assert deck_file.stat().st_size == size
+    _assert_same(expected, load_deck(deck_file))
+
+
+def test_open_deck_materialized_scheduler_writes_to_file(deck_file: Path) -> None:
+    with open_deck(deck_file) as mapped:
+        scheduler = mapped.deck.scheduler(3)
+        scheduler.compute_next_due_interval(attempted_at=from_epoch_day(START_DAY + 2), result=1)
+        due = int(mapped.deck.due[3])
+    assert load_deck(deck_file).due[3] == due != UNSCHEDULED
+
+
+def test_open_deck_flush_stores_settings(deck_file: Path) -> None:
+    with open_deck(deck_file) as mapped:
+        assert isinstance(mapped.deck, FSRSDeck)
+        mapped.deck.parameters = fsrs_parameters(mapped.deck.weights, 0.8)
+        mapped.deck.maximum_interval = 100
+    loaded = load_deck(deck_file)
+    assert isinstance(loaded, FSRSDeck)
+    assert loaded.request_retention == 0.8
+    assert loaded.maximum_interval == 100
+
+
+def test_open_deck_flush_after_resize_rewrites_file(deck_file: Path) -> None:
+    expected = load_deck(deck_file)
+    expected.resize(1000)
+    mapped = open_deck(deck_file)
+    deck = mapped.deck
+    deck.resize(1000)
+    mapped.flush()
+    deck.review([999], START_DAY, 3)
+    expected.review([999], START_DAY, 3)
+    mapped.close()
+    _assert_same(expected, load_deck(deck_file))
+    assert not deck_file.with_name("deck.srp.tmp").exists()
+
+
+def test_open_deck_read_only(deck_file: Path) -> None:
+    with open_deck(deck_file, mode="r") as mapped:
+        _assert_same(load_deck(deck_file), mapped.deck)
+        with pytest.raises(ValueError, match="read-only"):
+            mapped.deck.review([1], START_DAY + 5, 3)
+        with pytest.raises(ValueError, match="read-only"):
+            mapped.flush()
+
+
+def test_open_deck_close_empties_deck(deck_file: Path) -> None:
+    mapped = open_deck(deck_file)
+    mapped.close()
+    assert mapped.closed
+    assert len(mapped.deck) == 0
+    mapped.close()
+    with pytest.raises(ValueError, match="closed"):
+        mapped.flush()
+
+
+def test_open_deck_close_with_held_column_keeps_file(deck_file: Path) -> None:
+    expected = load_deck(deck_file)
+    mapped = open_deck(deck_file)
+    assert isinstance(mapped.deck, FSRSDeck) and isinstance(expected, FSRSDeck)
+    stability = mapped.deck.stability
+    mapped.close()
+    assert mapped.closed
+    mapped.close()
+    with pytest.raises(ValueError, match="closed"):
+        mapped.flush()
+    _assert_same(load_deck(deck_file), expected)
+    np.testing.assert_array_equal(stability, expected.stability)
+
+
+def test_open_deck_invalid(tmp_path: Path) -> None:
+    path = tmp_path / "deck.srp"
+    path.write_bytes(b"this is not a deck file")
+    with pytest.raises(ValueError, match="bad magic"):
+        open_deck(path)
+    with pytest.raises(ValueError, match="mode"):
+        open_deck(path, mode="w")  # type: ignore[arg-type]